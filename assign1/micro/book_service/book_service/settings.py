@@ -64,6 +64,9 @@ DATABASES = {
         'PASSWORD': '123456',
         'HOST': 'localhost',
         'PORT': '3306',
+        # Giữ kết nối MySQL giữa các request (giây), ping trước khi dùng lại
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -15,6 +15,8 @@ urlpatterns = [
     path('register/', views.register_page, name='register'),
     path('cart/', views.cart_page, name='cart'),
     # API Endpoint - Cho các service khác gọi
+    path('api/books/events/', views.get_book_events_api, name='get_book_events_api'),
+    path('api/books/batch/', views.get_books_batch_api, name='get_books_batch_api'),
     path('api/books/<int:book_id>/', views.get_book_api, name='get_book_api'),
     path('api/books/', views.get_all_books_api, name='get_all_books_api'),
 ]
\ No newline at end of file
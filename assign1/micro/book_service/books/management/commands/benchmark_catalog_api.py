@@ -0,0 +1,130 @@
+# micro/book_service/books/management/commands/benchmark_catalog_api.py
+import gzip
+import json
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from books.models import Book, BookEvent
+from books.views import MAX_PAGE_SIZE, book_to_dict
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark GET /api/books/ với N sách tạm: so sánh trả toàn bộ sách (cách cũ) '
+        'với một trang, ?fields=, gzip và revalidate bằng If-None-Match (304), '
+        'và kiểm tra ETag đổi khi sách thay đổi. Dữ liệu được rollback.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=2000, help='Số sách tạm')
+        parser.add_argument('--rounds', type=int, default=50, help='Số lần gọi cho mỗi trường hợp')
+
+    def expect(self, label, ok, detail=''):
+        if not ok:
+            raise CommandError(f'{label} {detail}')
+        self.stdout.write(f'  ok  {label}')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Book.objects.bulk_create(
+                Book(title=f'Benchmark Book {i}', author=f'Author {i % 97}', price=Decimal('10.00') + i % 50,
+                     stock=i % 20)
+                for i in range(options['books'])
+            )
+            # bulk_create không đi qua save(): ghi một sự kiện để tăng phiên bản catalog
+            BookEvent.record(Book.objects.order_by('-id').first())
+            self.client = Client(SERVER_NAME='localhost')
+            self.stdout.write(f'{Book.objects.count()} books, {options["rounds"]} rounds each')
+            self.compare(options['rounds'])
+            self.check_api()
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('catalog API OK'))
+
+    def timed(self, label, func, rounds):
+        func()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                response = func()
+            elapsed = (time.perf_counter() - start) * 1000 / rounds
+        size = len(response.content)
+        self.stdout.write(
+            f'  {label:<34} {elapsed:7.2f}ms {size:>9,} bytes  {len(queries) // rounds} queries  '
+            f'status={response.status_code}'
+        )
+        return elapsed
+
+    def compare(self, rounds):
+        def full_dump():
+            # get_all_books_api trước khi phân trang
+            return JsonResponse({'books': [book_to_dict(book) for book in Book.objects.all()]})
+
+        get = self.client.get
+        full = self.timed('all books (before)', full_dump, rounds)
+        self.timed(f'all books via {MAX_PAGE_SIZE}-book pages', lambda: self.walk(), max(rounds // 10, 1))
+        self.timed('first page', lambda: get('/api/books/'), rounds)
+        self.timed('first page, fields=id,price,stock', lambda: get('/api/books/?fields=price,stock'), rounds)
+        self.timed('first page, gzip', lambda: get('/api/books/', HTTP_ACCEPT_ENCODING='gzip'), rounds)
+        etag = get('/api/books/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        revalidate = self.timed('first page, If-None-Match (304)', lambda: get(
+            '/api/books/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag), rounds)
+        self.stdout.write(f'  revalidating the catalog is {full / revalidate:.0f}x cheaper than the full dump')
+
+    def walk(self, **headers):
+        """Đọc toàn bộ catalog theo cursor; trả response của trang cuối."""
+        cursor = 0
+        while cursor is not None:
+            response = self.client.get(f'/api/books/?limit={MAX_PAGE_SIZE}&cursor={cursor}', **headers)
+            cursor = response.json()['next_cursor']
+        return response
+
+    def check_api(self):
+        get = self.client.get
+        ids = []
+        cursor = 0
+        while cursor is not None:
+            data = get(f'/api/books/?limit=150&fields=title&cursor={cursor}').json()
+            ids.extend(book['id'] for book in data['books'])
+            cursor = data['next_cursor']
+        self.expect('cursor pages cover every book exactly once',
+                    ids == list(Book.objects.order_by('id').values_list('id', flat=True)))
+        self.expect('fields= returns only the requested columns (and id)',
+                    set(data['books'][0]) == {'id', 'title'})
+        self.expect('bad parameters are rejected', all(
+            get(url).status_code == 400
+            for url in ('/api/books/?limit=0', f'/api/books/?limit={MAX_PAGE_SIZE + 1}',
+                        '/api/books/?cursor=x', '/api/books/?fields=title,password')
+        ))
+
+        response = get('/api/books/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.expect('gzip response decodes to the same page',
+                    response['Content-Encoding'] == 'gzip'
+                    and json.loads(gzip.decompress(response.content)) == get('/api/books/').json())
+        etag = response['ETag']
+        self.expect('strong ETag, varies by encoding and parameters',
+                    not etag.startswith('W/') and etag != get('/api/books/')['ETag']
+                    and etag != get('/api/books/?limit=10', HTTP_ACCEPT_ENCODING='gzip')['ETag'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = get('/api/books/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.expect('unchanged catalog answers 304 with only the version query',
+                    response.status_code == 304 and not response.content and len(queries) == 1)
+
+        small = get('/api/books/?limit=1&fields=stock', HTTP_ACCEPT_ENCODING='gzip')
+        self.expect('small uncompressed page revalidates with its own ETag',
+                    'Content-Encoding' not in small and get(
+                        '/api/books/?limit=1&fields=stock', HTTP_ACCEPT_ENCODING='gzip',
+                        HTTP_IF_NONE_MATCH=small['ETag']).status_code == 304)
+
+        book = Book.objects.order_by('id').first()
+        book.stock += 1
+        book.save()
+        response = get('/api/books/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.expect('a book change invalidates the ETag', response.status_code == 200
+                    and json.loads(gzip.decompress(response.content))['books'][0]['stock'] == book.stock)
@@ -0,0 +1,25 @@
+# micro/book_service/books/management/commands/publish_book_snapshot.py
+from django.core.management.base import BaseCommand
+
+from books.models import Book, BookEvent
+
+
+class Command(BaseCommand):
+    help = (
+        'Ghi một sự kiện upsert cho mỗi sách hiện có vào outbox, để Service khác '
+        '(Cart Service) dựng lại bảng sách local từ đầu. Dùng một lần sau khi bật '
+        'outbox, hoặc khi sách bị sửa bằng QuerySet.update() không sinh sự kiện.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Số sự kiện mỗi lần bulk_create')
+
+    def handle(self, *args, **options):
+        events = [
+            BookEvent(book_id=book.id, event_type=BookEvent.UPSERT, payload=BookEvent.payload_for(book))
+            for book in Book.objects.order_by('id').iterator()
+        ]
+        BookEvent.objects.bulk_create(events, batch_size=options['batch_size'])
+        head = BookEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self.stdout.write(self.style.SUCCESS(f'Published {len(events)} book snapshots, outbox head is {head}'))
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 class Book(models.Model):
     title = models.CharField(max_length=255)
@@ -7,4 +7,68 @@ class Book(models.Model):
     stock = models.IntegerField(default=0)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+    def save(self, *args, **kwargs):
+        # Ghi sự kiện vào outbox trong cùng transaction với thay đổi của sách
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            BookEvent.record(self)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            book_id = self.id
+            result = super().delete(*args, **kwargs)
+            BookEvent.record_delete(book_id)
+        return result
+
+
+class BookEvent(models.Model):
+    """
+    Outbox: sự kiện thay đổi sách (title, price, stock) cho các Service khác.
+
+    Được ghi trong cùng transaction với Book.save()/delete(), nên không mất
+    sự kiện nào. id tăng dần là offset để consumer (Cart Service) đọc tiếp
+    qua GET /api/books/events/?after=<offset>.
+    Lưu ý: QuerySet.update()/bulk_create() không đi qua save() nên không sinh sự kiện.
+    """
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+    TYPE_CHOICES = [(UPSERT, 'Upsert'), (DELETE, 'Delete')]
+
+    book_id = models.IntegerField(db_index=True)
+    event_type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type} book {self.book_id}"
+
+    @staticmethod
+    def payload_for(book):
+        return {
+            'title': book.title,
+            'author': book.author,
+            'price': str(book.price),
+            'stock': book.stock,
+        }
+
+    @classmethod
+    def record(cls, book):
+        return cls.objects.create(book_id=book.id, event_type=cls.UPSERT, payload=cls.payload_for(book))
+
+    @classmethod
+    def record_delete(cls, book_id):
+        return cls.objects.create(book_id=book_id, event_type=cls.DELETE)
+
+    def to_dict(self):
+        return {
+            'offset': self.id,
+            'book_id': self.book_id,
+            'type': self.event_type,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat(),
+        }
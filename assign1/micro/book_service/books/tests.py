@@ -1,3 +1,95 @@
+# micro/book_service/books/tests.py
+"""
+Test cho API catalog GET /api/books/: phân trang theo cursor, ?fields=, gzip,
+ETag và If-None-Match (304).
+"""
+import gzip
+import json
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Book, BookEvent
+from .views import MAX_PAGE_SIZE
+
+
+class CatalogApiTests(TestCase):
+    BOOKS = 400
+
+    @classmethod
+    def setUpTestData(cls):
+        Book.objects.bulk_create(
+            Book(title=f'Test Book {i}', author=f'Author {i % 97}', price=Decimal('10.00') + i % 50, stock=i % 20)
+            for i in range(cls.BOOKS)
+        )
+        # bulk_create không đi qua save(): ghi một sự kiện để tăng phiên bản catalog
+        BookEvent.record(Book.objects.order_by('-id').first())
+
+    def test_cursor_pages_cover_every_book_once(self):
+        ids, cursor = [], 0
+        while cursor is not None:
+            data = self.client.get(f'/api/books/?limit=150&fields=title&cursor={cursor}').json()
+            ids.extend(book['id'] for book in data['books'])
+            cursor = data['next_cursor']
+        self.assertEqual(ids, list(Book.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_fields_returns_only_requested_columns_and_id(self):
+        data = self.client.get('/api/books/?fields=title').json()
+        self.assertEqual(set(data['books'][0]), {'id', 'title'})
+
+    def test_bad_parameters_are_rejected(self):
+        for url in ('/api/books/?limit=0', f'/api/books/?limit={MAX_PAGE_SIZE + 1}',
+                    '/api/books/?cursor=x', '/api/books/?fields=title,password'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_gzip_response_decodes_to_the_same_page(self):
+        response = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.client.get('/api/books/').json())
+
+    def test_strong_etag_varies_by_encoding_and_parameters(self):
+        etag = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertNotEqual(etag, self.client.get('/api/books/')['ETag'])
+        self.assertNotEqual(etag, self.client.get('/api/books/?limit=10', HTTP_ACCEPT_ENCODING='gzip')['ETag'])
+
+    def test_unchanged_catalog_answers_304_with_one_query(self):
+        etag = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(len(queries), 1)
+
+    def test_small_uncompressed_page_revalidates_with_its_own_etag(self):
+        url = '/api/books/?limit=1&fields=stock'
+        small = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=small['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_book_change_invalidates_the_etag(self):
+        etag = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        book = Book.objects.order_by('id').first()
+        book.stock += 1
+        book.save()
+        response = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(gzip.decompress(response.content))['books'][0]['stock'], book.stock)
 
-# Create your tests here.
+    def test_late_commit_of_a_lower_offset_invalidates_the_etag(self):
+        book = Book.objects.order_by('id').first()
+        BookEvent.record(book)
+        late = BookEvent.record(book)
+        BookEvent.record(book)
+        # Sự kiện `late` chưa commit khi client đọc catalog...
+        late_id = late.id
+        late.delete()
+        etag = self.client.get('/api/books/')['ETag']
+        # ...rồi commit sau sự kiện có offset lớn hơn
+        late.id = late_id
+        late.save(force_insert=True)
+        self.assertEqual(self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
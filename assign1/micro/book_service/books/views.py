@@ -2,14 +2,44 @@
 """
 Views cho Book Service - Quản lý sách và Frontend chính
 """
+import gzip
+import hashlib
+import json
+from datetime import timedelta
+
+from django.db.models import Count, Max
 from django.shortcuts import render
-from django.http import JsonResponse
-from .models import Book
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from .models import Book, BookEvent
 
 # URLs của các Service khác
 CUSTOMER_SERVICE_URL = "http://127.0.0.1:8001"
 CART_SERVICE_URL = "http://127.0.0.1:8003"
 
+# Số sách tối đa trong một request batch
+MAX_BATCH_IDS = 200
+
+# Phân trang danh sách sách (cursor = id của sách cuối trang trước)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Số sách mỗi trang của trang chủ
+UI_PAGE_SIZE = 48
+# Các field được chọn bằng ?fields=; id luôn có vì là cursor
+BOOK_FIELDS = ('id', 'title', 'author', 'price', 'stock')
+# Chỉ nén gzip response lớn hơn số byte này
+GZIP_MIN_BYTES = 512
+
+# Số sự kiện tối đa trong một lần đọc outbox
+MAX_EVENTS = 500
+# Chỉ trả sự kiện đã ghi quá số giây này: id tự tăng được cấp trước khi
+# transaction commit, nên sự kiện mới nhất có thể chưa thấy được id nhỏ hơn.
+# Transaction commit chậm hơn khoảng này có thể bị consumer bỏ qua: Cart Service
+# giới hạn tuổi bản sao (BOOK_REPLICA_MAX_AGE), publish_book_snapshot ghi lại toàn bộ
+EVENT_SETTLE_SECONDS = 1
+
 
 # ==================== API ENDPOINTS ====================
 # Các endpoint này được các Service khác gọi
@@ -21,30 +51,157 @@ def get_book_api(request, book_id):
     """
     try:
         book = Book.objects.get(id=book_id)
-        return JsonResponse({
-            'id': book.id,
-            'title': book.title,
-            'author': book.author,
-            'price': float(book.price),
-            'stock': book.stock
-        })
+        return JsonResponse(book_to_dict(book))
     except Book.DoesNotExist:
         return JsonResponse({'error': 'Book not found'}, status=404)
 
 
 def get_all_books_api(request):
     """
-    API: Lấy danh sách tất cả sách.
+    API: Lấy danh sách sách, phân trang theo cursor.
+    GET /api/books/?cursor=<id>&limit=<n>&fields=id,title,price
+
+    - cursor: trả sách có id > cursor (lấy từ 'next_cursor' của trang trước)
+    - limit: số sách mỗi trang (mặc định DEFAULT_PAGE_SIZE, tối đa MAX_PAGE_SIZE)
+    - fields: chỉ lấy các cột này (.values()), id luôn có
+
+    ETag được tính từ phiên bản catalog (offset mới nhất và số sự kiện của outbox)
+    và tham số, không cần đọc sách: client gửi If-None-Match với ETag cũ, nếu
+    catalog chưa đổi thì nhận 304 mà không query sách hay serialize JSON.
+    Response được nén gzip nếu client hỗ trợ.
+    """
+    try:
+        cursor = int(request.GET.get('cursor', 0))
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'cursor and limit must be integers'}, status=400)
+    if cursor < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        return JsonResponse({'error': f'cursor must be >= 0 and limit between 1 and {MAX_PAGE_SIZE}'}, status=400)
+    fields = ['id'] + [
+        field for field in dict.fromkeys(request.GET.get('fields', ','.join(BOOK_FIELDS)).split(','))
+        if field and field != 'id'
+    ]
+    unknown = [field for field in fields if field not in BOOK_FIELDS]
+    if unknown:
+        return JsonResponse({'error': f"Unknown fields: {', '.join(unknown)}"}, status=400)
+
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    version = catalog_version()
+    variant = hashlib.md5(f"{cursor}:{limit}:{','.join(fields)}".encode()).hexdigest()[:12]
+    etag = identity_etag = f'"books-v{version}-{variant}"'
+    if use_gzip:
+        etag = f'"books-v{version}-{variant}-gz"'
+
+    # Trang nhỏ không được nén nên client có thể giữ ETag không có -gz
+    matched = {etag, identity_etag} & {tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')}
+    if matched:
+        etag = matched.pop()
+        response = HttpResponse(status=304)
+    else:
+        rows = list(Book.objects.filter(id__gt=cursor).order_by('id').values(*fields)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        for row in rows:
+            if 'price' in row:
+                row['price'] = float(row['price'])
+        body = json.dumps({
+            'books': rows,
+            'next_cursor': rows[-1]['id'] if has_more else None,
+            'version': version,
+        }).encode()
+        # Nén trong view (không dùng GZipMiddleware) để ETag vẫn là strong ETag
+        if use_gzip and len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=6)
+            response = HttpResponse(body, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            etag = identity_etag
+            response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def catalog_version():
+    """
+    Phiên bản catalog: offset mới nhất và số sự kiện của outbox, đọc trong một query.
+
+    Chỉ dùng offset lớn nhất thì không đủ: id tự tăng được cấp trước khi commit,
+    nên một transaction chậm có thể commit id nhỏ hơn sau khi id lớn hơn đã được
+    trả về, và offset lớn nhất không đổi. Số sự kiện thì luôn tăng khi có sự kiện
+    mới được commit (outbox không bị xóa), nên phiên bản vẫn đổi.
+    """
+    stats = BookEvent.objects.aggregate(head=Max('id'), events=Count('id'))
+    return f"{stats['head'] or 0}.{stats['events']}"
+
+
+@csrf_exempt
+def get_books_batch_api(request):
+    """
+    API: Lấy nhiều sách trong một request và một query.
+    GET /api/books/batch/?ids=1,2,3 hoặc POST body {"ids": [1, 2, 3]}.
+    Được Cart Service gọi để kiểm tra lại tất cả item của giỏ hàng một lần.
+
+    Trả về sách theo thứ tự ids yêu cầu, và danh sách id không tồn tại trong 'missing'.
+    """
+    try:
+        if request.method == 'POST':
+            raw_ids = json.loads(request.body).get('ids', [])
+        elif request.method == 'GET':
+            raw_ids = [value for value in request.GET.get('ids', '').split(',') if value.strip()]
+        else:
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+        ids = list(dict.fromkeys(int(value) for value in raw_ids))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': 'ids must be a list of integers'}, status=400)
+
+    if len(ids) > MAX_BATCH_IDS:
+        return JsonResponse({'error': f'At most {MAX_BATCH_IDS} ids per request'}, status=400)
+
+    books = {book.id: book for book in Book.objects.filter(id__in=ids)}
+    return JsonResponse({
+        'books': [book_to_dict(books[book_id]) for book_id in ids if book_id in books],
+        'missing': [book_id for book_id in ids if book_id not in books],
+    })
+
+
+def get_book_events_api(request):
     """
-    books = Book.objects.all()
-    data = [{
+    API: Đọc outbox sự kiện thay đổi sách theo offset.
+    GET /api/books/events/?after=<offset>&limit=<n>
+    Được Cart Service gọi định kỳ để cập nhật bảng sách local (BookReplica).
+
+    Trả về các sự kiện có offset > after theo thứ tự, offset cuối cùng đã trả
+    ('last_offset', consumer lưu lại để đọc tiếp) và offset mới nhất ('head').
+    """
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = min(int(request.GET.get('limit', 100)), MAX_EVENTS)
+    except ValueError:
+        return JsonResponse({'error': 'after and limit must be integers'}, status=400)
+    if after < 0 or limit < 1:
+        return JsonResponse({'error': 'after must be >= 0 and limit >= 1'}, status=400)
+
+    settled = BookEvent.objects.filter(created_at__lte=timezone.now() - timedelta(seconds=EVENT_SETTLE_SECONDS))
+    events = [event.to_dict() for event in settled.filter(id__gt=after)[:limit]]
+    head = settled.order_by('-id').values_list('id', flat=True).first() or 0
+    return JsonResponse({
+        'events': events,
+        'last_offset': events[-1]['offset'] if events else after,
+        'head': head,
+    })
+
+
+def book_to_dict(book):
+    """Dữ liệu JSON của một cuốn sách, dùng chung cho các API."""
+    return {
         'id': book.id,
         'title': book.title,
         'author': book.author,
         'price': float(book.price),
         'stock': book.stock
-    } for book in books]
-    return JsonResponse({'books': data})
+    }
 
 
 # ==================== UI VIEWS ====================
@@ -54,10 +211,18 @@ def book_list_ui(request):
     """
     UI: Trang danh sách sách (Homepage).
     Book Service đóng vai trò Frontend chính.
+    Phân trang theo cursor giống API (?cursor=<id của sách cuối trang trước>).
     """
-    books = Book.objects.all()
+    try:
+        cursor = max(int(request.GET.get('cursor', 0)), 0)
+    except ValueError:
+        cursor = 0
+    books = list(Book.objects.filter(id__gt=cursor).order_by('id')[:UI_PAGE_SIZE + 1])
+    next_cursor = books[UI_PAGE_SIZE - 1].id if len(books) > UI_PAGE_SIZE else None
     return render(request, 'books/book_list.html', {
-        'books': books,
+        'books': books[:UI_PAGE_SIZE],
+        'cursor': cursor,
+        'next_cursor': next_cursor,
         'cart_service_url': CART_SERVICE_URL,
         'customer_service_url': CUSTOMER_SERVICE_URL
     })
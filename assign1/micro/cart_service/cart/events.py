@@ -0,0 +1,231 @@
+# micro/cart_service/cart/events.py
+"""
+Đồng bộ sách từ Book Service sang bảng BookReplica của Cart Service qua sự kiện.
+
+Book Service ghi mỗi thay đổi của sách (title, price, stock, xóa) vào outbox
+BookEvent cùng transaction với thay đổi đó; id của sự kiện là offset tăng dần.
+Consumer ở đây đọc sự kiện sau offset đã lưu, áp dụng vào BookReplica và lưu
+offset mới trong cùng một transaction:
+
+- Idempotent: sự kiện có offset <= offset đã lưu, hoặc <= version của sách, bị bỏ qua
+- Replay: đặt lại offset (replay_book_events) rồi đọc lại từ đó
+- Lag: lag() trả số sự kiện còn chờ và độ trễ từ lúc ghi đến lúc áp dụng
+- Giới hạn: outbox chỉ trả sự kiện đã ghi quá EVENT_SETTLE_SECONDS giây (Book Service),
+  vì id tự tăng được cấp trước khi transaction commit. Sự kiện của transaction
+  commit chậm hơn khoảng đó có thể nằm sau offset consumer đã lưu và bị bỏ qua
+  vĩnh viễn. Vì vậy fresh_replicas() chỉ trả bản sao được cập nhật trong
+  settings.BOOK_REPLICA_MAX_AGE giây; bản sao cũ hơn được đọc lại từ Book Service
+  (book_cache), và publish_book_snapshot ở Book Service ghi lại sự kiện cho mọi sách.
+
+Transport (cách lấy sự kiện) có thể thay bằng settings.BOOK_EVENTS_TRANSPORT:
+- 'outbox': gọi GET /api/books/events/?after= của Book Service (mặc định)
+- 'local': hàng đợi trong process, thay cho message broker khi chạy thử/benchmark
+
+Mỗi transport có read(after, limit) -> {'events': [...], 'head': offset}
+và wait(after, timeout) để chờ sự kiện mới.
+"""
+import threading
+import time
+from decimal import Decimal
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import BookReplica, ConsumerOffset
+from .service_client import book_client
+
+
+# Tên consumer mặc định trong bảng ConsumerOffset
+CONSUMER_NAME = 'book_replica'
+
+
+class OutboxPollingTransport:
+    """Đọc outbox của Book Service qua HTTP (ServiceClient: keep-alive, retry, circuit breaker)."""
+
+    def __init__(self, client, poll_interval=1.0):
+        self.client = client
+        self.poll_interval = poll_interval
+
+    def read(self, after, limit=100):
+        response = self.client.get('events/', params={'after': after, 'limit': limit})
+        response.raise_for_status()
+        data = response.json()
+        return {'events': data['events'], 'head': data['head']}
+
+    def wait(self, after, timeout=None):
+        time.sleep(self.poll_interval if timeout is None else min(timeout, self.poll_interval))
+
+
+class LocalQueueTransport:
+    """
+    Hàng đợi sự kiện trong process, cùng dạng dữ liệu với outbox của Book Service.
+    Giữ toàn bộ log nên đọc lại được từ bất kỳ offset nào; wait() trả về ngay khi
+    có sự kiện mới (không phải chờ chu kỳ poll).
+    """
+
+    def __init__(self):
+        self.log = []
+        self.condition = threading.Condition()
+
+    def publish(self, book_id, event_type='upsert', payload=None):
+        """Thêm một sự kiện, trả offset của nó."""
+        with self.condition:
+            offset = len(self.log) + 1
+            self.log.append({
+                'offset': offset,
+                'book_id': book_id,
+                'type': event_type,
+                'payload': payload or {},
+                'created_at': timezone.now().isoformat(),
+            })
+            self.condition.notify_all()
+        return offset
+
+    def read(self, after, limit=100):
+        with self.condition:
+            return {'events': self.log[after:after + limit], 'head': len(self.log)}
+
+    def wait(self, after, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.log) > after, timeout)
+
+    def clear(self):
+        with self.condition:
+            self.log.clear()
+
+
+local_queue = LocalQueueTransport()
+
+
+def get_transport(name=None):
+    """Transport theo tên, mặc định settings.BOOK_EVENTS_TRANSPORT."""
+    name = name or getattr(settings, 'BOOK_EVENTS_TRANSPORT', 'outbox')
+    if name == 'outbox':
+        return OutboxPollingTransport(book_client, getattr(settings, 'BOOK_EVENTS_POLL_INTERVAL', 1.0))
+    if name == 'local':
+        return local_queue
+    raise ValueError(f'Unknown book events transport: {name}')
+
+
+def apply_events(events, head=0, consumer=CONSUMER_NAME):
+    """
+    Áp dụng các sự kiện (theo thứ tự offset) vào BookReplica và lưu offset.
+
+    Returns:
+        Số sự kiện đã áp dụng (không tính sự kiện đã áp dụng trước đó)
+    """
+    ConsumerOffset.objects.get_or_create(name=consumer)
+    with transaction.atomic():
+        position = ConsumerOffset.objects.select_for_update().get(name=consumer)
+        events = sorted((event for event in events if event['offset'] > position.offset),
+                        key=lambda event: event['offset'])
+        now = timezone.now()
+        if events:
+            replicas = {
+                replica.book_id: replica
+                for replica in BookReplica.objects.select_for_update().filter(
+                    book_id__in={event['book_id'] for event in events})
+            }
+            changed = {}
+            for event in events:
+                replica = replicas.get(event['book_id'])
+                if replica is None:
+                    replica = replicas[event['book_id']] = BookReplica(book_id=event['book_id'], price=0)
+                if replica.version >= event['offset']:
+                    continue
+                if event['type'] == 'delete':
+                    replica.deleted = True
+                else:
+                    payload = event['payload']
+                    replica.title = payload.get('title', '')
+                    replica.price = Decimal(str(payload['price']))
+                    replica.stock = payload['stock']
+                    replica.deleted = False
+                replica.version = event['offset']
+                replica.updated_at = now
+                changed[replica.book_id] = replica
+            BookReplica.objects.bulk_create([replica for replica in changed.values() if replica.pk is None])
+            BookReplica.objects.bulk_update(
+                [replica for replica in changed.values() if replica.pk is not None],
+                ['title', 'price', 'stock', 'deleted', 'version', 'updated_at'],
+            )
+            position.offset = events[-1]['offset']
+            position.applied += len(events)
+            position.last_event_at = parse_datetime(events[-1]['created_at'])
+            position.last_applied_at = now
+        position.head = max(head, position.offset)
+        position.last_polled_at = now
+        position.save()
+    return len(events)
+
+
+def consume(transport, batch_size=100, consumer=CONSUMER_NAME):
+    """
+    Đọc và áp dụng sự kiện cho đến khi bắt kịp head của transport.
+
+    Returns:
+        Số sự kiện đã áp dụng
+    """
+    total = 0
+    while True:
+        position, _ = ConsumerOffset.objects.get_or_create(name=consumer)
+        batch = transport.read(position.offset, batch_size)
+        total += apply_events(batch['events'], batch['head'], consumer)
+        if len(batch['events']) < batch_size:
+            return total
+
+
+def fresh_replicas(max_age=None):
+    """
+    BookReplica được cập nhật trong max_age giây gần nhất (mặc định
+    settings.BOOK_REPLICA_MAX_AGE). Bản sao cũ hơn có thể đã lỡ sự kiện (xem giới
+    hạn ở đầu module) hoặc consumer đã dừng, nên không được dùng.
+    """
+    if max_age is None:
+        max_age = getattr(settings, 'BOOK_REPLICA_MAX_AGE', 300)
+    return BookReplica.objects.filter(updated_at__gte=timezone.now() - timedelta(seconds=max_age))
+
+
+def reset_offset(offset=0, rebuild=False, consumer=CONSUMER_NAME):
+    """
+    Đặt lại offset để đọc lại sự kiện từ offset đó (replay).
+    rebuild=True xóa toàn bộ BookReplica trước, để dựng lại từ đầu.
+    Không có rebuild, sự kiện cũ hơn version hiện tại của sách vẫn bị bỏ qua.
+    """
+    with transaction.atomic():
+        if rebuild:
+            BookReplica.objects.all().delete()
+        ConsumerOffset.objects.update_or_create(name=consumer, defaults={'offset': offset})
+
+
+def lag(consumer=CONSUMER_NAME):
+    """
+    Số liệu độ trễ đồng bộ của consumer.
+
+    events_behind: số sự kiện còn chờ áp dụng (theo head ở lần đọc gần nhất)
+    apply_delay_ms: từ lúc Book Service ghi sự kiện cuối đến lúc nó được áp dụng
+    seconds_since_poll: thời gian từ lần đọc gần nhất (lớn là consumer đã dừng)
+    """
+    position = ConsumerOffset.objects.filter(name=consumer).first()
+    if position is None:
+        return {'consumer': consumer, 'offset': 0, 'head': 0, 'events_behind': 0, 'applied': 0,
+                'apply_delay_ms': None, 'seconds_since_poll': None, 'replicated_books': 0}
+    now = timezone.now()
+    delay = None
+    if position.last_event_at and position.last_applied_at:
+        delay = round((position.last_applied_at - position.last_event_at).total_seconds() * 1000, 1)
+    return {
+        'consumer': consumer,
+        'offset': position.offset,
+        'head': position.head,
+        'events_behind': max(position.head - position.offset, 0),
+        'applied': position.applied,
+        'apply_delay_ms': delay,
+        'seconds_since_poll': round((now - position.last_polled_at).total_seconds(), 1)
+        if position.last_polled_at else None,
+        'replicated_books': BookReplica.objects.filter(deleted=False).count(),
+    }
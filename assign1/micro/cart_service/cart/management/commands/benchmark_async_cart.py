@@ -0,0 +1,156 @@
+# micro/cart_service/cart/management/commands/benchmark_async_cart.py
+import asyncio
+import contextlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from cart.models import Cart
+from cart.service_client import async_book_client, book_cache, book_client
+from cart.stubs import StubBookService
+
+# ID sách và khách hàng riêng cho benchmark, không trùng dữ liệu thật
+FIRST_BOOK_ID = 900001
+FIRST_CUSTOMER_ID = 900001
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark: POST /api/cart/add/ đồng thời khi Book Service chậm (stub có độ trễ). '
+        'So sánh view async dưới ASGI (cart_service.asgi, một event loop) với cùng view '
+        'dưới WSGI với số worker cố định; mỗi request đều phải gọi Book Service. '
+        '--url để tạo tải cho một server đang chạy, ví dụ uvicorn cart_service.asgi:application.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Số request mỗi lần chạy')
+        parser.add_argument('--concurrency', type=int, default=50, help='Số request đồng thời')
+        parser.add_argument('--delay', type=float, default=0.1, help='Độ trễ của stub Book Service (giây)')
+        parser.add_argument('--workers', type=int, default=4, help='Số worker WSGI để so sánh')
+        parser.add_argument('--pool-size', type=int, help='Số kết nối tới Book Service của client async '
+                                                          '(mặc định bằng --concurrency)')
+        parser.add_argument('--url', help='URL gốc của Cart Service đang chạy, ví dụ http://127.0.0.1:8003')
+
+    def handle(self, *args, **options):
+        total, concurrency = options['requests'], options['concurrency']
+        if options['url']:
+            self.report('server', total, asyncio.run(self.run_async(
+                self.http_post(options['url'], concurrency), total, concurrency)))
+            return
+
+        books = {FIRST_BOOK_ID + i: {'title': f'Bench Book {i}', 'price': 10.0, 'stock': 1000} for i in range(total)}
+        saved = (book_client.base_url, async_book_client.base_url, async_book_client.pool_size,
+                 async_book_client.keep_alive)
+        with StubBookService(books=books, delay=options['delay']) as stub:
+            book_client.base_url = async_book_client.base_url = stub.url
+            async_book_client.pool_size = options['pool_size'] or concurrency
+            self.stdout.write(
+                f'{total} add-to-cart requests, Book Service delay {options["delay"] * 1000:.0f}ms, '
+                f'every request calls Book Service'
+            )
+            try:
+                book_cache.clear()
+                wsgi = self.run_wsgi(total, options['workers'])
+                self.report(f'WSGI, {options["workers"]} workers', total, wsgi)
+
+                # Như khi chạy bằng uvicorn: asgi.py đặt DJANGO_ASGI, client giữ kết nối keep-alive
+                from cart_service.asgi import application
+                async_book_client.keep_alive = True
+                book_cache.clear()
+                asgi = asyncio.run(self.run_async(
+                    self.asgi_post(application), total, concurrency, FIRST_CUSTOMER_ID + total))
+                self.report(f'ASGI async, {concurrency} concurrent', total, asgi)
+            finally:
+                (book_client.base_url, async_book_client.base_url, async_book_client.pool_size,
+                 async_book_client.keep_alive) = saved
+                book_cache.clear()
+                Cart.objects.filter(customer_id__gte=FIRST_CUSTOMER_ID).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'ASGI async served {wsgi["elapsed"] / asgi["elapsed"]:.1f}x the throughput of '
+            f'{options["workers"]} blocking workers'
+        ))
+
+    @staticmethod
+    def body(index, customer_id):
+        return json.dumps({'customer_id': customer_id + index % 20, 'book_id': FIRST_BOOK_ID + index})
+
+    def run_wsgi(self, total, workers):
+        local = threading.local()
+
+        def add(index):
+            if not hasattr(local, 'client'):
+                local.client = Client(SERVER_NAME='localhost')
+            start = time.perf_counter()
+            response = local.client.post('/api/cart/add/', self.body(index, FIRST_CUSTOMER_ID),
+                                         content_type='application/json')
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(add, range(total)))
+        return {'elapsed': time.perf_counter() - start, 'results': results}
+
+    @staticmethod
+    def asgi_post(application):
+        """POST thẳng vào ASGI application trong process (không qua socket)."""
+        async def post(path, body):
+            messages = [{'type': 'http.request', 'body': body.encode(), 'more_body': False}]
+            status = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # Django chờ disconnect song song với view: client không ngắt kết nối
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            await application({
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+                'headers': [(b'host', b'localhost'), (b'content-type', b'application/json')],
+                'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+            }, receive, send)
+            return status[0]
+        return contextlib.nullcontext(post)
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def http_post(url, concurrency):
+        async with aiohttp.ClientSession(url, connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+            async def post(path, body):
+                async with session.post(path, data=body, headers={'Content-Type': 'application/json'}) as response:
+                    await response.read()
+                    return response.status
+            yield post
+
+    async def run_async(self, poster, total, concurrency, customer_id=FIRST_CUSTOMER_ID):
+        semaphore = asyncio.Semaphore(concurrency)
+        async with poster as post:
+            async def add(index):
+                async with semaphore:
+                    start = time.perf_counter()
+                    status = await post('/api/cart/add/', self.body(index, customer_id))
+                    return status, (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(add(index) for index in range(total)))
+            elapsed = time.perf_counter() - start
+            await async_book_client.aclose()
+        return {'elapsed': elapsed, 'results': results}
+
+    def report(self, label, total, run):
+        latencies = sorted(latency for _, latency in run['results'])
+        errors = sum(1 for status, _ in run['results'] if status != 200)
+        self.stdout.write(
+            f'  {label:<26} {total / run["elapsed"]:7.1f} req/s  p50={latencies[len(latencies) // 2]:.0f}ms '
+            f'p95={latencies[int(len(latencies) * 0.95)]:.0f}ms max={latencies[-1]:.0f}ms errors={errors}'
+        )
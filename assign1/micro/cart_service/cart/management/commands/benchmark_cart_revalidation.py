@@ -0,0 +1,75 @@
+# micro/cart_service/cart/management/commands/benchmark_cart_revalidation.py
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from cart.service_client import BookCache, ServiceClient
+from cart.stubs import StubBookService
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmark: kiểm tra lại một giỏ hàng N dòng bằng N request '
+        '/api/books/<id>/ so với một request /api/books/batch/?ids=. Mặc định dùng '
+        'stub Book Service có độ trễ; --url để chạy với Book Service thật.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=50, help='Số dòng trong giỏ')
+        parser.add_argument('--rounds', type=int, default=20, help='Số lần kiểm tra giỏ cho mỗi cách')
+        parser.add_argument('--delay', type=float, default=0.002, help='Độ trễ mỗi request của stub (giây)')
+        parser.add_argument('--url', help='URL API sách thật, ví dụ http://127.0.0.1:8002/api/books/')
+        parser.add_argument('--first-id', type=int, default=1, help='ID sách đầu tiên (với --url)')
+
+    def handle(self, *args, **options):
+        book_ids = list(range(options['first_id'], options['first_id'] + options['lines']))
+        if options['url']:
+            self.run(options['url'], book_ids, options['rounds'], stub=None)
+            return
+        books = {book_id: {'title': f'Stub Book {book_id}', 'price': 10.0, 'stock': 100} for book_id in book_ids}
+        with StubBookService(books=books, delay=options['delay']) as stub:
+            self.run(stub.url, book_ids, options['rounds'], stub)
+
+    def run(self, url, book_ids, rounds, stub):
+        client = ServiceClient(url)
+        cache = BookCache(client)
+
+        def per_line_new_connection():
+            for book_id in book_ids:
+                requests.get(f'{url}{book_id}/', timeout=5).json()
+
+        def per_line_keep_alive():
+            for book_id in book_ids:
+                client.get(f'{book_id}/').json()
+
+        def batch():
+            cache.fetch_many(book_ids)
+
+        self.stdout.write(f'Revalidating a {len(book_ids)}-line cart, {rounds} rounds each')
+        results = {}
+        for label, func in (
+            ('per line, new connection', per_line_new_connection),
+            ('per line, keep-alive', per_line_keep_alive),
+            ('one batch request', batch),
+        ):
+            func()  # warm up
+            requests_before = stub.requests if stub else 0
+            samples = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                func()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            results[label] = sum(samples) / len(samples)
+            http_requests = f'{(stub.requests - requests_before) // rounds} requests/cart' if stub else ''
+            self.stdout.write(
+                f'  {label:<26} mean={results[label]:.2f}ms p50={samples[len(samples) // 2]:.2f}ms '
+                f'max={samples[-1]:.2f}ms {http_requests}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Batch is {results['per line, keep-alive'] / results['one batch request']:.1f}x faster than "
+            f"per-line keep-alive and {results['per line, new connection'] / results['one batch request']:.1f}x "
+            f"faster than per-line requests.get"
+        ))
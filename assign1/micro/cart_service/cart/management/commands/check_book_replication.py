@@ -0,0 +1,129 @@
+# micro/cart_service/cart/management/commands/check_book_replication.py
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from cart.events import (LocalQueueTransport, OutboxPollingTransport, apply_events, consume, lag,
+                         reset_offset)
+from cart.models import BookReplica
+from cart.service_client import BookCache, ServiceClient
+from cart.stubs import StubBookService
+from cart.views import get_book_data
+
+CONSUMER = 'check_book_replication'
+
+
+class Command(BaseCommand):
+    help = (
+        'Kiểm tra đồng bộ sách qua sự kiện với stub Book Service: áp dụng outbox, '
+        'idempotent, replay, transport local, số liệu lag, và so sánh độ trễ kiểm '
+        'tra tồn kho từ BookReplica với gọi Book Service. Dữ liệu được rollback.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help='Số lần gọi cho phần đo độ trễ')
+        parser.add_argument('--delay', type=float, default=0.002, help='Độ trễ của stub (giây)')
+
+    def expect(self, label, ok, detail=''):
+        if not ok:
+            raise CommandError(f'{label} {detail}')
+        self.stdout.write(f'  ok  {label}')
+
+    def replicas(self):
+        return {
+            replica.book_id: replica.snapshot()
+            for replica in BookReplica.objects.all()
+        }
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with StubBookService(delay=options['delay']) as stub:
+                self.check_outbox(stub)
+                self.compare_latency(stub, options['calls'])
+            self.check_local_queue()
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('book replication OK'))
+
+    def check_outbox(self, stub):
+        transport = OutboxPollingTransport(ServiceClient(stub.url, retries=0), poll_interval=0.01)
+        stub.publish_all()
+        applied = consume(transport, batch_size=30, consumer=CONSUMER)
+        replicas = self.replicas()
+        self.expect('snapshot events build the replica', applied == len(stub.books) and all(
+            replicas[book_id]['stock'] == book['stock'] and replicas[book_id]['price'] == Decimal(str(book['price']))
+            for book_id, book in stub.books.items()
+        ), f'({applied} applied, {len(replicas)} books)')
+
+        stub.update(1, price=42.5, stock=0)
+        stub.update(2, title='Renamed')
+        stub.delete(3)
+        requests_before = stub.requests
+        consume(transport, consumer=CONSUMER)
+        replicas = self.replicas()
+        self.expect('price, stock, title and delete events applied in one read',
+                    replicas[1]['price'] == Decimal('42.50') and replicas[1]['stock'] == 0
+                    and replicas[2]['title'] == 'Renamed' and replicas[3] is None
+                    and stub.requests - requests_before == 1)
+        self.expect('deleted book is not found without calling Book Service', get_book_data(3) is None)
+
+        status = lag(CONSUMER)
+        self.expect('lag reports the consumer caught up',
+                    status['events_behind'] == 0 and status['offset'] == len(stub.events)
+                    and status['apply_delay_ms'] is not None, status)
+
+        self.expect('re-delivered events are ignored', apply_events(stub.events, len(stub.events), CONSUMER) == 0)
+        reset_offset(0, consumer=CONSUMER)
+        consume(transport, consumer=CONSUMER)
+        self.expect('replay without rebuild keeps the newest version', self.replicas() == replicas)
+
+        stub.update(4, stock=7)
+        BookReplica.objects.filter(book_id=5).update(stock=-1)
+        reset_offset(0, rebuild=True, consumer=CONSUMER)
+        consume(transport, consumer=CONSUMER)
+        rebuilt = self.replicas()
+        self.expect('replay with rebuild restores every book', rebuilt[4]['stock'] == 7
+                    and rebuilt[5]['stock'] == stub.books[5]['stock'] and rebuilt[3] is None)
+
+        stub.update(6, stock=1)
+        stub.update(6, stock=2)
+        consume(transport, batch_size=1, consumer=CONSUMER)
+        self.expect('small batches catch up to head', lag(CONSUMER)['events_behind'] == 0
+                    and self.replicas()[6]['stock'] == 2)
+
+    def check_local_queue(self):
+        queue = LocalQueueTransport()
+        consumer = f'{CONSUMER}_local'
+        queue.publish(1000, payload={'title': 'Queued', 'price': '5.00', 'stock': 3})
+        consume(queue, consumer=consumer)
+        offset = lag(consumer)['offset']
+
+        threading.Timer(0.05, queue.publish, args=(1000,),
+                        kwargs={'payload': {'title': 'Queued', 'price': '6.00', 'stock': 2}}).start()
+        start = time.perf_counter()
+        queue.wait(offset, timeout=2)
+        waited = time.perf_counter() - start
+        consume(queue, consumer=consumer)
+        self.expect('local queue wakes the consumer on publish',
+                    waited < 1 and get_book_data(1000)['price'] == Decimal('6.00'), f'({waited:.3f}s)')
+
+    def compare_latency(self, stub, calls):
+        book_ids = [book_id for book_id in stub.books if book_id != 3][:50]
+        cache = BookCache(ServiceClient(stub.url))
+
+        def timed(label, func):
+            start = time.perf_counter()
+            for i in range(calls):
+                func(book_ids[i % len(book_ids)])
+            elapsed = (time.perf_counter() - start) * 1000 / calls
+            self.stdout.write(f'  {label:<34} {elapsed:.2f}ms per stock check')
+            return elapsed
+
+        requests_before = stub.requests
+        remote = timed('Book Service call (keep-alive)', cache.fetch)
+        local = timed('BookReplica (local table)', get_book_data)
+        self.expect('local stock checks make no cross-service call',
+                    stub.requests - requests_before == calls)
+        self.stdout.write(f'  local read-model {remote / local:.1f}x faster than a Book Service call')
@@ -0,0 +1,132 @@
+# micro/cart_service/cart/management/commands/check_service_client.py
+import time
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from cart.service_client import BookCache, CircuitOpenError, ServiceClient
+from cart.stubs import StubBookService
+
+
+class Command(BaseCommand):
+    help = (
+        'Kiểm tra service_client với stub Book Service chạy local: keep-alive, '
+        'retry, circuit breaker, cache stale-while-revalidate, và so sánh độ trễ '
+        'requests.get (kết nối mới mỗi lần) với client và cache.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help='Số lần gọi cho phần đo độ trễ')
+        parser.add_argument('--delay', type=float, default=0.002, help='Độ trễ của stub (giây)')
+
+    def expect(self, label, ok, detail=''):
+        if not ok:
+            raise CommandError(f'{label} {detail}')
+        self.stdout.write(f'  ok  {label}')
+
+    def handle(self, *args, **options):
+        with StubBookService() as stub:
+            self.check_keep_alive(stub)
+            self.check_retries(stub)
+            self.check_circuit_breaker(stub)
+            self.check_cache(stub)
+        with StubBookService(delay=options['delay']) as stub:
+            self.compare_latency(stub, options['calls'])
+        self.stdout.write(self.style.SUCCESS('service_client OK'))
+
+    def check_keep_alive(self, stub):
+        client = ServiceClient(stub.url)
+        for book_id in range(1, 21):
+            client.get(f'{book_id}/')
+        self.expect('20 calls over one keep-alive connection', stub.connections == 1, f'({stub.connections})')
+
+    def check_retries(self, stub):
+        client = ServiceClient(stub.url, retries=2, backoff=0.01)
+        stub.fail_next, before = 2, stub.requests
+        response = client.get('1/')
+        self.expect('two 503s retried, third attempt succeeds',
+                    response.status_code == 200 and stub.requests - before == 3)
+
+        stub.fail_next, before = 5, stub.requests
+        try:
+            client.get('1/')
+            failed = False
+        except requests.exceptions.RequestException:
+            failed = True
+        self.expect('gives up after the retry budget', failed and stub.requests - before == 3)
+        stub.fail_next = 0
+
+        before = stub.requests
+        response = client.get('9999/')
+        self.expect('404 returned without retry', response.status_code == 404 and stub.requests - before == 1)
+
+    def check_circuit_breaker(self, stub):
+        client = ServiceClient(stub.url, retries=0, failure_threshold=3, reset_timeout=0.3)
+        stub.down = True
+        for _ in range(3):
+            try:
+                client.get('1/')
+            except requests.exceptions.HTTPError:
+                pass
+        before = stub.requests
+        start = time.perf_counter()
+        try:
+            client.get('1/')
+            opened = False
+        except CircuitOpenError:
+            opened = True
+        self.expect('breaker opens after 3 failures and fails fast',
+                    opened and stub.requests == before and time.perf_counter() - start < 0.05)
+
+        stub.down = False
+        time.sleep(0.35)
+        response = client.get('1/')
+        self.expect('half-open trial call closes the breaker',
+                    response.status_code == 200 and client.breaker.state == client.breaker.CLOSED)
+
+    def check_cache(self, stub):
+        cache = BookCache(ServiceClient(stub.url, retries=0), ttl=0.2, stale_ttl=1)
+        before = stub.requests
+        first = cache.get(1)
+        cache.get(1)
+        self.expect('fresh snapshot served without calling Book Service',
+                    first['price'] == stub.books[1]['price'] and stub.requests - before == 1)
+
+        stub.books[1] = {**stub.books[1], 'price': 99.0}
+        time.sleep(0.25)
+        stale = cache.get(1)
+        for _ in range(50):
+            if not cache.refreshing:
+                break
+            time.sleep(0.01)
+        self.expect('stale snapshot served while revalidating in the background',
+                    stale['price'] != 99.0 and cache.get(1)['price'] == 99.0)
+
+        stub.down = True
+        snapshot = cache.get(1, max_age=0)
+        self.expect('last snapshot served when Book Service is down',
+                    snapshot['price'] == 99.0 and cache.stats['stale_on_error'] == 1)
+        stub.down = False
+        self.expect('unknown book is None', cache.get(9999) is None)
+
+    def compare_latency(self, stub, calls):
+        def timed(label, func):
+            start = time.perf_counter()
+            for i in range(calls):
+                func(i % 50 + 1)
+            elapsed = (time.perf_counter() - start) * 1000 / calls
+            self.stdout.write(f'  {label:<32} {elapsed:.2f}ms per call')
+            return elapsed
+
+        connections = stub.connections
+        naive = timed('requests.get (new connection)', lambda book_id: requests.get(f'{stub.url}{book_id}/', timeout=5))
+        self.stdout.write(f'  {"":<32} {stub.connections - connections} TCP connections')
+        client = ServiceClient(stub.url)
+        connections = stub.connections
+        pooled = timed('ServiceClient (keep-alive)', lambda book_id: client.get(f'{book_id}/'))
+        self.stdout.write(f'  {"":<32} {stub.connections - connections} TCP connections')
+        cache = BookCache(client)
+        cached = timed('BookCache', cache.get)
+        self.stdout.write(f'  {"":<32} {cache.stats}')
+        self.stdout.write(f'  keep-alive {naive / pooled:.1f}x, cache {naive / cached:.0f}x faster than requests.get')
@@ -0,0 +1,50 @@
+# micro/cart_service/cart/management/commands/consume_book_events.py
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cart.events import CONSUMER_NAME, consume, get_transport, lag
+
+
+class Command(BaseCommand):
+    help = (
+        'Đọc sự kiện thay đổi sách từ Book Service và cập nhật bảng BookReplica. '
+        'Chạy liên tục (mặc định) hoặc một lần với --once; in số sự kiện còn chờ và độ trễ.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Bắt kịp head rồi dừng')
+        parser.add_argument('--transport', choices=['outbox', 'local'], help='Mặc định settings.BOOK_EVENTS_TRANSPORT')
+        parser.add_argument('--batch-size', type=int, default=100, help='Số sự kiện mỗi lần đọc')
+        parser.add_argument('--poll-interval', type=float, help='Giây giữa hai lần đọc khi không có sự kiện mới')
+        parser.add_argument('--consumer', default=CONSUMER_NAME, help='Tên consumer (offset lưu riêng cho mỗi tên)')
+
+    def handle(self, *args, **options):
+        transport = get_transport(options['transport'])
+        if options['poll_interval'] is not None and hasattr(transport, 'poll_interval'):
+            transport.poll_interval = options['poll_interval']
+        consumer = options['consumer']
+        transport_name = options['transport'] or getattr(settings, 'BOOK_EVENTS_TRANSPORT', 'outbox')
+        self.stdout.write(f'Consuming book events via {transport_name} as {consumer!r}')
+
+        while True:
+            try:
+                applied = consume(transport, options['batch_size'], consumer)
+            except requests.exceptions.RequestException as e:
+                self.stderr.write(f'Cannot read book events: {e}')
+                if options['once']:
+                    raise SystemExit(1)
+                time.sleep(getattr(transport, 'poll_interval', 1.0))
+                continue
+            status = lag(consumer)
+            if applied or options['once']:
+                self.stdout.write(
+                    f"applied={applied} offset={status['offset']} head={status['head']} "
+                    f"behind={status['events_behind']} apply_delay_ms={status['apply_delay_ms']}"
+                )
+            if options['once']:
+                return
+            transport.wait(status['offset'])
@@ -0,0 +1,32 @@
+# micro/cart_service/cart/management/commands/replay_book_events.py
+from django.core.management.base import BaseCommand, CommandError
+
+from cart.events import CONSUMER_NAME, consume, get_transport, lag, reset_offset
+
+
+class Command(BaseCommand):
+    help = (
+        'Đọc lại sự kiện sách từ một offset và áp dụng lại vào BookReplica. '
+        'Sự kiện cũ hơn version hiện tại của sách được bỏ qua; --rebuild xóa '
+        'BookReplica trước để dựng lại toàn bộ.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-offset', type=int, default=0,
+                            help='Đọc lại các sự kiện có offset lớn hơn giá trị này')
+        parser.add_argument('--rebuild', action='store_true', help='Xóa toàn bộ BookReplica trước khi đọc lại')
+        parser.add_argument('--transport', choices=['outbox', 'local'], help='Mặc định settings.BOOK_EVENTS_TRANSPORT')
+        parser.add_argument('--batch-size', type=int, default=100, help='Số sự kiện mỗi lần đọc')
+        parser.add_argument('--consumer', default=CONSUMER_NAME, help='Tên consumer')
+
+    def handle(self, *args, **options):
+        if options['from_offset'] < 0:
+            raise CommandError('--from-offset must be >= 0')
+        reset_offset(options['from_offset'], options['rebuild'], options['consumer'])
+        applied = consume(get_transport(options['transport']), options['batch_size'], options['consumer'])
+        status = lag(options['consumer'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Replayed from offset {options['from_offset']}: applied={applied} offset={status['offset']} "
+            f"head={status['head']} books={status['replicated_books']}"
+        ))
@@ -41,4 +41,45 @@ class CartItem(models.Model):
     @property
     def item_total(self):
         """Tổng tiền của item này"""
-        return self.price * self.quantity
\ No newline at end of file
+        return self.price * self.quantity
+
+class BookReplica(models.Model):
+    """
+    Bản sao local của sách (title, price, stock) để thêm vào giỏ và tăng số lượng
+    mà không gọi Book Service.
+    Được cập nhật từ sự kiện outbox của Book Service (xem cart/events.py).
+    version là offset của sự kiện cuối cùng đã áp dụng: sự kiện cũ hơn bị bỏ qua.
+    """
+    book_id = models.IntegerField(unique=True)  # ID của sách từ Book Service
+    title = models.CharField(max_length=255, blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    stock = models.IntegerField(default=0)
+    deleted = models.BooleanField(default=False)  # Sách đã bị xóa ở Book Service
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Book #{self.book_id} v{self.version}"
+
+    def snapshot(self):
+        """Cùng dạng dữ liệu với BookCache.get(), hoặc None nếu sách đã bị xóa."""
+        if self.deleted:
+            return None
+        return {'id': self.book_id, 'title': self.title, 'price': self.price, 'stock': self.stock}
+
+
+class ConsumerOffset(models.Model):
+    """
+    Vị trí đã đọc của một consumer trong outbox của Book Service.
+    Được cập nhật cùng transaction với BookReplica, nên mỗi sự kiện áp dụng đúng một lần.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    offset = models.BigIntegerField(default=0)  # Offset của sự kiện cuối cùng đã áp dụng
+    head = models.BigIntegerField(default=0)  # Offset mới nhất của outbox ở lần đọc gần nhất
+    applied = models.BigIntegerField(default=0)  # Tổng số sự kiện đã áp dụng
+    last_event_at = models.DateTimeField(null=True, blank=True)  # Thời điểm ghi của sự kiện cuối
+    last_applied_at = models.DateTimeField(null=True, blank=True)
+    last_polled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.offset}/{self.head}"
@@ -0,0 +1,480 @@
+# micro/cart_service/cart/service_client.py
+"""
+HTTP client dùng chung để gọi các Service khác (Book Service, Customer Service).
+
+- Session keep-alive với connection pool: không mở TCP mới cho mỗi lần gọi
+- Retry có giới hạn với exponential backoff (chỉ cho GET, lỗi kết nối/timeout/5xx)
+- Circuit breaker: sau nhiều lỗi liên tiếp thì trả lỗi ngay thay vì chờ timeout
+- BookCache: cache snapshot sách (title/price/stock) có TTL và stale-while-revalidate
+- AsyncServiceClient: cùng cơ chế cho view async (aiohttp, chạy dưới ASGI)
+
+Mọi lỗi đều là requests.exceptions.RequestException, nên code gọi chỉ cần
+bắt một loại exception như trước (kể cả khi gọi qua AsyncServiceClient).
+"""
+import asyncio
+import contextlib
+import os
+import random
+import threading
+import time
+import weakref
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+# Mã lỗi tạm thời của server, được phép retry
+RETRY_STATUSES = {502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Circuit breaker đang mở: không gọi Service cho đến khi hết thời gian chờ."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker ba trạng thái.
+
+    closed: gọi bình thường, đếm lỗi liên tiếp
+    open: sau `failure_threshold` lỗi, từ chối mọi lần gọi trong `reset_timeout` giây
+    half-open: hết thời gian chờ thì cho một lần gọi thử; thành công thì đóng lại
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self):
+        """Raise CircuitOpenError nếu không được phép gọi."""
+        with self.lock:
+            state = self.state
+            if state == self.OPEN or (state == self.HALF_OPEN and self.trial_running):
+                raise CircuitOpenError('Circuit breaker is open')
+            if state == self.HALF_OPEN:
+                self.trial_running = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ServiceClient:
+    """
+    Client cho một Service: base_url + Session keep-alive + retry + circuit breaker.
+
+    Args:
+        base_url: URL gốc, ví dụ "http://127.0.0.1:8002/api/books/"
+        timeout: (connect, read) timeout tính bằng giây
+        retries: Số lần thử lại tối đa cho GET
+        backoff: Thời gian chờ lần retry đầu (giây), nhân đôi mỗi lần, có jitter
+        pool_size: Số kết nối keep-alive tối đa tới Service
+    """
+
+    def __init__(self, base_url, timeout=(1, 3), retries=2, backoff=0.1, pool_size=10,
+                 failure_threshold=5, reset_timeout=30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, path, **kwargs):
+        """
+        GET base_url + path, có retry và circuit breaker.
+
+        Response 4xx được trả về bình thường (không tính là lỗi của Service);
+        lỗi kết nối, timeout và 5xx được retry rồi raise RequestException.
+        """
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.HTTPError) as error:
+                self.breaker.record_failure()
+                retryable = not isinstance(error, requests.exceptions.HTTPError) or \
+                    error.response.status_code in RETRY_STATUSES
+                if attempt >= self.retries or not retryable:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random() / 2))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return response
+
+
+class AsyncServiceClient:
+    """
+    Phiên bản async của ServiceClient cho view async dưới ASGI: aiohttp với
+    connection pool, retry và circuit breaker giống hệt; lỗi được đổi sang
+    requests.exceptions.
+
+    Session của aiohttp gắn với event loop. keep_alive=True (ASGI, một loop cho
+    cả process) giữ một session cho mỗi loop; keep_alive=False (WSGI, mỗi request
+    async có loop riêng) mở và đóng session cho mỗi lần gọi.
+    """
+
+    def __init__(self, base_url, timeout=(1, 3), retries=2, backoff=0.1, pool_size=10,
+                 failure_threshold=5, reset_timeout=30, keep_alive=True):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.sessions = weakref.WeakKeyDictionary()  # event loop -> aiohttp.ClientSession
+
+    def _new_session(self):
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1]),
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+        )
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        if not self.keep_alive:
+            async with self._new_session() as session:
+                yield session
+            return
+        loop = asyncio.get_running_loop()
+        session = self.sessions.get(loop)
+        if session is None or session.closed:
+            session = self.sessions[loop] = self._new_session()
+        yield session
+
+    async def aclose(self):
+        """Đóng session của event loop hiện tại."""
+        session = self.sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def get(self, path, **kwargs):
+        """
+        GET base_url + path, có retry và circuit breaker như ServiceClient.get().
+
+        Returns:
+            (status_code, data): data là JSON của response, hoặc None nếu không phải JSON
+        """
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                async with self.session() as session:
+                    async with session.get(url, **kwargs) as response:
+                        status = response.status
+                        data = await response.json(content_type=None) if status < 500 else None
+                if status >= 500:
+                    raise requests.exceptions.HTTPError(f"{status} Server Error for url: {url}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.HTTPError) as error:
+                self.breaker.record_failure()
+                if isinstance(error, asyncio.TimeoutError):
+                    error = requests.exceptions.Timeout(f"Timeout for url: {url}")
+                elif isinstance(error, aiohttp.ClientError):
+                    error = requests.exceptions.ConnectionError(f"{error} for url: {url}")
+                retryable = not isinstance(error, requests.exceptions.HTTPError) or status in RETRY_STATUSES
+                if attempt >= self.retries or not retryable:
+                    raise error
+                await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random() / 2))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return status, data
+
+
+class BookCache:
+    """
+    Cache snapshot sách từ Book Service (title, price, stock) trong bộ nhớ.
+
+    - Còn mới (< ttl giây): trả ngay, không gọi Book Service
+    - Cũ (< ttl + stale_ttl giây): trả snapshot cũ và làm mới ở thread nền
+      (stale-while-revalidate, mỗi sách chỉ một lần làm mới cùng lúc)
+    - Quá cũ hoặc chưa có: gọi Book Service ngay
+    - Book Service lỗi mà còn snapshot chưa quá cũ: trả snapshot cũ
+
+    Vì stock có thể đã cũ vài chục giây, nó chỉ dùng để kiểm tra sơ bộ khi
+    thêm vào giỏ; giá và tồn kho thật được Book Service kiểm tra khi đặt hàng.
+    """
+
+    # Số id tối đa trong một request batch (MAX_BATCH_IDS của Book Service là 200)
+    BATCH_SIZE = 100
+
+    def __init__(self, client, ttl=30, stale_ttl=300, max_entries=10000, async_client=None):
+        self.client = client
+        self.async_client = async_client  # AsyncServiceClient cho aget()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.entries = {}  # book_id -> (snapshot, fetched_at)
+        self.refreshing = set()
+        self.tasks = set()  # task làm mới của aget(), giữ tham chiếu đến khi xong
+        self.lock = threading.Lock()
+        self.stats = {'fresh': 0, 'stale': 0, 'miss': 0, 'refresh': 0, 'stale_on_error': 0}
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def fetch(self, book_id):
+        """Gọi Book Service. Trả snapshot, hoặc None nếu sách không tồn tại."""
+        response = self.client.get(f"{book_id}/")
+        if response.status_code == 404:
+            with self.lock:
+                self.entries.pop(book_id, None)
+            return None
+        response.raise_for_status()
+        snapshot = self._snapshot(response.json(), book_id)
+        self.put(book_id, snapshot)
+        return snapshot
+
+    def fetch_many(self, book_ids):
+        """
+        Gọi GET batch/?ids=... của Book Service (tối đa BATCH_SIZE id mỗi lần).
+        Trả dict book_id -> snapshot; sách không tồn tại không có trong dict.
+        """
+        snapshots = {}
+        book_ids = list(book_ids)
+        for offset in range(0, len(book_ids), self.BATCH_SIZE):
+            chunk = book_ids[offset:offset + self.BATCH_SIZE]
+            response = self.client.get('batch/', params={'ids': ','.join(str(book_id) for book_id in chunk)})
+            response.raise_for_status()
+            data = response.json()
+            for book in data['books']:
+                snapshots[book['id']] = self._snapshot(book, book['id'])
+                self.put(book['id'], snapshots[book['id']])
+            with self.lock:
+                for book_id in data.get('missing', []):
+                    self.entries.pop(book_id, None)
+        return snapshots
+
+    @staticmethod
+    def _snapshot(data, book_id):
+        return {
+            'id': data.get('id', book_id),
+            'title': data.get('title', ''),
+            'price': data['price'],
+            'stock': data['stock'],
+        }
+
+    def put(self, book_id, snapshot, fetched_at=None):
+        with self.lock:
+            if len(self.entries) >= self.max_entries and book_id not in self.entries:
+                # Bỏ snapshot cũ nhất
+                oldest = min(self.entries, key=lambda key: self.entries[key][1])
+                del self.entries[oldest]
+            self.entries[book_id] = (snapshot, fetched_at or time.monotonic())
+
+    def _refresh(self, book_id):
+        try:
+            self.fetch(book_id)
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            with self.lock:
+                self.refreshing.discard(book_id)
+
+    def get(self, book_id, max_age=None):
+        """
+        Snapshot của sách, hoặc None nếu sách không tồn tại.
+
+        Args:
+            max_age: Tuổi tối đa (giây) được chấp nhận mà không gọi lại Book
+                Service; mặc định là ttl. max_age=0 luôn lấy dữ liệu mới.
+
+        Raises:
+            requests.exceptions.RequestException: Book Service lỗi và không có snapshot dùng được
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self.lock:
+            entry = self.entries.get(book_id)
+        if entry is not None:
+            snapshot, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < max_age:
+                self._count('fresh')
+                return snapshot
+            if age < max_age + self.stale_ttl and max_age > 0:
+                self._count('stale')
+                with self.lock:
+                    start = book_id not in self.refreshing
+                    self.refreshing.add(book_id)
+                if start:
+                    self._count('refresh')
+                    threading.Thread(target=self._refresh, args=(book_id,), daemon=True).start()
+                return snapshot
+
+        self._count('miss')
+        try:
+            return self.fetch(book_id)
+        except requests.exceptions.RequestException:
+            if entry is not None and time.monotonic() - entry[1] < self.ttl + self.stale_ttl:
+                self._count('stale_on_error')
+                return entry[0]
+            raise
+
+    def _refresh_many(self, book_ids):
+        try:
+            self.fetch_many(book_ids)
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            with self.lock:
+                self.refreshing.difference_update(book_ids)
+
+    def get_many(self, book_ids, max_age=None):
+        """
+        Snapshot của nhiều sách, với một request batch cho các sách chưa có
+        hoặc quá cũ (thay vì một request cho mỗi sách). Quy tắc giống get().
+
+        Returns:
+            dict book_id -> snapshot; sách không tồn tại không có trong dict
+        """
+        max_age = self.ttl if max_age is None else max_age
+        now = time.monotonic()
+        result, stale, missing, entries = {}, [], [], {}
+        with self.lock:
+            for book_id in dict.fromkeys(book_ids):
+                entry = entries[book_id] = self.entries.get(book_id)
+                age = now - entry[1] if entry is not None else None
+                if entry is not None and age < max_age:
+                    self.stats['fresh'] += 1
+                    result[book_id] = entry[0]
+                elif entry is not None and max_age > 0 and age < max_age + self.stale_ttl:
+                    self.stats['stale'] += 1
+                    result[book_id] = entry[0]
+                    if book_id not in self.refreshing:
+                        stale.append(book_id)
+                else:
+                    self.stats['miss'] += 1
+                    missing.append(book_id)
+            self.refreshing.update(stale)
+            if stale:
+                self.stats['refresh'] += 1
+        if stale:
+            threading.Thread(target=self._refresh_many, args=(stale,), daemon=True).start()
+
+        if missing:
+            try:
+                result.update(self.fetch_many(missing))
+            except requests.exceptions.RequestException:
+                usable = {
+                    book_id: entries[book_id][0] for book_id in missing
+                    if entries[book_id] is not None and now - entries[book_id][1] < self.ttl + self.stale_ttl
+                }
+                if len(usable) < len(missing):
+                    raise
+                self._count('stale_on_error')
+                result.update(usable)
+        return result
+
+    async def afetch(self, book_id):
+        """Giống fetch(), gọi Book Service qua async_client."""
+        status, data = await self.async_client.get(f"{book_id}/")
+        if status == 404:
+            with self.lock:
+                self.entries.pop(book_id, None)
+            return None
+        if status >= 400:
+            raise requests.exceptions.HTTPError(f"{status} Client Error for book {book_id}")
+        snapshot = self._snapshot(data, book_id)
+        self.put(book_id, snapshot)
+        return snapshot
+
+    async def _arefresh(self, book_id):
+        try:
+            await self.afetch(book_id)
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            with self.lock:
+                self.refreshing.discard(book_id)
+
+    async def aget(self, book_id, max_age=None):
+        """
+        Giống get() cho view async: không chặn event loop khi gọi Book Service,
+        làm mới snapshot cũ bằng một task thay vì thread.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self.lock:
+            entry = self.entries.get(book_id)
+        if entry is not None:
+            snapshot, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < max_age:
+                self._count('fresh')
+                return snapshot
+            if age < max_age + self.stale_ttl and max_age > 0:
+                self._count('stale')
+                with self.lock:
+                    start = book_id not in self.refreshing
+                    self.refreshing.add(book_id)
+                if start:
+                    self._count('refresh')
+                    self.tasks.add(task := asyncio.create_task(self._arefresh(book_id)))
+                    task.add_done_callback(self.tasks.discard)
+                return snapshot
+
+        self._count('miss')
+        try:
+            return await self.afetch(book_id)
+        except requests.exceptions.RequestException:
+            if entry is not None and time.monotonic() - entry[1] < self.ttl + self.stale_ttl:
+                self._count('stale_on_error')
+                return entry[0]
+            raise
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+book_client = ServiceClient(
+    getattr(settings, 'BOOK_SERVICE_URL', 'http://127.0.0.1:8002/api/books/'),
+    **getattr(settings, 'BOOK_SERVICE_CLIENT', {}),
+)
+async_book_client = AsyncServiceClient(
+    getattr(settings, 'BOOK_SERVICE_URL', 'http://127.0.0.1:8002/api/books/'),
+    keep_alive=bool(os.environ.get('DJANGO_ASGI')),  # asgi.py đặt DJANGO_ASGI
+    **getattr(settings, 'BOOK_SERVICE_CLIENT', {}),
+)
+book_cache = BookCache(
+    book_client,
+    ttl=getattr(settings, 'BOOK_CACHE_TTL', 30),
+    stale_ttl=getattr(settings, 'BOOK_CACHE_STALE_TTL', 300),
+    async_client=async_book_client,
+)
@@ -0,0 +1,148 @@
+# micro/cart_service/cart/stubs.py
+"""
+Stub Book Service chạy trong process (thread), dùng cho các lệnh kiểm tra
+và benchmark của Cart Service mà không cần chạy Book Service thật.
+
+Trả GET /api/books/<id>/, /api/books/batch/?ids= và outbox
+/api/books/events/?after= giống Book Service, HTTP/1.1 keep-alive, và cho phép giả lập độ trễ và lỗi 503.
+"""
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubBookService:
+    """
+    Args:
+        books: dict book_id -> {'title', 'price', 'stock'}
+        delay: Độ trễ (giây) thêm vào mỗi response
+    """
+
+    def __init__(self, books=None, delay=0.0):
+        self.books = books if books is not None else {
+            i: {'title': f'Stub Book {i}', 'price': 10.0 + i, 'stock': 100} for i in range(1, 101)
+        }
+        self.delay = delay
+        self.fail_next = 0       # số request tiếp theo trả 503
+        self.down = False        # luôn trả 503
+        self.connections = 0     # số kết nối TCP đã nhận
+        self.requests = 0
+        self.events = []         # outbox: sự kiện do update()/delete() ghi
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/books/'
+
+    def start(self):
+        self.server = _Server(('127.0.0.1', 0), _handler(self))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def update(self, book_id, **fields):
+        """Sửa (hoặc thêm) một sách và ghi sự kiện upsert vào outbox."""
+        with self.lock:
+            book = self.books[book_id] = {**self.books.get(book_id, {}), **fields}
+            self._record(book_id, 'upsert', {**book, 'price': str(book['price'])})
+
+    def delete(self, book_id):
+        with self.lock:
+            self.books.pop(book_id, None)
+            self._record(book_id, 'delete', {})
+
+    def publish_all(self):
+        """Ghi sự kiện upsert cho mọi sách hiện có (như lệnh publish_book_snapshot)."""
+        for book_id in list(self.books):
+            self.update(book_id)
+
+    def _record(self, book_id, event_type, payload):
+        self.events.append({
+            'offset': len(self.events) + 1,
+            'book_id': book_id,
+            'type': event_type,
+            'payload': payload,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        })
+
+    def respond(self, path):
+        """(status, body) cho một request."""
+        with self.lock:
+            self.requests += 1
+            failing = self.down or self.fail_next > 0
+            if self.fail_next > 0:
+                self.fail_next -= 1
+        if self.delay:
+            time.sleep(self.delay)
+        if failing:
+            return 503, {'error': 'Service unavailable'}
+        url = urlsplit(path)
+        if url.path == '/api/books/events/':
+            query = parse_qs(url.query)
+            after, limit = int(query.get('after', ['0'])[0]), int(query.get('limit', ['100'])[0])
+            with self.lock:
+                events = self.events[after:after + limit]
+                head = len(self.events)
+            return 200, {'events': events, 'last_offset': events[-1]['offset'] if events else after, 'head': head}
+        if url.path == '/api/books/batch/':
+            ids = [int(value) for value in parse_qs(url.query).get('ids', [''])[0].split(',') if value]
+            return 200, {
+                'books': [{'id': book_id, 'author': 'Stub', **self.books[book_id]} for book_id in ids if book_id in self.books],
+                'missing': [book_id for book_id in ids if book_id not in self.books],
+            }
+        match = re.fullmatch(r'/api/books/(\d+)/', url.path)
+        if not match:
+            return 404, {'error': 'Not found'}
+        book = self.books.get(int(match.group(1)))
+        if book is None:
+            return 404, {'error': 'Book not found'}
+        return 200, {'id': int(match.group(1)), 'author': 'Stub', **book}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Hàng đợi listen() mặc định là 5: không đủ cho benchmark nhiều kết nối đồng thời
+    request_queue_size = 128
+
+
+def _handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Header và body được ghi riêng: tắt Nagle để keep-alive không bị chờ delayed ACK
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with stub.lock:
+                stub.connections += 1
+
+        def do_GET(self):
+            status, body = stub.respond(self.path)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
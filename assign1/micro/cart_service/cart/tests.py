@@ -1,3 +1,338 @@
-from django.test import TestCase
+# micro/cart_service/cart/tests.py
+"""
+Test cho Cart Service. Lớp HTTP (requests.Session.get) được thay bằng
+FakeBookService nên không cần Book Service hay stub chạy thật.
+"""
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .events import LocalQueueTransport, apply_events, consume, lag, reset_offset
+from .models import BookReplica, Cart, CartItem
+from .service_client import BookCache, CircuitOpenError, ServiceClient, book_cache, book_client
+from .views import get_book_data
+
+
+def make_response(status, data=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(data if data is not None else {}).encode()
+    return response
+
+
+class FakeBookService:
+    """
+    Thay cho Session.get(url, ...): trả sách theo id cuối URL, batch/?ids=...,
+    503 cho `fail_next` lần gọi tiếp theo hoặc mọi lần gọi khi `down`.
+    """
+
+    def __init__(self, books=None):
+        self.books = books if books is not None else {
+            book_id: {'id': book_id, 'title': f'Book {book_id}', 'price': 10.0, 'stock': 5}
+            for book_id in range(1, 11)
+        }
+        self.requests = []
+        self.fail_next = 0
+        self.down = False
+
+    def __call__(self, url, params=None, **kwargs):
+        self.requests.append((url, params))
+        if self.down or self.fail_next:
+            self.fail_next = max(self.fail_next - 1, 0)
+            return make_response(503)
+        path = url.rstrip('/').rsplit('/', 1)[-1]
+        if path == 'batch':
+            ids = [int(book_id) for book_id in params['ids'].split(',')]
+            return make_response(200, {
+                'books': [self.books[book_id] for book_id in ids if book_id in self.books],
+                'missing': [book_id for book_id in ids if book_id not in self.books],
+            })
+        book = self.books.get(int(path))
+        return make_response(200, book) if book else make_response(404, {'error': 'Book not found'})
+
+    def install(self, client):
+        """Gắn vào client.session.get cho đến hết test."""
+        patcher = mock.patch.object(client.session, 'get', side_effect=self)
+        patcher.start()
+        return patcher
+
+
+class ServiceClientTests(SimpleTestCase):
+    def setUp(self):
+        self.service = FakeBookService()
+
+    def client_for(self, **kwargs):
+        client = ServiceClient('http://books.test/api/books/', backoff=0, **kwargs)
+        self.addCleanup(self.service.install(client).stop)
+        return client
+
+    def test_retries_server_errors_then_succeeds(self):
+        client = self.client_for(retries=2)
+        self.service.fail_next = 2
+        response = client.get('1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.service.requests), 3)
+
+    def test_gives_up_after_retry_budget(self):
+        client = self.client_for(retries=2)
+        self.service.fail_next = 5
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.get('1/')
+        self.assertEqual(len(self.service.requests), 3)
+
+    def test_connection_errors_are_retried(self):
+        client = ServiceClient('http://books.test/api/books/', retries=1, backoff=0)
+        with mock.patch.object(client.session, 'get', side_effect=[
+            requests.exceptions.ConnectionError('refused'), make_response(200, {'id': 1}),
+        ]) as get:
+            self.assertEqual(client.get('1/').json(), {'id': 1})
+        self.assertEqual(get.call_count, 2)
+
+    def test_not_found_is_returned_without_retry(self):
+        client = self.client_for(retries=2)
+        self.assertEqual(client.get('9999/').status_code, 404)
+        self.assertEqual(len(self.service.requests), 1)
+
+    def test_breaker_opens_and_fails_fast(self):
+        client = self.client_for(retries=0, failure_threshold=3, reset_timeout=60)
+        self.service.down = True
+        for _ in range(3):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                client.get('1/')
+        with self.assertRaises(CircuitOpenError):
+            client.get('1/')
+        self.assertEqual(len(self.service.requests), 3)
+        self.assertEqual(client.breaker.state, client.breaker.OPEN)
+
+    def test_half_open_trial_closes_breaker(self):
+        client = self.client_for(retries=0, failure_threshold=1, reset_timeout=0.05)
+        self.service.down = True
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.get('1/')
+        self.service.down = False
+        time.sleep(0.06)
+        self.assertEqual(client.breaker.state, client.breaker.HALF_OPEN)
+        self.assertEqual(client.get('1/').status_code, 200)
+        self.assertEqual(client.breaker.state, client.breaker.CLOSED)
+
+    def test_failed_trial_reopens_breaker(self):
+        client = self.client_for(retries=0, failure_threshold=1, reset_timeout=0.05)
+        self.service.down = True
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.get('1/')
+        time.sleep(0.06)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.get('1/')
+        with self.assertRaises(CircuitOpenError):
+            client.get('1/')
+
+
+class BookCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.service = FakeBookService()
+        client = ServiceClient('http://books.test/api/books/', retries=0)
+        self.addCleanup(self.service.install(client).stop)
+        self.cache = BookCache(client, ttl=30, stale_ttl=300)
+
+    def age(self, book_id, seconds):
+        """Làm snapshot của sách cũ đi `seconds` giây."""
+        snapshot, fetched_at = self.cache.entries[book_id]
+        self.cache.entries[book_id] = (snapshot, fetched_at - seconds)
+
+    def wait_for_refresh(self):
+        for _ in range(100):
+            if not self.cache.refreshing:
+                return
+            time.sleep(0.01)
+        self.fail('background refresh did not finish')
+
+    def test_fresh_snapshot_served_without_calling_book_service(self):
+        first = self.cache.get(1)
+        self.assertEqual(self.cache.get(1), first)
+        self.assertEqual(first, {'id': 1, 'title': 'Book 1', 'price': 10.0, 'stock': 5})
+        self.assertEqual(len(self.service.requests), 1)
+
+    def test_stale_snapshot_served_while_revalidating(self):
+        self.cache.get(1)
+        self.service.books[1] = {**self.service.books[1], 'price': 99.0}
+        self.age(1, 60)
+
+        self.assertEqual(self.cache.get(1)['price'], 10.0)
+        self.wait_for_refresh()
+        self.assertEqual(self.cache.get(1)['price'], 99.0)
+        self.assertEqual(self.cache.stats['refresh'], 1)
+
+    def test_too_old_snapshot_is_fetched_again(self):
+        self.cache.get(1)
+        self.service.books[1] = {**self.service.books[1], 'price': 99.0}
+        self.age(1, 400)
+        self.assertEqual(self.cache.get(1)['price'], 99.0)
+        self.assertEqual(len(self.service.requests), 2)
+
+    def test_last_snapshot_served_when_book_service_is_down(self):
+        self.cache.get(1)
+        self.service.down = True
+        self.assertEqual(self.cache.get(1, max_age=0)['price'], 10.0)
+        self.assertEqual(self.cache.stats['stale_on_error'], 1)
+
+    def test_error_without_usable_snapshot_is_raised(self):
+        self.service.down = True
+        with self.assertRaises(requests.exceptions.RequestException):
+            self.cache.get(1)
+
+    def test_unknown_book_is_none(self):
+        self.assertIsNone(self.cache.get(9999))
+
+
+class CartRevalidationTests(TestCase):
+    """Kiểm tra lại giỏ hàng bằng request batch thay vì một request cho mỗi dòng."""
+
+    def setUp(self):
+        self.service = FakeBookService()
+        self.addCleanup(self.service.install(book_client).stop)
+        book_cache.clear()
+        self.addCleanup(book_cache.clear)
+
+    def test_get_many_uses_one_batch_request(self):
+        cache = BookCache(book_client)
+        books = cache.get_many([1, 2, 3, 9999])
+        self.assertEqual(sorted(books), [1, 2, 3])
+        self.assertEqual(len(self.service.requests), 1)
+        self.assertTrue(self.service.requests[0][0].endswith('batch/'))
+
+        cache.get_many([1, 2, 3])
+        self.assertEqual(len(self.service.requests), 1)
+
+    def test_get_many_splits_large_carts_into_batches(self):
+        self.service.books = {
+            book_id: {'id': book_id, 'title': f'Book {book_id}', 'price': 10.0, 'stock': 5}
+            for book_id in range(1, 251)
+        }
+        books = BookCache(book_client).get_many(range(1, 251))
+        self.assertEqual(len(books), 250)
+        self.assertEqual(len(self.service.requests), 3)
+
+    def test_validate_cart_updates_snapshots_in_one_request(self):
+        cart = Cart.objects.create(customer_id=1)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, book_id=1, book_title='Book 1', quantity=9, price=Decimal('10.00')),
+            CartItem(cart=cart, book_id=2, book_title='Book 2', quantity=1, price=Decimal('10.00')),
+            CartItem(cart=cart, book_id=9999, book_title='Gone', quantity=1, price=Decimal('10.00')),
+        ])
+        self.service.books[2] = {**self.service.books[2], 'title': 'Renamed', 'price': 12.5}
+
+        response = self.client.post('/api/cart/1/validate/')
+
+        data = response.json()
+        statuses = {item['book_id']: item['status'] for item in data['items']}
+        self.assertEqual(statuses, {1: 'out_of_stock', 2: 'ok', 9999: 'not_found'})
+        self.assertFalse(data['valid'])
+        self.assertEqual(data['updated_items'], 1)
+        self.assertEqual(len(self.service.requests), 1)
+        item = CartItem.objects.get(cart=cart, book_id=2)
+        self.assertEqual((item.book_title, item.price), ('Renamed', Decimal('12.50')))
+
+    def test_validate_cart_reports_book_service_errors(self):
+        cart = Cart.objects.create(customer_id=1)
+        CartItem.objects.create(cart=cart, book_id=1, book_title='Book 1', quantity=1, price=Decimal('10.00'))
+        self.service.down = True
+        response = self.client.post('/api/cart/1/validate/')
+        self.assertEqual(response.status_code, 503)
+
+
+@override_settings(BOOK_REPLICA_MAX_AGE=300)
+class BookReplicationTests(TestCase):
+    """Đồng bộ BookReplica từ sự kiện (hàng đợi local, cùng dạng với outbox của Book Service)."""
+
+    def setUp(self):
+        self.queue = LocalQueueTransport()
+        self.service = FakeBookService()
+        self.addCleanup(self.service.install(book_client).stop)
+        book_cache.clear()
+        self.addCleanup(book_cache.clear)
+        for book_id, book in self.service.books.items():
+            self.queue.publish(book_id, payload=book)
+        consume(self.queue)
+
+    def replicas(self):
+        return {replica.book_id: replica.snapshot() for replica in BookReplica.objects.all()}
+
+    def test_snapshot_events_build_the_replica(self):
+        replicas = self.replicas()
+        self.assertEqual(len(replicas), len(self.service.books))
+        self.assertEqual(replicas[1], {'id': 1, 'title': 'Book 1', 'price': Decimal('10.00'), 'stock': 5})
+        self.assertEqual(lag()['events_behind'], 0)
+
+    def test_update_and_delete_events_are_applied(self):
+        self.queue.publish(1, payload={'title': 'Book 1', 'price': 42.5, 'stock': 0})
+        self.queue.publish(2, payload={'title': 'Renamed', 'price': 10.0, 'stock': 5})
+        self.queue.publish(3, 'delete')
+        self.assertEqual(consume(self.queue), 3)
+
+        replicas = self.replicas()
+        self.assertEqual((replicas[1]['price'], replicas[1]['stock']), (Decimal('42.50'), 0))
+        self.assertEqual(replicas[2]['title'], 'Renamed')
+        self.assertIsNone(replicas[3])
+
+    def test_replica_reads_make_no_cross_service_call(self):
+        self.queue.publish(3, 'delete')
+        consume(self.queue)
+        self.assertEqual(get_book_data(1)['stock'], 5)
+        self.assertIsNone(get_book_data(3))
+        self.assertEqual(self.service.requests, [])
+
+    def test_book_without_replica_is_read_from_book_service(self):
+        BookReplica.objects.filter(book_id=1).delete()
+        self.assertEqual(get_book_data(1)['price'], 10.0)
+        self.assertEqual(len(self.service.requests), 1)
+
+    def test_replica_older_than_max_age_is_read_from_book_service(self):
+        # Sự kiện đổi giá bị bỏ qua (transaction commit chậm hơn EVENT_SETTLE_SECONDS)
+        self.service.books[1] = {**self.service.books[1], 'price': 12.0}
+        BookReplica.objects.filter(book_id=1).update(updated_at=timezone.now() - timedelta(seconds=301))
+        self.assertEqual(get_book_data(1)['price'], 12.0)
+        self.assertEqual(len(self.service.requests), 1)
+
+    def test_redelivered_events_are_ignored(self):
+        self.assertEqual(apply_events(self.queue.log, len(self.queue.log)), 0)
+
+    def test_replay_without_rebuild_keeps_the_newest_version(self):
+        self.queue.publish(1, payload={'title': 'Book 1', 'price': 42.5, 'stock': 0})
+        consume(self.queue)
+        replicas = self.replicas()
+        reset_offset(0)
+        consume(self.queue)
+        self.assertEqual(self.replicas(), replicas)
+
+    def test_replay_with_rebuild_restores_every_book(self):
+        self.queue.publish(4, payload={'title': 'Book 4', 'price': 10.0, 'stock': 7})
+        consume(self.queue)
+        BookReplica.objects.filter(book_id=5).update(stock=-1)
+        reset_offset(0, rebuild=True)
+        consume(self.queue)
+        replicas = self.replicas()
+        self.assertEqual((replicas[4]['stock'], replicas[5]['stock']), (7, 5))
+
+    def test_small_batches_catch_up_to_head(self):
+        self.queue.publish(6, payload={'title': 'Book 6', 'price': 10.0, 'stock': 1})
+        self.queue.publish(6, payload={'title': 'Book 6', 'price': 10.0, 'stock': 2})
+        consume(self.queue, batch_size=1)
+        self.assertEqual(lag()['events_behind'], 0)
+        self.assertEqual(self.replicas()[6]['stock'], 2)
+
+    def test_local_queue_wakes_the_consumer_on_publish(self):
+        offset = len(self.queue.log)
+        threading.Timer(0.05, self.queue.publish, args=(1000,),
+                        kwargs={'payload': {'title': 'Queued', 'price': '6.00', 'stock': 2}}).start()
+        start = time.perf_counter()
+        self.queue.wait(offset, timeout=2)
+        self.assertLess(time.perf_counter() - start, 1)
+        consume(self.queue)
+        self.assertEqual(get_book_data(1000)['price'], Decimal('6.00'))
@@ -2,25 +2,54 @@
 """
 Views cho Cart Service - Quản lý giỏ hàng
 Giao tiếp với Book Service và Customer Service qua HTTP API
+
+add_to_cart_api, get_cart_api và update_cart_item_api là view async: chạy dưới
+ASGI (uvicorn cart_service.asgi:application), một worker phục vụ nhiều request
+cùng lúc trong khi chờ Book Service, thay vì bị chặn như view sync dưới WSGI.
 """
 import requests
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
+from decimal import Decimal
+from .events import fresh_replicas, lag
 from .models import Cart, CartItem
+from .service_client import book_cache
 
-# URLs của các Service khác
-BOOK_SERVICE_URL = "http://127.0.0.1:8002/api/books/"
+# URLs của các Service khác (Book Service: settings.BOOK_SERVICE_URL, gọi qua service_client)
 CUSTOMER_SERVICE_URL = "http://127.0.0.1:8001/api/customers/"
 
 
+def get_book_data(book_id):
+    """
+    Snapshot sách (title, price, stock), hoặc None nếu sách không tồn tại.
+    Đọc bảng BookReplica local (được đồng bộ qua sự kiện), chỉ gọi Book Service
+    khi sách chưa được đồng bộ hoặc bản sao cũ hơn settings.BOOK_REPLICA_MAX_AGE giây.
+
+    Raises:
+        requests.exceptions.RequestException: phải gọi Book Service và bị lỗi
+    """
+    replica = fresh_replicas().filter(book_id=book_id).first()
+    if replica is not None:
+        return replica.snapshot()
+    return book_cache.get(book_id)
+
+
+async def aget_book_data(book_id):
+    """Giống get_book_data() cho view async (async ORM, gọi Book Service qua aiohttp)."""
+    replica = await fresh_replicas().filter(book_id=book_id).afirst()
+    if replica is not None:
+        return replica.snapshot()
+    return await book_cache.aget(book_id)
+
+
 @csrf_exempt
-def add_to_cart_api(request):
+async def add_to_cart_api(request):
     """
     API: Thêm sách vào giỏ hàng.
     Logic:
     1. Nhận customer_id và book_id từ request body
-    2. Gọi API đến Book Service để kiểm tra tồn kho và lấy giá
+    2. Kiểm tra tồn kho và lấy giá từ bảng sách local (hoặc Book Service nếu chưa đồng bộ)
     3. Lưu vào database của Cart Service
     """
     if request.method == 'POST':
@@ -37,17 +66,15 @@ def add_to_cart_api(request):
                     'error': 'customer_id and book_id are required'
                 }, status=400)
 
-            # 1. Gọi API sang Book Service để lấy thông tin sách
+            # 1. Lấy thông tin sách từ bảng BookReplica local, hoặc Book Service (qua cache snapshot)
             try:
-                book_response = requests.get(f"{BOOK_SERVICE_URL}{book_id}/", timeout=5)
-                if book_response.status_code != 200:
+                book_data = await aget_book_data(book_id)
+                if book_data is None:
                     return JsonResponse({
                         'success': False, 
                         'error': 'Book not found in Book Service'
                     }, status=404)
                 
-                book_data = book_response.json()
-                
                 # Kiểm tra tồn kho
                 if book_data['stock'] < quantity:
                     return JsonResponse({
@@ -62,16 +89,16 @@ def add_to_cart_api(request):
                 }, status=503)
 
             # 2. Xử lý Logic Giỏ hàng - Lưu vào Database của Cart Service
-            cart, _ = Cart.objects.get_or_create(customer_id=customer_id)
+            cart, _ = await Cart.objects.aget_or_create(customer_id=customer_id)
             
             # Kiểm tra xem sách đã có trong giỏ chưa
-            existing_item = CartItem.objects.filter(cart=cart, book_id=book_id).first()
+            existing_item = await CartItem.objects.filter(cart=cart, book_id=book_id).afirst()
             if existing_item:
                 existing_item.quantity += quantity
-                existing_item.save()
+                await existing_item.asave()
                 message = f"Updated quantity to {existing_item.quantity}"
             else:
-                CartItem.objects.create(
+                await CartItem.objects.acreate(
                     cart=cart,
                     book_id=book_id,
                     quantity=quantity,
@@ -95,16 +122,16 @@ def add_to_cart_api(request):
     return JsonResponse({'error': 'Method not allowed'}, status=405)
 
 
-def get_cart_api(request, customer_id):
+async def get_cart_api(request, customer_id):
     """
     API: Lấy thông tin giỏ hàng của khách hàng.
     """
     try:
-        cart = Cart.objects.get(customer_id=customer_id)
+        cart = await Cart.objects.aget(customer_id=customer_id)
         items_data = []
         total = 0
         
-        for item in cart.items.all():
+        async for item in cart.items.all():
             item_total = float(item.price) * item.quantity
             total += item_total
             items_data.append({
@@ -135,7 +162,73 @@ def get_cart_api(request, customer_id):
 
 
 @csrf_exempt
-def update_cart_item_api(request):
+def validate_cart_api(request, customer_id):
+    """
+    API: Kiểm tra lại tất cả item trong giỏ với Book Service trước khi thanh toán.
+    Chỉ một request batch cho cả giỏ (không phải một request cho mỗi item).
+    Cập nhật snapshot giá/tên đã thay đổi và báo item hết hàng hoặc không còn tồn tại.
+    Chỉ nhận POST vì có ghi vào giỏ hàng.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    items = list(CartItem.objects.filter(cart__customer_id=customer_id))
+    try:
+        books = book_cache.get_many([item.book_id for item in items], max_age=0)
+    except requests.exceptions.RequestException as e:
+        return JsonResponse({
+            'success': False, 
+            'error': f'Cannot connect to Book Service: {str(e)}'
+        }, status=503)
+
+    changed = []
+    items_data = []
+    total = 0
+    for item in items:
+        book = books.get(item.book_id)
+        if book is None:
+            status = 'not_found'
+        else:
+            price = Decimal(str(book['price']))
+            if item.price != price or item.book_title != book['title']:
+                item.price = price
+                item.book_title = book['title']
+                changed.append(item)
+            status = 'ok' if book['stock'] >= item.quantity else 'out_of_stock'
+        item_total = float(item.price) * item.quantity
+        total += item_total
+        items_data.append({
+            'id': item.id,
+            'book_id': item.book_id,
+            'book_title': item.book_title,
+            'quantity': item.quantity,
+            'price': float(item.price),
+            'item_total': item_total,
+            'stock': book['stock'] if book else 0,
+            'status': status
+        })
+    CartItem.objects.bulk_update(changed, ['price', 'book_title'])
+
+    return JsonResponse({
+        'success': True,
+        'customer_id': customer_id,
+        'valid': all(item['status'] == 'ok' for item in items_data),
+        'items': items_data,
+        'updated_items': len(changed),
+        'total_price': total,
+        'item_count': len(items_data)
+    })
+
+
+def replication_status_api(request):
+    """
+    API: Trạng thái đồng bộ sách từ Book Service (offset, số sự kiện còn chờ, độ trễ).
+    """
+    return JsonResponse({'success': True, **lag()})
+
+
+@csrf_exempt
+async def update_cart_item_api(request):
     """
     API: Cập nhật số lượng item trong giỏ hàng.
     """
@@ -145,20 +238,16 @@ def update_cart_item_api(request):
             item_id = data.get('item_id')
             action = data.get('action')  # 'increase' hoặc 'decrease'
             
-            cart_item = CartItem.objects.get(id=item_id)
+            cart_item = await CartItem.objects.aget(id=item_id)
             
             if action == 'increase':
                 # Kiểm tra tồn kho trước khi tăng
                 try:
-                    book_response = requests.get(
-                        f"{BOOK_SERVICE_URL}{cart_item.book_id}/", 
-                        timeout=5
-                    )
-                    if book_response.status_code == 200:
-                        book_data = book_response.json()
+                    book_data = await aget_book_data(cart_item.book_id)
+                    if book_data is not None:
                         if book_data['stock'] > cart_item.quantity:
                             cart_item.quantity += 1
-                            cart_item.save()
+                            await cart_item.asave()
                         else:
                             return JsonResponse({
                                 'success': False, 
@@ -173,9 +262,9 @@ def update_cart_item_api(request):
             elif action == 'decrease':
                 if cart_item.quantity > 1:
                     cart_item.quantity -= 1
-                    cart_item.save()
+                    await cart_item.asave()
                 else:
-                    cart_item.delete()
+                    await cart_item.adelete()
                     return JsonResponse({
                         'success': True, 
                         'message': 'Item removed'
@@ -3,6 +3,10 @@ ASGI config for cart_service project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Chạy: uvicorn cart_service.asgi:application --port 8003 --workers 2
+Các view async (add_to_cart_api, get_cart_api, update_cart_item_api) không
+chặn worker trong khi chờ Book Service.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +16,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cart_service.settings')
+os.environ.setdefault('DJANGO_ASGI', '1')
 
 application = get_asgi_application()
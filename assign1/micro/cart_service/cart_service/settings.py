@@ -4,6 +4,7 @@ Django settings for cart_service project.
 Service chạy trên port 8003 - Quản lý giỏ hàng
 """
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -97,9 +98,35 @@ DATABASES = {
         'PASSWORD': '123456',
         'HOST': 'localhost',
         'PORT': '3306',
+        # Giữ kết nối MySQL giữa các request (giây), ping trước khi dùng lại.
+        # Dưới ASGI mỗi request chạy ORM trong thread riêng nên không giữ kết nối (asgi.py đặt DJANGO_ASGI)
+        'CONN_MAX_AGE': 0 if os.environ.get('DJANGO_ASGI') else 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Gọi Book Service qua cart/service_client.py
+BOOK_SERVICE_URL = 'http://127.0.0.1:8002/api/books/'
+BOOK_SERVICE_CLIENT = {
+    'timeout': (1, 3),        # (connect, read) giây
+    'retries': 2,             # số lần thử lại GET khi lỗi kết nối/timeout/5xx
+    'backoff': 0.1,           # giây, nhân đôi mỗi lần retry
+    'pool_size': 10,          # kết nối keep-alive tối đa
+    'failure_threshold': 5,   # lỗi liên tiếp trước khi mở circuit breaker
+    'reset_timeout': 30,      # giây circuit breaker mở trước khi gọi thử lại
+}
+# Snapshot sách (title/price/stock): còn mới trong BOOK_CACHE_TTL giây, sau đó
+# vẫn được dùng thêm BOOK_CACHE_STALE_TTL giây trong khi làm mới ở nền
+BOOK_CACHE_TTL = 30
+BOOK_CACHE_STALE_TTL = 300
+# Đồng bộ sách sang bảng BookReplica qua sự kiện (cart/events.py, lệnh consume_book_events)
+# 'outbox': đọc GET /api/books/events/ của Book Service; 'local': hàng đợi trong process
+BOOK_EVENTS_TRANSPORT = 'outbox'
+BOOK_EVENTS_POLL_INTERVAL = 1.0  # giây giữa hai lần đọc outbox khi không có sự kiện mới
+# Bản sao BookReplica không được cập nhật quá số giây này thì đọc lại từ Book Service
+# (sự kiện có thể đã bị bỏ qua hoặc consumer đã dừng, xem cart/events.py)
+BOOK_REPLICA_MAX_AGE = 300
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
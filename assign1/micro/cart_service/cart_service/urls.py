@@ -12,6 +12,8 @@ urlpatterns = [
     # API Endpoints - Được gọi từ Frontend ở Book Service
     path('api/cart/add/', views.add_to_cart_api, name='add_to_cart'),
     path('api/cart/<int:customer_id>/', views.get_cart_api, name='get_cart'),
+    path('api/cart/<int:customer_id>/validate/', views.validate_cart_api, name='validate_cart'),
     path('api/cart/update/', views.update_cart_item_api, name='update_cart'),
     path('api/cart/remove/', views.remove_from_cart_api, name='remove_from_cart'),
+    path('api/cart/replication/', views.replication_status_api, name='replication_status'),
 ]
@@ -84,6 +84,10 @@ DATABASES = {
         'PASSWORD': '123456',       
         'HOST': 'localhost',
         'PORT': '3306',
+        # Keep connections open between requests (seconds) and ping a kept
+        # connection before its first use in a request
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
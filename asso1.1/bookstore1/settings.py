@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the timings cover every other middleware
+    'store.middleware.PerformanceMiddleware',
+    # Before the replica routing: the catalog version is read from the primary
+    'store.middleware.CatalogSyncMiddleware',
+    # Catalog reads of GET requests go to the read replica, when configured
+    'store.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,7 +62,8 @@ ROOT_URLCONF = 'bookstore1.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that also times rendering for store.perf
+        'BACKEND': 'store.perf.TimedDjangoTemplates',
         'DIRS': [
             BASE_DIR / 'store' / 'templates',
         ],
@@ -84,9 +92,108 @@ DATABASES = {
         'PASSWORD': '123456',       
         'HOST': 'localhost',
         'PORT': '3306',
+        # Keep connections open between requests (seconds; 0 closes them after
+        # every request) and ping a kept connection before its first use in a request
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Optional connection pool (store.db.pool): set DB_POOL_SIZE to hand out
+# connections from a per-process pool instead. Connections go back to the
+# pool at the end of each request, so CONN_MAX_AGE is 0.
+if os.environ.get('DB_POOL_SIZE'):
+    DATABASES['default'].update({
+        'ENGINE': 'store.db.backends.mysql',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.environ['DB_POOL_SIZE']),
+            'TIMEOUT': 10,
+            'MAX_IDLE': 300,
+            'HEALTH_CHECK_AFTER': 30,
+        },
+    })
+
+# Read replica (store.db.routers): set DB_REPLICA_HOST to send the catalog,
+# recommendation and report reads of GET requests to a replica. A client
+# that wrote reads from the primary for REPLICA_STICKY_SECONDS afterwards.
+REPLICA_ALIAS = 'replica'
+REPLICA_STICKY_SECONDS = 5
+REPLICA_READ_MODELS = [
+    'store.Book', 'store.Category', 'store.Author', 'store.Publisher', 'store.BookSimilarity',
+    'store.Rating', 'store.Review', 'store.DashboardSnapshot',
+    'store.DailyBookSales', 'store.DailyCategorySales', 'store.DailyAuthorSales',
+]
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES[REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', '3306'),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['store.db.routers.ReplicaRouter']
+
+
+# Book search backend (store.search). Leave unset to use MySQL FULLTEXT on
+# MySQL and the in-process inverted index on other databases.
+# BOOK_SEARCH_BACKEND = 'store.search.backends.InvertedIndexBackend'
+
+
+# Keyset (cursor) pagination for the catalog and staff order lists instead of
+# page numbers. Can also be enabled per request with ?cursor=
+CURSOR_PAGINATION = False
+
+
+# Metric of the BookSimilarity recommendation index. cooccurrence is kept up
+# to date by checkout and rating; cosine and jaccard (cart, order and rating
+# signals with a popularity fallback) are only computed by the batch job, so
+# run manage.py build_recommendations --every N (or the staff rebuild job)
+# periodically when using them.
+RECOMMENDATION_METRIC = 'cooccurrence'
+
+
+# Cache (store.cache): catalog pages, book details and dashboard stats.
+# Local memory per worker by default; set REDIS_URL (redis://host:6379/0)
+# to share it between workers (requires the redis package).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bookstore1',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+STORE_CACHE_TIMEOUT = 300
+# Catalog list pages: stock and rating changes (every sale, every rating)
+# only invalidate the book's own entries, so list pages show them once
+# this shorter timeout expires
+STORE_LIST_CACHE_TIMEOUT = 60
+
+# Seconds between checks of the shared catalog version, which tells web
+# processes to drop their search indexes and local cache after imports and
+# bulk stock updates run by the job worker (store.catalog_sync)
+CATALOG_VERSION_CHECK_INTERVAL = 1.0
+
+# Seconds before the staff dashboard recomputes its snapshot on load
+# (manage.py refresh_dashboard keeps it fresher when run periodically)
+DASHBOARD_SNAPSHOT_MAX_AGE = 300
+
+# Per-request timings (store.middleware.PerformanceMiddleware, /staff/perf/)
+STORE_PERF_ENABLED = True
+# Clients that get the Server-Timing header with DEBUG off (load tests run
+# on the server itself); logged-in staff always get it
+INTERNAL_IPS = ['127.0.0.1', '::1']
+# Recent requests kept per view for the percentiles
+STORE_PERF_SAMPLES = 500
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,6 +239,14 @@ STATICFILES_DIRS = [
 # 3. Khai báo thư mục gom file khi deploy (nếu cần sau này)
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Uploaded files (job input files, see store.jobs)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Background jobs (manage.py run_worker)
+# Seconds without a heartbeat before a running job is requeued
+JOB_STALE_AFTER = 300
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
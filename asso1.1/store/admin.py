@@ -1,12 +1,16 @@
 from django.contrib import admin
+from django.db.models import Count
 from store.models import (
-    Book, Category, Author, Publisher,
+    Book, Category, Author, Publisher, BookSimilarity,
     Customer, Rating, Address, Review, Wishlist, WishlistItem,
     Staff,
     Cart, CartItem, Order, OrderItem, Shipping, Payment, OrderHistory, Refund,
     Promotion, Coupon,
     Inventory, InventoryLog,
-    Notification
+    Notification,
+    Job,
+    DashboardSnapshot,
+    DailyBookSales, DailyCategorySales, DailyAuthorSales
 )
 
 
@@ -17,9 +21,13 @@ class AuthorAdmin(admin.ModelAdmin):
     search_fields = ('name', 'email')
     ordering = ('name',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(books_count=Count('books'))
+
     def get_books_count(self, obj):
-        return obj.books.count()
+        return obj.books_count
     get_books_count.short_description = 'Books Count'
+    get_books_count.admin_order_field = 'books_count'
 
 
 @admin.register(Publisher)
@@ -29,9 +37,13 @@ class PublisherAdmin(admin.ModelAdmin):
     list_filter = ('country',)
     ordering = ('name',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(books_count=Count('books'))
+
     def get_books_count(self, obj):
-        return obj.books.count()
+        return obj.books_count
     get_books_count.short_description = 'Books Count'
+    get_books_count.admin_order_field = 'books_count'
 
 
 @admin.register(Category)
@@ -40,17 +52,30 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('type',)
     ordering = ('type',)
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(books_count=Count('books'))
+
     def get_books_count(self, obj):
-        return obj.books.count()
+        return obj.books_count
     get_books_count.short_description = 'Books Count'
+    get_books_count.admin_order_field = 'books_count'
 
 
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
-    list_display = ('id', 'title', 'author', 'category', 'price', 'stock_quantity')
+    list_display = ('id', 'title', 'author', 'category', 'price', 'stock_quantity', 'rating_count', 'review_count')
     list_filter = ('author', 'category')
     search_fields = ('title', 'author')
     ordering = ('title',)
+    readonly_fields = ('rating_count', 'rating_sum', 'review_count', 'review_avg')
+
+
+@admin.register(BookSimilarity)
+class BookSimilarityAdmin(admin.ModelAdmin):
+    list_display = ('id', 'book', 'similar_book', 'score', 'updated_at')
+    search_fields = ('book__title', 'similar_book__title')
+    raw_id_fields = ('book', 'similar_book')
+    ordering = ('book', '-score')
 
 
 @admin.register(Address)
@@ -84,7 +109,7 @@ class StaffAdmin(admin.ModelAdmin):
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
-    list_display = ('id', 'customer', 'session_key', 'created_at', 'updated_at')
+    list_display = ('id', 'customer', 'session_key', 'total_items', 'total_price', 'created_at', 'updated_at')
     list_filter = ('created_at',)
     search_fields = ('customer__name', 'session_key')
 
@@ -109,6 +134,7 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ('customer__name', 'staff__name')
     inlines = [OrderItemInline]
     ordering = ('-created_at',)
+    list_select_related = ('customer', 'staff')
 
 
 @admin.register(OrderItem)
@@ -116,6 +142,7 @@ class OrderItemAdmin(admin.ModelAdmin):
     list_display = ('id', 'order', 'book', 'quantity', 'price')
     list_filter = ('order__status',)
     search_fields = ('book__title', 'order__id')
+    list_select_related = ('order__customer', 'book')
 
 
 @admin.register(Shipping)
@@ -140,6 +167,18 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ('rating', 'is_verified_purchase', 'is_approved', 'created_at')
     search_fields = ('customer__name', 'book__title', 'title', 'content')
     ordering = ('-created_at',)
+    actions = ('approve_reviews', 'reject_reviews')
+
+    @admin.action(description='Approve selected reviews')
+    def approve_reviews(self, request, queryset):
+        # One save per review so Book's review columns stay in sync
+        for review in queryset.filter(is_approved=False):
+            review.approve()
+
+    @admin.action(description='Withdraw approval of selected reviews')
+    def reject_reviews(self, request, queryset):
+        for review in queryset.filter(is_approved=True):
+            review.reject()
 
 
 @admin.register(Wishlist)
@@ -214,3 +253,47 @@ class RefundAdmin(admin.ModelAdmin):
     list_filter = ('status', 'reason', 'created_at')
     search_fields = ('order__id', 'reason_details')
     ordering = ('-created_at',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'message', 'worker', 'attempts', 'created_by', 'created_at')
+    list_filter = ('kind', 'status', 'created_at')
+    search_fields = ('message', 'worker')
+    ordering = ('-created_at',)
+    readonly_fields = ('started_at', 'heartbeat_at', 'finished_at')
+
+
+@admin.register(DashboardSnapshot)
+class DashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('refreshed_at', 'total_books', 'low_stock_books', 'out_of_stock', 'pending_orders', 'total_orders', 'refresh_seconds')
+    readonly_fields = ('refreshed_at', 'refresh_seconds')
+
+
+# ============== Analytics Domain ==============
+@admin.register(DailyBookSales)
+class DailyBookSalesAdmin(admin.ModelAdmin):
+    list_display = ('date', 'book', 'quantity', 'revenue', 'orders')
+    list_filter = ('date',)
+    search_fields = ('book__title',)
+    date_hierarchy = 'date'
+    ordering = ('-date', '-quantity')
+    raw_id_fields = ('book',)
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(admin.ModelAdmin):
+    list_display = ('date', 'category', 'quantity', 'revenue', 'orders')
+    list_filter = ('date', 'category')
+    date_hierarchy = 'date'
+    ordering = ('-date', '-revenue')
+
+
+@admin.register(DailyAuthorSales)
+class DailyAuthorSalesAdmin(admin.ModelAdmin):
+    list_display = ('date', 'author', 'quantity', 'revenue', 'orders')
+    list_filter = ('date',)
+    search_fields = ('author__name',)
+    date_hierarchy = 'date'
+    ordering = ('-date', '-quantity')
+    raw_id_fields = ('author',)
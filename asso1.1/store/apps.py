@@ -5,3 +5,9 @@ class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
     verbose_name = 'Bookstore'
+
+    def ready(self):
+        # Register model signal handlers
+        import store.signals  # noqa: F401
+        # Count database connections and their reuse
+        import store.db.metrics  # noqa: F401
@@ -0,0 +1 @@
+# Benchmarks Package - Synthetic data, timing helpers and shopper journey load tests
@@ -0,0 +1,314 @@
+"""
+Shopper journey load test: browse -> search -> detail -> add to cart ->
+checkout through the real URLconf.
+
+Each journey is a sequence of named steps; every request is timed and its
+SQL queries counted, so a regression in recommend_books (book detail) or
+checkout_process shows up as a slower step or a higher query count.
+
+Two drivers send the requests:
+
+* ClientDriver: the Django test client, in process. Queries are counted
+  with connection.execute_wrapper, and the run can stay inside a rolled
+  back transaction.
+* HttpDriver: plain HTTP against a running server (runserver, gunicorn).
+  Queries are read from the Server-Timing header of PerformanceMiddleware,
+  so they are only available with settings.STORE_PERF_ENABLED and when the
+  server sends the header (DEBUG on, or a client in settings.INTERNAL_IPS).
+"""
+import http.cookiejar
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from store.benchmarks.timing import percentile, summarize
+from store.models import Book, Customer
+
+
+# Password of the customers created by synthetic.seed_catalog
+PASSWORD = 'benchmark'
+STEPS = (
+    'login', 'browse', 'search', 'autocomplete', 'detail',
+    'add_to_cart', 'cart', 'checkout_page', 'checkout',
+)
+SORTS = ('title', '-title', 'price', '-price', 'author')
+
+_SERVER_TIMING_QUERIES = re.compile(r'sql;[^,]*desc="(\d+) queries')
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook counting the queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ClientDriver:
+    """Requests through the Django test client (no redirects followed)."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def prepare(self):
+        pass
+
+    def request(self, method, path, data=None):
+        """Return (status, Location header, query count)."""
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            if method == 'POST':
+                response = self.client.post(path, data or {})
+            else:
+                response = self.client.get(path)
+        return response.status_code, response.get('Location', ''), counter.count
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpDriver:
+    """
+    Requests over HTTP with a cookie session (no redirects followed).
+
+    POSTs carry the CSRF token from the csrftoken cookie, which prepare()
+    obtains from the login page.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect()
+        )
+
+    def _csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def prepare(self):
+        self.request('GET', reverse('customer:login'))
+
+    def request(self, method, path, data=None):
+        """Return (status, Location header, query count or None)."""
+        body = None
+        headers = {'Referer': self.base_url + '/'}
+        if method == 'POST':
+            token = self._csrf_token()
+            body = urllib.parse.urlencode({**(data or {}), 'csrfmiddlewaretoken': token}).encode()
+            headers['X-CSRFToken'] = token
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                status, response_headers = response.status, response.headers
+        except urllib.error.HTTPError as error:
+            error.read()
+            status, response_headers = error.code, error.headers
+        match = _SERVER_TIMING_QUERIES.search(response_headers.get('Server-Timing', ''))
+        return status, response_headers.get('Location', ''), int(match.group(1)) if match else None
+
+
+class Fixtures:
+    """Customers, in-stock books and search terms the shoppers pick from."""
+
+    def __init__(self, emails, book_ids, authors, pages):
+        if not emails or not book_ids:
+            raise ValueError('No synthetic customers or in-stock books to run the journeys with')
+        self.emails = emails
+        self.book_ids = book_ids
+        self.authors = authors
+        self.pages = pages
+
+    @classmethod
+    def load(cls, min_stock=10):
+        """The synthetic catalog of synthetic.seed_catalog, wherever it was seeded."""
+        books = Book.objects.filter(title__startswith='Synthetic Book ', stock_quantity__gte=min_stock)
+        return cls(
+            emails=list(
+                Customer.objects.filter(email__endswith='@benchmark.local').order_by('id').values_list('email', flat=True)
+            ),
+            book_ids=list(books.order_by('id').values_list('id', flat=True)),
+            authors=sorted(set(books.values_list('author', flat=True))),
+            pages=max(1, min(5, Book.objects.count() // 12)),
+        )
+
+
+class FlowStats:
+    """Thread-safe latency and query samples per step."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.journeys = 0
+
+    def record(self, step, ms, queries, ok):
+        with self.lock:
+            self.samples[step].append(ms)
+            if queries is not None:
+                self.queries[step].append(queries)
+            if not ok:
+                self.errors[step] += 1
+
+    def journey_done(self):
+        with self.lock:
+            self.journeys += 1
+
+    def summary(self, elapsed):
+        """
+        Per-step latency percentiles, throughput and query counts.
+
+        Step throughput is requests per second of time spent in that step;
+        the totals are measured against the wall-clock time of the run.
+        """
+        steps = {}
+        for step in STEPS:
+            samples = self.samples.get(step)
+            if not samples:
+                continue
+            queries = self.queries.get(step)
+            steps[step] = {
+                'requests': len(samples),
+                'errors': self.errors.get(step, 0),
+                'rps': len(samples) * 1000 / sum(samples) if sum(samples) else 0.0,
+                'latency': summarize(samples),
+                'queries': {
+                    'mean': sum(queries) / len(queries),
+                    'p50': percentile(queries, 50),
+                    'max': max(queries),
+                } if queries else None,
+            }
+        requests = sum(len(samples) for samples in self.samples.values())
+        return {
+            'steps': steps,
+            'journeys': self.journeys,
+            'requests': requests,
+            'errors': sum(self.errors.values()),
+            'seconds': elapsed,
+            'journeys_per_second': self.journeys / elapsed if elapsed else 0.0,
+            'requests_per_second': requests / elapsed if elapsed else 0.0,
+        }
+
+
+class Shopper:
+    """One logged-in session running journeys with its own driver."""
+
+    def __init__(self, driver, email, fixtures, stats, rng):
+        self.driver = driver
+        self.email = email
+        self.fixtures = fixtures
+        self.stats = stats
+        self.rng = rng
+
+    def step(self, name, method, path, data=None, status=200, location=None):
+        start = time.perf_counter()
+        code, redirect_to, queries = self.driver.request(method, path, data)
+        ms = (time.perf_counter() - start) * 1000
+        ok = code == status and (location is None or location in redirect_to)
+        self.stats.record(name, ms, queries, ok)
+        return ok
+
+    def login(self):
+        self.driver.prepare()
+        return self.step(
+            'login', 'POST', reverse('customer:login'),
+            {'email': self.email, 'password': PASSWORD}, status=302,
+        )
+
+    def journey(self, max_lines=3):
+        rng, fixtures = self.rng, self.fixtures
+        books = reverse('book:list')
+        self.step('browse', 'GET', f"{books}?{urllib.parse.urlencode({'sort': rng.choice(SORTS), 'page': rng.randint(1, fixtures.pages)})}")
+        if fixtures.authors:
+            author = rng.choice(fixtures.authors)
+            self.step('search', 'GET', f"{books}?{urllib.parse.urlencode({'search': author})}")
+            self.step('autocomplete', 'GET', f"{reverse('book:search')}?{urllib.parse.urlencode({'q': author[:4]})}")
+
+        for book_id in rng.sample(fixtures.book_ids, min(rng.randint(1, max_lines), len(fixtures.book_ids))):
+            self.step('detail', 'GET', reverse('book:detail', args=[book_id]))
+            self.step('add_to_cart', 'POST', reverse('cart:add', args=[book_id]), {'quantity': 1},
+                      status=302, location=reverse('cart:detail'))
+
+        self.step('cart', 'GET', reverse('cart:detail'))
+        self.step('checkout_page', 'GET', reverse('cart:checkout'))
+        self.step('checkout', 'POST', reverse('cart:checkout_process'), {
+            'shipping_method': 'standard', 'address': '1 Benchmark St', 'city': 'Hanoi',
+            'postal_code': '100000', 'payment_method': 'credit_card',
+        }, status=302, location='/confirmation/')
+        self.stats.journey_done()
+
+
+def run_journeys(make_driver, fixtures, journeys, shoppers=4, concurrency=1, max_lines=3, seed=42):
+    """
+    Log `shoppers` customers in and run `journeys` journeys spread over them.
+
+    Args:
+        make_driver: Callable returning a new driver (one per shopper)
+        concurrency: Threads; shopper k runs in thread k % concurrency.
+            Must be 1 for ClientDriver inside a transaction.
+
+    Returns:
+        FlowStats.summary() of the run
+    """
+    stats = FlowStats()
+    shoppers = max(1, min(shoppers, len(fixtures.emails)))
+    group = [
+        Shopper(make_driver(), fixtures.emails[k], fixtures, stats, random.Random(seed + k))
+        for k in range(shoppers)
+    ]
+    # Journey j belongs to shopper j % shoppers
+    quota = [journeys // shoppers + (1 if k < journeys % shoppers else 0) for k in range(shoppers)]
+
+    def work(thread):
+        for k in range(thread, shoppers, concurrency):
+            if not group[k].login():
+                continue
+            for _ in range(quota[k]):
+                group[k].journey(max_lines)
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        work(0)
+    else:
+        threads = [threading.Thread(target=work, args=(thread,)) for thread in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return stats.summary(time.perf_counter() - start)
+
+
+def compare(summary, baseline, tolerance=0.5):
+    """
+    Regressions of a run against a saved summary: a step whose maximum
+    query count grew, or whose p95 latency grew by more than `tolerance`.
+    """
+    failures = []
+    for step, base in baseline['steps'].items():
+        current = summary['steps'].get(step)
+        if current is None:
+            continue
+        if current['queries'] and base['queries'] and current['queries']['max'] > base['queries']['max']:
+            failures.append(f"{step}: {current['queries']['max']} queries (baseline {base['queries']['max']})")
+        limit = base['latency']['p95'] * (1 + tolerance)
+        if base['latency']['p95'] and current['latency']['p95'] > limit:
+            failures.append(
+                f"{step}: p95 {current['latency']['p95']:.1f}ms (baseline {base['latency']['p95']:.1f}ms)"
+            )
+    return failures
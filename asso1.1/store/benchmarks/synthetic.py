@@ -0,0 +1,104 @@
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+
+from store.models import Book, Customer, Order, OrderItem, Rating, Review
+
+
+def _next_id(model):
+    """Return the first free primary key of a model (bulk_create on MySQL does not return ids)."""
+    return (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+
+
+def seed_catalog(books=1000, customers=5000, orders=10000, ratings=20000,
+                 items_per_order=3, seed=42, batch_size=5000, reviews=0):
+    """
+    Seed a synthetic catalog with skewed (long-tail) book popularity.
+
+    Returns:
+        dict with the created book and customer ids
+    """
+    rng = random.Random(seed)
+
+    first_book = _next_id(Book)
+    Book.objects.bulk_create([
+        Book(
+            id=first_book + i,
+            title=f"Synthetic Book {first_book + i}",
+            author=f"Author {rng.randint(1, max(books // 10, 1))}",
+            price=Decimal(rng.randint(500, 5000)) / 100,
+            stock_quantity=rng.randint(0, 100),
+        )
+        for i in range(books)
+    ], batch_size=batch_size)
+    book_ids = list(range(first_book, first_book + books))
+
+    password = make_password('benchmark')
+    first_customer = _next_id(Customer)
+    Customer.objects.bulk_create([
+        Customer(
+            id=first_customer + i,
+            name=f"Customer {first_customer + i}",
+            email=f"customer{first_customer + i}@benchmark.local",
+            password=password,
+        )
+        for i in range(customers)
+    ], batch_size=batch_size)
+    customer_ids = list(range(first_customer, first_customer + customers))
+
+    # Zipf-like weights so a few books are bestsellers
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, books + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+
+    def pick_books(count):
+        return set(rng.choices(book_ids, cum_weights=cum_weights, k=count))
+
+    first_order = _next_id(Order)
+    for start in range(0, orders, batch_size):
+        chunk = range(start, min(start + batch_size, orders))
+        Order.objects.bulk_create([
+            Order(
+                id=first_order + i,
+                customer_id=rng.choice(customer_ids),
+                status='confirmed',
+            )
+            for i in chunk
+        ], batch_size=batch_size)
+        OrderItem.objects.bulk_create([
+            OrderItem(order_id=first_order + i, book_id=book_id, quantity=1, price=Decimal('10.00'))
+            for i in chunk
+            for book_id in pick_books(rng.randint(1, items_per_order * 2 - 1))
+        ], batch_size=batch_size)
+
+    seen = set()
+    rating_rows = []
+    for _ in range(ratings):
+        pair = (rng.choice(customer_ids), rng.choices(book_ids, cum_weights=cum_weights)[0])
+        if pair in seen:
+            continue
+        seen.add(pair)
+        rating_rows.append(Rating(customer_id=pair[0], book_id=pair[1], score=rng.randint(1, 5)))
+    Rating.objects.bulk_create(rating_rows, batch_size=batch_size)
+
+    seen = set()
+    review_rows = []
+    for _ in range(reviews):
+        pair = (rng.choice(customer_ids), rng.choices(book_ids, cum_weights=cum_weights)[0])
+        if pair in seen:
+            continue
+        seen.add(pair)
+        review_rows.append(Review(
+            customer_id=pair[0], book_id=pair[1], rating=rng.randint(1, 5),
+            title='Synthetic review', content='Synthetic review', is_approved=rng.random() < 0.7
+        ))
+    Review.objects.bulk_create(review_rows, batch_size=batch_size)
+
+    # bulk_create bypasses Rating/Review.save(), so fill the cached columns in one pass
+    Book.refresh_rating_aggregates(Book.objects.filter(id__gte=first_book, id__lt=first_book + books))
+
+    return {'book_ids': book_ids, 'customer_ids': customer_ids}
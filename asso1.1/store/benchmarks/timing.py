@@ -0,0 +1,45 @@
+import time
+
+
+def percentile(samples, pct):
+    """Return the pct-th percentile (0-100) of a list of numbers."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(func, args_list):
+    """
+    Call func once per argument tuple and collect wall-clock timings.
+
+    Returns:
+        dict with count, mean, p50, p95, p99 and max in milliseconds
+    """
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples):
+    """Summarize millisecond samples."""
+    return {
+        'count': len(samples),
+        'mean': sum(samples) / len(samples) if samples else 0.0,
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples) if samples else 0.0,
+    }
+
+
+def format_stats(label, stats):
+    """Format a stats dict as one report line."""
+    return (
+        f"{label:<28} n={stats['count']:<6} mean={stats['mean']:.2f}ms "
+        f"p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms max={stats['max']:.2f}ms"
+    )
@@ -0,0 +1,115 @@
+"""
+Read-through cache for catalog pages, book details and staff sales reports.
+
+Values are stored through Django's cache framework (settings.CACHES):
+local memory by default, Redis when REDIS_URL is set. Keys are versioned:
+every key embeds the current version counter of each scope it depends on
+(a book, a category, the whole catalog or the order tables). Invalidation
+only bumps a counter (see store.signals), so stale entries are never read
+again and simply expire.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# Scopes a cached value can depend on
+BOOK = 'book'
+CATEGORY = 'category'
+CATALOG = 'catalog'
+ORDERS = 'orders'
+# Bumped by bulk imports, which may update any book without post_save
+IMPORTS = 'imports'
+
+_MISSING = object()
+_stats_lock = threading.Lock()
+_stats = defaultdict(Counter)
+
+
+def get_cache():
+    """The cache backing store.cache (settings.STORE_CACHE_ALIAS)."""
+    return caches[getattr(settings, 'STORE_CACHE_ALIAS', 'default')]
+
+
+def _version_key(scope, ident=None):
+    return f'store:v:{scope}' if ident is None else f'store:v:{scope}:{ident}'
+
+
+def _new_version():
+    # Never reuses a number, even if the counter itself was evicted
+    return time.time_ns()
+
+
+def get_versions(scopes):
+    """
+    Current version of each (scope, ident) pair, read in one round trip.
+    """
+    cache = get_cache()
+    keys = [_version_key(scope, ident) for scope, ident in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(scope, ident=None):
+    """Invalidate every cached value that depends on (scope, ident)."""
+    cache = get_cache()
+    key = _version_key(scope, ident)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def make_key(view, params, versions):
+    digest = hashlib.sha1(repr((params, versions)).encode()).hexdigest()
+    return f'store:{view}:{digest}'
+
+
+def cached(view, params, build, scopes=(), timeout=None):
+    """
+    Return the cached value for (view, params), building and storing it on a miss.
+
+    Args:
+        view: View name, used in the key and the hit/miss counters
+        params: Hashable description of the request (e.g. sorted GET items)
+        build: Zero-argument callable producing the value
+        scopes: (scope, ident) pairs the value depends on, e.g. [(BOOK, 5), (CATALOG, None)]
+        timeout: Seconds to keep the value (default settings.STORE_CACHE_TIMEOUT)
+    """
+    cache = get_cache()
+    key = make_key(view, params, get_versions(scopes))
+    value = cache.get(key, _MISSING)
+    hit = value is not _MISSING
+    if not hit:
+        value = build()
+        cache.set(key, value, timeout if timeout is not None else getattr(settings, 'STORE_CACHE_TIMEOUT', 300))
+    with _stats_lock:
+        _stats[view]['hits' if hit else 'misses'] += 1
+    return value
+
+
+def stats():
+    """Per-view hit/miss counters of this worker."""
+    with _stats_lock:
+        views = {
+            view: {
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'hit_rate': counts['hits'] / (counts['hits'] + counts['misses']),
+            }
+            for view, counts in sorted(_stats.items())
+        }
+    return {'backend': type(get_cache()).__name__, 'views': views}
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
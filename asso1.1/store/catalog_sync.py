@@ -0,0 +1,73 @@
+"""
+Keep each process's in-memory catalog state in step with bulk changes made
+by other processes.
+
+The search and autocomplete indexes (store.search) and the local-memory
+cache (store.cache) live in one process, and the books_imported and
+bulk stock_changed signals only reach receivers in the process that sent
+them, usually the job worker or manage.py import_books. That process bumps
+the shared CatalogVersion row (see store.signals); web processes call
+check() before serving a request (store.middleware.CatalogSyncMiddleware)
+and, when the version moved, drop their indexes (rebuilt lazily on next
+use) and their local cache entries.
+
+The database is read at most once per settings.CATALOG_VERSION_CHECK_INTERVAL
+seconds per process (0 checks on every request).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+
+from store import cache
+from store.models import CatalogVersion
+from store.search import get_autocomplete, get_search_backend
+
+_lock = threading.Lock()
+_seen = None
+_checked_at = 0.0
+
+
+def bump():
+    """Record a bulk catalog change for every other process."""
+    global _seen
+    version = CatalogVersion.bump()
+    with _lock:
+        # This process already refreshed its own state through the signals
+        _seen = version
+
+
+def check(force=False):
+    """
+    Refresh this process's indexes and local cache if another process
+    changed the catalog since the last check.
+
+    Returns:
+        True if local state was invalidated
+    """
+    global _seen, _checked_at
+    interval = getattr(settings, 'CATALOG_VERSION_CHECK_INTERVAL', 1.0)
+    now = time.monotonic()
+    if not force and now - _checked_at < interval:
+        return False
+    with _lock:
+        _checked_at = now
+        version = CatalogVersion.current()
+        # First check of the process: nothing has been loaded from an older version
+        changed = _seen is not None and version != _seen
+        _seen = version
+    if changed:
+        invalidate_local()
+    return changed
+
+
+def invalidate_local():
+    """Drop the in-process indexes and local cache entries of this process."""
+    get_search_backend().invalidate()
+    get_autocomplete().invalidate()
+    store_cache = cache.get_cache()
+    # A shared cache (Redis) already saw the other process's version bumps;
+    # a local one may hold pages of any of the changed books
+    if isinstance(store_cache, LocMemCache):
+        store_cache.clear()
@@ -0,0 +1,207 @@
+"""
+Offline batch recommendation engine.
+
+Loads CartItem, OrderItem and Rating into sparse customer x book matrices
+and computes item-to-item similarity for the whole catalog in one batch.
+Results are written to the BookSimilarity table, which recommend_books()
+serves directly. The metric written to the index is
+settings.RECOMMENDATION_METRIC:
+
+* cooccurrence (default): the scoring of the index itself
+  (BookSimilarity.compute_scores), which checkout and rating keep up to
+  date between rebuilds with record_order and record_rating:
+  4.0 order co-purchase, 2.0 co-rating (ratings of 4 or more).
+* cosine / jaccard: normalized similarities of the weighted signals
+  3.0 cart co-occurrence, 4.0 order co-purchase, 2.0 co-rating, with a
+  0.5 popularity fallback for books with too few neighbours. These cannot
+  be updated incrementally, so the index is owned by this batch job
+  (run it periodically, e.g. build_recommendations --every) and
+  record_order / record_rating leave it alone.
+"""
+import numpy as np
+from scipy import sparse
+
+from store.models import Book, BookSimilarity, CartItem, OrderItem, Rating
+
+
+CART_WEIGHT = 3.0
+ORDER_WEIGHT = BookSimilarity.ORDER_WEIGHT
+RATING_WEIGHT = BookSimilarity.RATING_WEIGHT
+POPULARITY_WEIGHT = 0.5
+HIGH_RATING = BookSimilarity.HIGH_RATING
+
+METRICS = ('cooccurrence', 'cosine', 'jaccard')
+
+
+def _interaction_matrix(owner_ids, book_ids, values, book_index):
+    """
+    Build an owner x book CSR matrix. Duplicate (owner, book) pairs are summed.
+    """
+    owner_ids = np.asarray(owner_ids, dtype=np.int64)
+    n_books = len(book_index)
+    if owner_ids.size == 0:
+        return sparse.csr_matrix((0, n_books), dtype=np.float64)
+    owners, owner_pos = np.unique(owner_ids, return_inverse=True)
+    book_pos = np.searchsorted(book_index, np.asarray(book_ids, dtype=np.int64))
+    return sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float64), (owner_pos, book_pos)),
+        shape=(len(owners), n_books)
+    )
+
+
+def _binary(matrix):
+    binary = matrix.copy()
+    binary.data = np.ones_like(binary.data)
+    return binary
+
+
+def _cosine(matrix):
+    gram = (matrix.T @ matrix).tocsr()
+    norms = np.sqrt(gram.diagonal())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    scale = sparse.diags(inverse)
+    return (scale @ gram @ scale).tocsr()
+
+
+def _jaccard(matrix):
+    binary = _binary(matrix)
+    gram = (binary.T @ binary).tocoo()
+    counts = np.asarray(binary.sum(axis=0)).ravel()
+    union = counts[gram.row] + counts[gram.col] - gram.data
+    data = np.divide(gram.data, union, out=np.zeros_like(gram.data), where=union > 0)
+    return sparse.csr_matrix((data, (gram.row, gram.col)), shape=gram.shape)
+
+
+def _cooccurrence(audience, matrix):
+    """S[b, c] = sum over owners of audience[u, b] * matrix[u, c] (recommend_books_live semantics)."""
+    return (audience.T @ matrix).tocsr()
+
+
+def load_matrices(book_index):
+    """Load the cart, order and rating signals as sparse matrices."""
+    cart_rows = np.array(list(CartItem.objects.values_list('cart_id', 'book_id')), dtype=np.int64).reshape(-1, 2)
+    order_rows = np.array(
+        list(OrderItem.objects.values_list('order__customer_id', 'book_id')), dtype=np.int64
+    ).reshape(-1, 2)
+    rating_rows = np.array(
+        list(Rating.objects.filter(score__gte=HIGH_RATING).values_list('customer_id', 'book_id', 'score')),
+        dtype=np.int64
+    ).reshape(-1, 3)
+
+    carts = _interaction_matrix(cart_rows[:, 0], cart_rows[:, 1], np.ones(len(cart_rows)), book_index)
+    orders = _interaction_matrix(order_rows[:, 0], order_rows[:, 1], np.ones(len(order_rows)), book_index)
+    ratings = _interaction_matrix(rating_rows[:, 0], rating_rows[:, 1], rating_rows[:, 2], book_index)
+    return carts, orders, ratings
+
+
+def popularity_scores(book_index):
+    """Fallback popularity: avg rating x rating count for books averaging 4 or more."""
+    rows = np.array(list(Rating.objects.values_list('book_id', 'score')), dtype=np.int64).reshape(-1, 2)
+    n_books = len(book_index)
+    if len(rows) == 0:
+        return np.zeros(n_books)
+    pos = np.searchsorted(book_index, rows[:, 0])
+    totals = np.bincount(pos, weights=rows[:, 1], minlength=n_books)
+    counts = np.bincount(pos, minlength=n_books)
+    averages = np.divide(totals, counts, out=np.zeros(n_books), where=counts > 0)
+    return np.where(averages >= HIGH_RATING, totals, 0.0)
+
+
+def similarity_matrix(carts, orders, ratings, metric='cooccurrence'):
+    """
+    Combine the weighted per-signal item similarities into one book x book
+    matrix. cooccurrence leaves carts out, like the incremental updates.
+    """
+    if metric == 'cooccurrence':
+        combined = (
+            ORDER_WEIGHT * _cooccurrence(_binary(orders), orders)
+            + RATING_WEIGHT * _cooccurrence(_binary(ratings), ratings)
+        )
+    elif metric == 'cosine':
+        combined = CART_WEIGHT * _cosine(carts) + ORDER_WEIGHT * _cosine(orders) + RATING_WEIGHT * _cosine(ratings)
+    elif metric == 'jaccard':
+        combined = CART_WEIGHT * _jaccard(carts) + ORDER_WEIGHT * _jaccard(orders) + RATING_WEIGHT * _jaccard(ratings)
+    else:
+        raise ValueError(f"Unknown similarity metric: {metric}")
+
+    combined = combined.tocsr()
+    combined.setdiag(0)
+    combined.eliminate_zeros()
+    return combined
+
+
+def top_neighbours(similarity, book_index, neighbours, popularity=None):
+    """
+    Select the top neighbours of every book (all of them when neighbours is
+    None), filling sparse rows from the popularity fallback when given.
+
+    Returns:
+        dict mapping book_id to a list of (similar_book_id, score)
+    """
+    popular = []
+    if popularity is not None and neighbours is not None:
+        popular = [pos for pos in np.argsort(-popularity) if popularity[pos] > 0][:neighbours + 1]
+    result = {}
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        cols = similarity.indices[start:end]
+        data = similarity.data[start:end]
+        if neighbours is not None and len(data) > neighbours:
+            keep = np.argpartition(-data, neighbours)[:neighbours]
+            cols, data = cols[keep], data[keep]
+        scored = dict(zip(cols.tolist(), data.tolist()))
+        if popular and len(scored) < neighbours:
+            for pos in popular:
+                if pos != row and pos not in scored:
+                    scored[pos] = popularity[pos]
+        if scored:
+            ranked = sorted(scored.items(), key=lambda x: x[1], reverse=True)[:neighbours]
+            result[int(book_index[row])] = [(int(book_index[pos]), float(score)) for pos, score in ranked]
+    return result
+
+
+def build_recommendations(metric=None, neighbours=None, write=True, progress=None):
+    """
+    Compute recommendations for the whole catalog and (optionally) write them
+    to BookSimilarity.
+
+    Args:
+        metric: cooccurrence, cosine or jaccard (default settings.RECOMMENDATION_METRIC);
+            only the configured metric can be written
+        neighbours: Neighbours kept per book with cosine / jaccard (cooccurrence keeps every pair)
+        progress: Optional callable(percent, message) called between steps
+
+    Returns:
+        (neighbours_by_book, rows_written)
+    """
+    configured = BookSimilarity.configured_metric()
+    metric = metric or configured
+    if write and metric != configured:
+        raise ValueError(
+            f"The index is built with {configured} (settings.RECOMMENDATION_METRIC), not {metric}"
+        )
+    progress = progress or (lambda percent, message: None)
+    if metric == BookSimilarity.INCREMENTAL_METRIC:
+        # Incremental deltas add to stored pairs: keep every one (see BookSimilarity)
+        neighbours = None
+    else:
+        neighbours = neighbours or BookSimilarity.NEIGHBOURS_PER_BOOK
+    progress(0, 'Loading carts, orders and ratings')
+    book_index = np.array(sorted(Book.objects.values_list('id', flat=True)), dtype=np.int64)
+    carts, orders, ratings = load_matrices(book_index)
+
+    progress(30, 'Computing item similarity')
+    similarity = similarity_matrix(carts, orders, ratings, metric=metric)
+    popularity = None
+    if metric != 'cooccurrence':
+        # Keep the fallback below a full-weight similarity on normalized metrics
+        popularity = popularity_scores(book_index)
+        if popularity.max(initial=0) > 0:
+            popularity = popularity / popularity.max() * POPULARITY_WEIGHT
+
+    progress(60, 'Ranking neighbours')
+    neighbours_by_book = top_neighbours(similarity, book_index, neighbours, popularity)
+    if write:
+        progress(80, 'Writing recommendations')
+    written = BookSimilarity.replace_index(neighbours_by_book) if write else 0
+    return neighbours_by_book, written
@@ -1,8 +1,17 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
+from django.db import transaction
 from django.db.models import Q, Count, Avg, Sum, F
-from django.core.paginator import Paginator
-from store.models import Book, CartItem, Rating, OrderItem
+from django.core.paginator import Page, Paginator
+from store import cache
+from store.models import Book, BookSimilarity, CartItem, Customer, Rating, OrderItem
+from store.search import get_autocomplete, get_search_backend
+from store.pagination import CountedPaginator, CursorPaginator, cursor_mode
+
+
+# Most popular books kept in the cached fallback list of recommend_books()
+POPULAR_POOL_SIZE = 50
 
 
 def book_list(request):
@@ -11,13 +20,11 @@ def book_list(request):
     """
     books = Book.objects.all()
     
-    # Search functionality
+    # Search functionality (relevance-ranked unless a sort is chosen)
     search_query = request.GET.get('search', '')
+    sort_by = request.GET.get('sort', 'relevance' if search_query else 'title')
     if search_query:
-        books = books.filter(
-            Q(title__icontains=search_query) |
-            Q(author__icontains=search_query)
-        )
+        books = get_search_backend().filter(books, search_query, ranked=sort_by == 'relevance')
     
     # Filter by author
     author_filter = request.GET.get('author', '')
@@ -25,14 +32,27 @@ def book_list(request):
         books = books.filter(author__icontains=author_filter)
     
     # Sort functionality
-    sort_by = request.GET.get('sort', 'title')
-    if sort_by in ['title', '-title', 'price', '-price', 'author', '-author']:
+    sortable = sort_by in ['title', '-title', 'price', '-price', 'author', '-author']
+    if sortable:
         books = books.order_by(sort_by)
     
-    # Pagination
-    paginator = Paginator(books, 12)  # 12 books per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (keyset on (sort field, id) in cursor mode), cached per catalog
+    # version; stock and rating changes show once the short list timeout expires
+    list_timeout = getattr(settings, 'STORE_LIST_CACHE_TIMEOUT', 60)
+    if sortable and cursor_mode(request):
+        id_order = '-id' if sort_by.startswith('-') else 'id'
+        page_obj = cache.cached(
+            'book_list', sorted(request.GET.items()),
+            lambda: CursorPaginator(books, (sort_by, id_order), 12).get_page(request.GET.get('cursor')),
+            scopes=[(cache.CATALOG, None)], timeout=list_timeout
+        )
+    else:
+        number, count, object_list = cache.cached(
+            'book_list', sorted(request.GET.items()),
+            lambda: _page_snapshot(Paginator(books, 12).get_page(request.GET.get('page'))),  # 12 books per page
+            scopes=[(cache.CATALOG, None)], timeout=list_timeout
+        )
+        page_obj = Page(object_list, number, CountedPaginator(books, 12, count))
     
     context = {
         'books': page_obj,
@@ -43,48 +63,94 @@ def book_list(request):
     return render(request, 'book/book_list.html', context)
 
 
+def _page_snapshot(page):
+    """Picklable (number, count, books) of a Paginator page."""
+    return page.number, page.paginator.count, list(page.object_list)
+
+
 def book_detail(request, book_id):
     """
     Display detailed information about a specific book.
     """
-    book = get_object_or_404(Book, id=book_id)
-    
-    # Get average rating
-    avg_rating = book.ratings.aggregate(avg=Avg('score'))['avg']
-    
-    # Get recommendations
-    recommended_books = recommend_books(book_id)
-    
-    context = {
-        'book': book,
-        'avg_rating': avg_rating,
-        'recommended_books': recommended_books,
-    }
+    def build():
+        book = get_object_or_404(Book, id=book_id)
+        return {
+            'book': book,
+            'avg_rating': book.get_average_score(),
+            'recommended_books': recommend_books(book_id),
+        }
+    
+    # Cached per book version; recommended books' own changes show within the timeout
+    context = cache.cached(
+        'book_detail', book_id, build, scopes=[(cache.BOOK, book_id), (cache.IMPORTS, None)]
+    )
     return render(request, 'book/book_detail.html', context)
 
 
 def book_search(request):
     """
     API endpoint for book search (AJAX).
+    Served from the in-memory autocomplete index (typo tolerant, no database query).
     """
     query = request.GET.get('q', '')
-    books = Book.objects.filter(
-        Q(title__icontains=query) |
-        Q(author__icontains=query)
-    )[:10]  # Limit results
-    
-    results = [{
-        'id': book.id,
-        'title': book.title,
-        'author': book.author,
-        'price': str(book.price),
-        'in_stock': book.is_in_stock(),
-    } for book in books]
+    results = get_autocomplete().suggest(query, limit=10)
     
     return JsonResponse({'results': results})
 
 
 def recommend_books(book_id, limit=5):
+    """
+    Recommendation lookup served from the precomputed BookSimilarity index.
+    
+    The index holds co-purchase (OrderItem) and co-rating (Rating) scores and
+    is kept up to date by checkout_process and rate_book, so a lookup is one
+    indexed read. Books without enough neighbours are topped up with popular
+    in-stock books, like the on-the-fly scoring does.
+    
+    Args:
+        book_id: The ID of the book to find recommendations for
+        limit: Maximum number of recommendations to return
+    
+    Returns:
+        List of recommended Book objects
+    """
+    recommended_books = BookSimilarity.top_for(book_id, limit=limit)
+    
+    if len(recommended_books) < limit:
+        recommended_books.extend(
+            _popular_books(limit - len(recommended_books), [b.id for b in recommended_books] + [book_id])
+        )
+    
+    return recommended_books
+
+
+def _popular_books(count, exclude_ids):
+    """Return in-stock books ranked by order and cart popularity."""
+    exclude_ids = set(exclude_ids)
+    ids = [book_id for book_id in _popular_book_ids() if book_id not in exclude_ids]
+    books = Book.objects.filter(id__in=ids, stock_quantity__gt=0).in_bulk()
+    return [books[book_id] for book_id in ids if book_id in books][:count]
+
+
+def _popular_book_ids():
+    """
+    Ids of the POPULAR_POOL_SIZE most popular in-stock books. The ranking
+    aggregates the whole catalog, so it is cached and recomputed when an
+    order changes (as the BookSimilarity index is) or the catalog is imported.
+    """
+    def build():
+        return list(
+            Book.objects.filter(
+                stock_quantity__gt=0
+            ).annotate(
+                popularity=Count('order_items') + Count('cart_items')
+            ).order_by('-popularity', 'id').values_list('id', flat=True)[:POPULAR_POOL_SIZE]
+        )
+
+    return cache.cached('popular_books', None, build, scopes=[(cache.ORDERS, None), (cache.IMPORTS, None)])
+
+
+def recommend_books_live(book_id, limit=5):
     """
     Advanced Recommendation System based on:
     1. Purchase History: "Customers who bought this also bought..."
@@ -235,15 +301,7 @@ def recommend_books(book_id, limit=5):
         existing_ids = [b.id for b in recommended_books]
         existing_ids.append(book_id)
         
-        popular_books = Book.objects.exclude(
-            id__in=existing_ids
-        ).filter(
-            stock_quantity__gt=0
-        ).annotate(
-            popularity=Count('order_items') + Count('cart_items')
-        ).order_by('-popularity')[:remaining]
-        
-        recommended_books.extend(list(popular_books))
+        recommended_books.extend(_popular_books(remaining, existing_ids))
     
     return recommended_books
 
@@ -261,11 +319,24 @@ def rate_book(request, book_id):
         if not score or not score.isdigit() or int(score) < 1 or int(score) > 5:
             return JsonResponse({'error': 'Invalid rating score'}, status=400)
         
-        rating, created = Rating.objects.update_or_create(
-            customer_id=customer_id,
-            book_id=book_id,
-            defaults={'score': int(score)}
-        )
+        # The old score, the new one and the index delta must agree: a
+        # concurrent re-rating waits for this one to commit. The customer row
+        # also serializes a first rating, which has no Rating row to lock yet.
+        with transaction.atomic():
+            list(Customer.objects.select_for_update().filter(id=customer_id).values_list('id', flat=True))
+            old_score = Rating.objects.select_for_update().filter(
+                customer_id=customer_id,
+                book_id=book_id
+            ).values_list('score', flat=True).first()
+            
+            rating, created = Rating.objects.update_or_create(
+                customer_id=customer_id,
+                book_id=book_id,
+                defaults={'score': int(score)}
+            )
+            
+            # Keep the recommendation index in sync
+            BookSimilarity.record_rating(customer_id, int(book_id), rating.score, old_score=old_score)
         
         return JsonResponse({
             'success': True,
@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.contrib import messages
+from django.core.paginator import Paginator
 from store.models import Customer, Order
 
 
@@ -124,10 +125,14 @@ def order_history(request):
     if not customer_id:
         return redirect('customer:login')
     
-    orders = Order.objects.filter(customer_id=customer_id).order_by('-created_at')
+    orders = Order.objects.for_listing().filter(customer_id=customer_id).order_by('-created_at', '-id')
+    
+    paginator = Paginator(orders, 10)
+    page_obj = paginator.get_page(request.GET.get('page'))
     
     context = {
-        'orders': orders,
+        'orders': page_obj,
+        'page_range': paginator.get_elided_page_range(page_obj.number),
     }
     return render(request, 'customer/order_history.html', context)
 
@@ -140,7 +145,7 @@ def order_detail(request, order_id):
     if not customer_id:
         return redirect('customer:login')
     
-    order = get_object_or_404(Order, id=order_id, customer_id=customer_id)
+    order = get_object_or_404(Order.objects.for_detail(), id=order_id, customer_id=customer_id)
     
     context = {
         'order': order,
@@ -1,10 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.contrib import messages
+from django.db import transaction
 from decimal import Decimal
 from store.models import (
-    Book, Customer, Cart, CartItem, 
-    Order, OrderItem, Shipping, Payment
+    Book, BookSimilarity, Customer, Cart, CartItem, 
+    Order, OrderItem, Shipping, Payment, InsufficientStockError
 )
 
 
@@ -64,8 +65,7 @@ def cart_add(request, book_id):
     quantity = int(request.POST.get('quantity', 1))
     
     # Check if book already in cart
-    cart_item, created = CartItem.objects.get_or_create(
-        cart=cart,
+    cart_item, created = cart.items.get_or_create(
         book=book,
         defaults={'quantity': quantity}
     )
@@ -91,7 +91,8 @@ def cart_update(request, item_id):
     Update quantity of a cart item.
     """
     cart = get_or_create_cart(request)
-    cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
+    # Through cart.items so the line reuses this cart and its cached totals
+    cart_item = get_object_or_404(cart.items.select_related('book'), id=item_id)
     
     if request.method == 'POST':
         quantity = int(request.POST.get('quantity', 1))
@@ -124,7 +125,8 @@ def cart_remove(request, item_id):
     Remove an item from the shopping cart.
     """
     cart = get_or_create_cart(request)
-    cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
+    # Through cart.items so the line reuses this cart and its cached totals
+    cart_item = get_object_or_404(cart.items.select_related('book'), id=item_id)
     
     book_title = cart_item.book.title
     cart_item.delete()
@@ -190,75 +192,93 @@ def checkout_process(request):
     
     cart = get_or_create_cart(request)
     
-    if cart.get_total_items() == 0:
+    # One query for every cart line joined to its book
+    items = list(cart.items.select_related('book'))
+    
+    if not items:
         messages.error(request, 'Your cart is empty')
         return redirect('cart:detail')
     
     # Get shipping info
-    shipping_method = request.POST.get('shipping_method', 'standard')
-    shipping_address = request.POST.get('address', '')
-    shipping_city = request.POST.get('city', '')
-    shipping_postal = request.POST.get('postal_code', '')
-    shipping_country = request.POST.get('country', 'Vietnam')
+    shipping_data = {
+        'method': request.POST.get('shipping_method', 'standard'),
+        'address': request.POST.get('address', ''),
+        'city': request.POST.get('city', ''),
+        'postal_code': request.POST.get('postal_code', ''),
+        'country': request.POST.get('country', 'Vietnam'),
+    }
     
     # Get payment info
     payment_method = request.POST.get('payment_method', 'credit_card')
     
-    # Validate stock availability
-    for item in cart.items.all():
-        if item.quantity > item.book.stock_quantity:
-            messages.error(request, f'Insufficient stock for "{item.book.title}"')
-            return redirect('cart:checkout')
-    
-    # Create shipping record
-    shipping = Shipping.objects.create(
-        method=shipping_method,
-        address=shipping_address,
-        city=shipping_city,
-        postal_code=shipping_postal,
-        country=shipping_country
-    )
+    try:
+        order = place_order(customer_id, cart, items, shipping_data, payment_method)
+    except InsufficientStockError as e:
+        titles = [item.book.title for item in items if item.book_id in e.book_ids]
+        messages.error(request, f'Insufficient stock for "{", ".join(titles)}"')
+        return redirect('cart:checkout')
     
-    # Calculate total
-    subtotal = cart.get_total_price()
-    total = float(subtotal) + float(shipping.cost)
+    messages.success(request, f'Order #{order.id} placed successfully!')
+    return redirect('cart:order_confirmation', order_id=order.id)
+
+
+def place_order(customer_id, cart, items, shipping_data, payment_method):
+    """
+    Checkout pipeline. Issues a constant number of queries whatever the cart size:
     
-    # Create payment record
-    payment = Payment.objects.create(
-        method=payment_method,
-        amount=total,
-        status='pending'
-    )
+    1. Reserve stock for every line in one conditional UPDATE
+    2. Insert Shipping, Payment and Order
+    3. bulk_create all OrderItems
+    4. Update the recommendation index, clear the cart, confirm
     
-    # Create order
-    order = Order.objects.create(
-        customer_id=customer_id,
-        shipping=shipping,
-        payment=payment,
-        total=total,  # Changed from total_amount to total
-        status='pending'
-    )
+    Args:
+        items: Cart lines with their books already loaded (select_related)
     
-    # Create order items and update stock
-    for cart_item in cart.items.all():
-        OrderItem.objects.create(
-            order=order,
-            book=cart_item.book,
-            quantity=cart_item.quantity,
-            price=cart_item.book.price
+    Raises:
+        InsufficientStockError: nothing is written if any book is short
+    """
+    with transaction.atomic():
+        Book.reserve_stock({item.book_id: item.quantity for item in items})
+        
+        shipping = Shipping.objects.create(**shipping_data)
+        
+        subtotal = sum(item.get_subtotal() for item in items)
+        total = float(subtotal) + float(shipping.cost)
+        
+        payment = Payment.objects.create(
+            method=payment_method,
+            amount=total,
+            status='pending'
         )
-        # Reduce stock
-        cart_item.book.reduce_stock(cart_item.quantity)
-    
-    # Clear the cart
-    cart.clear()
-    
-    # Mark payment as completed (simplified)
-    payment.mark_as_completed(transaction_id=f"TXN-{order.id}-{payment.id}")
-    order.confirm()
+        
+        order = Order.objects.create(
+            customer_id=customer_id,
+            shipping=shipping,
+            payment=payment,
+            total=total,  # Changed from total_amount to total
+            status='pending'
+        )
+        
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                book_id=item.book_id,
+                quantity=item.quantity,
+                price=item.book.price
+            )
+            for item in items
+        ])
+        
+        # Update the recommendation index with the new co-purchases
+        BookSimilarity.record_order(order, book_ids=[item.book_id for item in items])
+        
+        cart.clear()
+        
+        # Mark payment as completed (simplified)
+        payment.mark_as_completed(transaction_id=f"TXN-{order.id}-{payment.id}")
+        order.confirm()
     
-    messages.success(request, f'Order #{order.id} placed successfully!')
-    return redirect('cart:order_confirmation', order_id=order.id)
+    return order
 
 
 def order_confirmation(request, order_id):
@@ -269,7 +289,7 @@ def order_confirmation(request, order_id):
     if not customer_id:
         return redirect('customer:login')
     
-    order = get_object_or_404(Order, id=order_id, customer_id=customer_id)
+    order = get_object_or_404(Order.objects.for_detail(), id=order_id, customer_id=customer_id)
     
     context = {
         'order': order,
@@ -7,12 +7,22 @@ urlpatterns = [
     path('login/', views.login, name='login'),
     path('logout/', views.logout, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/refresh/', views.dashboard_refresh, name='dashboard_refresh'),
+    path('autocomplete/stats/', views.autocomplete_stats, name='autocomplete_stats'),
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
+    path('perf/', views.perf_stats, name='perf_stats'),
     path('books/', views.book_list, name='book_list'),
     path('books/add/', views.book_add, name='book_add'),
     path('books/<int:book_id>/edit/', views.book_edit, name='book_edit'),
     path('books/<int:book_id>/delete/', views.book_delete, name='book_delete'),
     path('books/<int:book_id>/stock/', views.stock_update, name='stock_update'),
     path('books/import/', views.book_import, name='book_import'),
+    path('books/stock/import/', views.bulk_stock_update, name='bulk_stock_update'),
     path('orders/', views.order_list, name='order_list'),
     path('orders/<int:order_id>/', views.order_detail, name='order_detail'),
+    path('reports/sales/', views.sales_report, name='sales_report'),
+    path('jobs/', views.job_list, name='job_list'),
+    path('jobs/recommendations/', views.rebuild_recommendations, name='rebuild_recommendations'),
+    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/status/', views.job_status, name='job_status'),
 ]
@@ -2,8 +2,22 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.db.models import Sum
+from django.utils import timezone
+import datetime
 from functools import wraps
-from store.models import Staff, Book, Order
+from store import cache, perf
+from store.db import metrics as db_metrics
+from store.models import (
+    Staff, Book, BookSimilarity, Order, Job, DashboardSnapshot, DailyBookSales, DailyCategorySales, DailyAuthorSales
+)
+from store.search import get_autocomplete
+from store.pagination import CursorPaginator, cursor_mode
+
+
+IMPORT_FORMATS = ('.csv', '.json')
+# Longest date range a sales report covers
+MAX_REPORT_DAYS = 366
 
 
 def staff_required(view_func):
@@ -61,26 +75,67 @@ def logout(request):
 def dashboard(request):
     """
     Staff dashboard showing overview statistics.
-    """
-    stats = {
-        'total_books': Book.objects.count(),
-        'low_stock_books': Book.objects.filter(stock_quantity__lt=10).count(),
-        'out_of_stock': Book.objects.filter(stock_quantity=0).count(),
-        'pending_orders': Order.objects.filter(status='pending').count(),
-        'total_orders': Order.objects.count(),
-    }
-    
-    recent_orders = Order.objects.order_by('-created_at')[:5]
-    low_stock_books = Book.objects.filter(stock_quantity__lt=10)[:5]
     
+    Reads the precomputed DashboardSnapshot (one primary key lookup), which
+    is recomputed when older than settings.DASHBOARD_SNAPSHOT_MAX_AGE.
+    """
+    snapshot = DashboardSnapshot.current()
     context = {
-        'stats': stats,
-        'recent_orders': recent_orders,
-        'low_stock_books': low_stock_books,
+        'stats': snapshot.stats,
+        'recent_orders': snapshot.recent_orders,
+        'low_stock_books': snapshot.low_stock_list,
+        'snapshot': snapshot,
     }
     return render(request, 'staff/dashboard.html', context)
 
 
+@staff_required
+def dashboard_refresh(request):
+    """
+    Recompute the dashboard snapshot now.
+    """
+    if request.method == 'POST':
+        DashboardSnapshot.refresh()
+        messages.success(request, 'Dashboard statistics refreshed')
+    return redirect('staff:dashboard')
+
+
+@staff_required
+def autocomplete_stats(request):
+    """
+    Hit rate and latency of this worker's book_search autocomplete index (JSON).
+    """
+    return JsonResponse(get_autocomplete().stats())
+
+
+@staff_required
+def cache_stats(request):
+    """
+    Per-view hit/miss counters of this worker's catalog cache (JSON).
+    """
+    return JsonResponse(cache.stats())
+
+
+@staff_required
+def perf_stats(request):
+    """
+    Per-view latency, SQL and template time percentiles of this worker's
+    recent requests (store.perf) and its database connection reuse
+    (store.db.metrics). ?format=json returns the raw figures.
+    """
+    if request.method == 'POST':
+        perf.reset()
+        db_metrics.reset()
+        messages.success(request, 'Performance samples cleared')
+        return redirect('staff:perf_stats')
+    
+    stats = perf.stats()
+    stats['connections'] = db_metrics.stats()
+    if request.GET.get('format') == 'json':
+        return JsonResponse(stats)
+    return render(request, 'staff/perf.html', stats)
+
+
 @staff_required
 def book_list(request):
     """
@@ -94,9 +149,12 @@ def book_list(request):
         books = books.filter(title__icontains=search) | books.filter(author__icontains=search)
     
     # Pagination
-    paginator = Paginator(books, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if cursor_mode(request):
+        page_obj = CursorPaginator(books, ('title', 'id'), 20).get_page(request.GET.get('cursor'))
+    else:
+        paginator = Paginator(books, 20)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
     
     context = {
         'books': page_obj,
@@ -236,6 +294,10 @@ def book_delete(request, book_id):
 def book_import(request):
     """
     Import books from CSV/JSON file.
+    
+    The upload is saved and imported in the background by a job worker
+    (manage.py run_worker); the page redirects to the job, which shows the
+    progress and, once finished, the per-row error report.
     """
     if request.method == 'POST':
         import_file = request.FILES.get('file')
@@ -244,64 +306,36 @@ def book_import(request):
             messages.error(request, 'Please select a file to import')
             return redirect('staff:book_import')
         
-        filename = import_file.name.lower()
-        imported_count = 0
-        errors = []
-        
-        try:
-            if filename.endswith('.csv'):
-                import csv
-                import io
-                
-                decoded_file = import_file.read().decode('utf-8')
-                reader = csv.DictReader(io.StringIO(decoded_file))
-                
-                for row in reader:
-                    try:
-                        Book.objects.create(
-                            title=row.get('title', '').strip(),
-                            author=row.get('author', '').strip(),
-                            price=float(row.get('price', 0)),
-                            stock_quantity=int(row.get('stock_quantity', row.get('stock', 0)))
-                        )
-                        imported_count += 1
-                    except Exception as e:
-                        errors.append(f"Row error: {str(e)}")
-                        
-            elif filename.endswith('.json'):
-                import json
-                
-                data = json.loads(import_file.read().decode('utf-8'))
-                books = data if isinstance(data, list) else data.get('books', [])
-                
-                for book_data in books:
-                    try:
-                        Book.objects.create(
-                            title=book_data.get('title', '').strip(),
-                            author=book_data.get('author', '').strip(),
-                            price=float(book_data.get('price', 0)),
-                            stock_quantity=int(book_data.get('stock_quantity', book_data.get('stock', 0)))
-                        )
-                        imported_count += 1
-                    except Exception as e:
-                        errors.append(f"Book error: {str(e)}")
-            else:
-                messages.error(request, 'Unsupported file format. Please use CSV or JSON.')
-                return redirect('staff:book_import')
-            
-            if imported_count > 0:
-                messages.success(request, f'Successfully imported {imported_count} books')
-            if errors:
-                messages.warning(request, f'{len(errors)} errors occurred during import')
-                
-        except Exception as e:
-            messages.error(request, f'Error processing file: {str(e)}')
+        if not import_file.name.lower().endswith(IMPORT_FORMATS):
+            messages.error(request, 'Unsupported file format. Please use CSV or JSON.')
+            return redirect('staff:book_import')
         
-        return redirect('staff:book_list')
+        job = Job.submit('import_books', input_file=import_file, created_by_id=request.session['staff_id'])
+        messages.success(request, f'Import of {import_file.name} queued')
+        return redirect('staff:job_detail', job_id=job.id)
     
     return render(request, 'staff/book_import.html')
 
 
+@staff_required
+def bulk_stock_update(request):
+    """
+    Update the stock of many books from a CSV file, as a background job.
+    """
+    if request.method == 'POST':
+        stock_file = request.FILES.get('file')
+        
+        if not stock_file or not stock_file.name.lower().endswith('.csv'):
+            messages.error(request, 'Please select a CSV file')
+            return redirect('staff:bulk_stock_update')
+        
+        job = Job.submit('bulk_stock_update', input_file=stock_file, created_by_id=request.session['staff_id'])
+        messages.success(request, f'Stock update from {stock_file.name} queued')
+        return redirect('staff:job_detail', job_id=job.id)
+    
+    return render(request, 'staff/bulk_stock_update.html')
+
+
 @staff_required
 def stock_update(request, book_id):
     """
@@ -331,7 +365,7 @@ def order_list(request):
     """
     List all orders for management.
     """
-    orders = Order.objects.all().order_by('-created_at')
+    orders = Order.objects.for_listing().order_by('-created_at')
     
     # Filter by status
     status_filter = request.GET.get('status', '')
@@ -339,12 +373,18 @@ def order_list(request):
         orders = orders.filter(status=status_filter)
     
     # Pagination
-    paginator = Paginator(orders, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_range = None
+    if cursor_mode(request):
+        page_obj = CursorPaginator(orders, ('-created_at', '-id'), 20).get_page(request.GET.get('cursor'))
+    else:
+        paginator = Paginator(orders, 20)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+        page_range = paginator.get_elided_page_range(page_obj.number)
     
     context = {
         'orders': page_obj,
+        'page_range': page_range,
         'status_filter': status_filter,
         'status_choices': Order.STATUS_CHOICES,
     }
@@ -356,7 +396,7 @@ def order_detail(request, order_id):
     """
     View and manage order details.
     """
-    order = get_object_or_404(Order, id=order_id)
+    order = get_object_or_404(Order.objects.for_detail(), id=order_id)
     
     if request.method == 'POST':
         new_status = request.POST.get('status')
@@ -372,3 +412,147 @@ def order_detail(request, order_id):
         'status_choices': Order.STATUS_CHOICES,
     }
     return render(request, 'staff/order_detail.html', context)
+
+
+@staff_required
+def job_list(request):
+    """
+    List background jobs, newest first.
+    """
+    jobs = Job.objects.select_related('created_by')
+    
+    kind_filter = request.GET.get('kind', '')
+    if kind_filter:
+        jobs = jobs.filter(kind=kind_filter)
+    
+    paginator = Paginator(jobs, 20)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    context = {
+        'jobs': page_obj,
+        'kind_filter': kind_filter,
+        'kind_choices': Job.KIND_CHOICES,
+    }
+    return render(request, 'staff/job_list.html', context)
+
+
+@staff_required
+def job_detail(request, job_id):
+    """
+    Show a job's progress (polled from job_status) and its result.
+    """
+    job = get_object_or_404(Job.objects.select_related('created_by'), id=job_id)
+    result = job.result if isinstance(job.result, dict) else {}
+    context = {
+        'job': job,
+        'summary': [
+            (name.replace('_', ' ').capitalize(), value)
+            for name, value in result.items() if name not in ('errors', 'fatal')
+        ],
+        'errors': result.get('errors', []),
+        'fatal': result.get('fatal'),
+    }
+    return render(request, 'staff/job_detail.html', context)
+
+
+@staff_required
+def job_status(request, job_id):
+    """
+    Job progress as JSON, polled by the job page.
+    """
+    job = get_object_or_404(Job, id=job_id)
+    return JsonResponse(job.as_dict())
+
+
+@staff_required
+def rebuild_recommendations(request):
+    """
+    Queue a rebuild of the recommendation index.
+    """
+    if request.method == 'POST':
+        job = Job.submit(
+            'rebuild_recommendations',
+            payload={'metric': request.POST.get('metric') or BookSimilarity.configured_metric()},
+            created_by_id=request.session['staff_id']
+        )
+        messages.success(request, 'Recommendation rebuild queued')
+        return redirect('staff:job_detail', job_id=job.id)
+    return redirect('staff:job_list')
+
+
+def _report_range(request, default_days=30):
+    """
+    Start and end dates of a report from ?start=&end= (default: the last 30 days).
+
+    Raises:
+        ValueError: The range spans more than MAX_REPORT_DAYS days
+    """
+    today = timezone.localdate()
+    try:
+        end = datetime.date.fromisoformat(request.GET.get('end', ''))
+    except ValueError:
+        end = today
+    try:
+        start = datetime.date.fromisoformat(request.GET.get('start', ''))
+    except ValueError:
+        start = end - datetime.timedelta(days=default_days - 1)
+    if start > end:
+        start, end = end, start
+    if (end - start).days >= MAX_REPORT_DAYS:
+        raise ValueError(f'Reports cover at most {MAX_REPORT_DAYS} days')
+    return start, end
+
+
+@staff_required
+def sales_report(request):
+    """
+    Sales over a date range: daily trend, top books, revenue by category
+    and top authors. Reads only the daily sales rollups.
+    """
+    try:
+        start, end = _report_range(request)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('staff:sales_report')
+    
+    def build():
+        in_range = {'date__gte': start, 'date__lte': end}
+        totals = {'quantity': Sum('quantity'), 'revenue': Sum('revenue'), 'orders': Sum('orders')}
+        
+        daily = {
+            row['date']: row
+            for row in DailyBookSales.objects.filter(**in_range).values('date').annotate(
+                quantity=Sum('quantity'), revenue=Sum('revenue')
+            )
+        }
+        trend = []
+        day = start
+        while day <= end:
+            row = daily.get(day, {})
+            trend.append({'date': day.isoformat(), 'quantity': row.get('quantity') or 0, 'revenue': float(row.get('revenue') or 0)})
+            day += datetime.timedelta(days=1)
+        
+        return {
+            'trend': trend,
+            'total_quantity': sum(day['quantity'] for day in trend),
+            'total_revenue': sum(day['revenue'] for day in trend),
+            'top_books': list(
+                DailyBookSales.objects.filter(**in_range)
+                .values('book_id', 'book__title', 'book__author')
+                .annotate(**totals).order_by('-quantity', 'book_id')[:10]
+            ),
+            'categories': list(
+                DailyCategorySales.objects.filter(**in_range)
+                .values('category_id', 'category__type')
+                .annotate(**totals).order_by('-revenue', 'category_id')
+            ),
+            'top_authors': list(
+                DailyAuthorSales.objects.filter(**in_range)
+                .values('author_id', 'author__name')
+                .annotate(**totals).order_by('-quantity', 'author_id')[:10]
+            ),
+        }
+    
+    report = cache.cached('sales_report', (start, end), build, scopes=[(cache.ORDERS, None)])
+    context = {**report, 'start': start, 'end': end}
+    return render(request, 'staff/sales_report.html', context)
@@ -0,0 +1 @@
+# DB Package - Connection pooling backends, connection reuse metrics and replica routing
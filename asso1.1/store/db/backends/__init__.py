@@ -0,0 +1 @@
+# Pooled variants of the Django database backends (see store.db.pool)
@@ -0,0 +1,10 @@
+from django.db.backends.mysql import base
+
+from store.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """MySQL backend with pooled connections (ENGINE 'store.db.backends.mysql')."""
+
+    def ping_connection(self, raw):
+        raw.ping()
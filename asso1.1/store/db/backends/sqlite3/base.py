@@ -0,0 +1,10 @@
+from django.db.backends.sqlite3 import base
+
+from store.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """
+    SQLite backend with pooled connections (ENGINE 'store.db.backends.sqlite3'),
+    for running the pool locally without MySQL.
+    """
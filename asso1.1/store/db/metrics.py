@@ -0,0 +1,86 @@
+"""
+Database connection reuse metrics, per alias and worker process.
+
+* connects: connect() calls, i.e. connection_created signals. With a
+  pooled backend most of them are served by an idle pooled connection.
+* requests / requests_reusing: requests started, and those that started
+  with the thread's connection still open (persistent connections,
+  CONN_MAX_AGE > 0).
+* opened: physical connections opened (pool 'created' for pooled
+  backends, connects otherwise).
+* reuse_rate: share of connection uses that did not open a physical
+  connection.
+* routed_reads: reads sent to the alias by store.db.routers.ReplicaRouter.
+
+Shown on /staff/perf/ next to the request timings.
+"""
+import threading
+from collections import Counter, defaultdict
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from store.db.pool import pools
+
+
+_lock = threading.Lock()
+_counters = defaultdict(Counter)
+
+
+@receiver(connection_created)
+def count_connect(sender, connection, **kwargs):
+    with _lock:
+        _counters[connection.alias]['connects'] += 1
+
+
+@receiver(request_started)
+def count_request(sender, **kwargs):
+    # Runs after django.db.close_old_connections, so an open connection
+    # here is one this request will reuse
+    reusing = [conn.alias for conn in connections.all(initialized_only=True) if conn.connection is not None]
+    with _lock:
+        for alias in connections:
+            _counters[alias]['requests'] += 1
+        for alias in reusing:
+            _counters[alias]['requests_reusing'] += 1
+
+
+def count_routed_read(alias):
+    with _lock:
+        _counters[alias]['routed_reads'] += 1
+
+
+def stats():
+    """Connection figures per alias."""
+    pool_stats = {alias: pool.stats() for alias, pool in pools().items()}
+    with _lock:
+        counters = {alias: Counter(counter) for alias, counter in _counters.items()}
+    rows = []
+    for alias in connections:
+        counter = counters.get(alias, Counter())
+        pool = pool_stats.get(alias)
+        opened = pool['created'] if pool else counter['connects']
+        uses = counter['connects'] + counter['requests_reusing']
+        rows.append({
+            'alias': alias,
+            'conn_max_age': connections.settings[alias].get('CONN_MAX_AGE', 0),
+            'health_checks': connections.settings[alias].get('CONN_HEALTH_CHECKS', False),
+            'connects': counter['connects'],
+            'requests': counter['requests'],
+            'requests_reusing': counter['requests_reusing'],
+            'opened': opened,
+            'reuse_rate': 1 - opened / uses if uses else 0.0,
+            'routed_reads': counter['routed_reads'],
+            'pool': pool,
+        })
+    return rows
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+    for pool in pools().values():
+        with pool.condition:
+            pool.counters.clear()
@@ -0,0 +1,242 @@
+"""
+Connection pool for the pooled database backends.
+
+Django opens a database connection per thread and, with CONN_MAX_AGE = 0,
+closes it at the end of every request. The pooled backends
+(store.db.backends.mysql and store.db.backends.sqlite3) keep that
+lifecycle but take the raw DB-API connection from a per-process pool and
+hand it back on close, so a request only pays the TCP and authentication
+handshake when the pool has no idle connection.
+
+Configured with a POOL dict in the DATABASES entry:
+
+    'POOL': {
+        'MAX_SIZE': 10,            # connections per process (in use + idle)
+        'TIMEOUT': 10,             # seconds to wait for a free connection
+        'MAX_IDLE': 300,           # close connections idle for longer
+        'HEALTH_CHECK_AFTER': 30,  # ping connections idle for longer before reuse
+    }
+"""
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from django.db.utils import OperationalError
+
+
+DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10,
+    'MAX_IDLE': 300,
+    'HEALTH_CHECK_AFTER': 30,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """No connection became free within the pool's TIMEOUT."""
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of raw DB-API connections for one database alias.
+
+    Idle connections are reused most recently released first, so a lightly
+    loaded process keeps a few warm connections and lets the rest expire.
+    """
+
+    def __init__(self, alias, max_size=10, timeout=10, max_idle=300, health_check_after=30):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.idle = deque()  # (raw connection, released at)
+        self.in_use = 0
+        self.counters = Counter()
+        self.condition = threading.Condition()
+
+    def _expire_idle(self, now):
+        # The oldest connections are on the left
+        while self.idle and now - self.idle[0][1] > self.max_idle:
+            _close_quietly(self.idle.popleft()[0])
+            self.counters['expired'] += 1
+
+    def _checkout(self):
+        """Reserve a slot: (idle connection, idle seconds) or (None, 0) to open one."""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            now = time.monotonic()
+            self._expire_idle(now)
+            if self.idle:
+                raw, released = self.idle.pop()
+                self.in_use += 1
+                return raw, now - released
+            if self.in_use < self.max_size:
+                self.in_use += 1
+                return None, 0
+            if not waited:
+                self.counters['waits'] += 1
+                waited = True
+            remaining = deadline - now
+            if remaining <= 0:
+                self.counters['timeouts'] += 1
+                raise PoolTimeout(
+                    f"No free connection in the '{self.alias}' pool "
+                    f"({self.max_size} in use) after {self.timeout}s"
+                )
+            self.condition.wait(remaining)
+
+    def acquire(self, connect, ping):
+        """
+        Return (raw connection, reused).
+
+        Args:
+            connect: Callable opening a new raw connection
+            ping: Callable(raw) raising if the connection is no longer usable;
+                run on connections idle for more than HEALTH_CHECK_AFTER seconds
+        """
+        while True:
+            start = time.monotonic()
+            with self.condition:
+                try:
+                    raw, idle_for = self._checkout()
+                finally:
+                    self.counters['wait_ms'] += round((time.monotonic() - start) * 1000)
+            if raw is None:
+                try:
+                    raw = connect()
+                except BaseException:
+                    self._release_slot()
+                    raise
+                with self.condition:
+                    self.counters['created'] += 1
+                return raw, False
+            if idle_for <= self.health_check_after:
+                break
+            with self.condition:
+                self.counters['health_checks'] += 1
+            try:
+                ping(raw)
+                break
+            except Exception:
+                with self.condition:
+                    self.counters['health_check_failures'] += 1
+                _close_quietly(raw)
+                self._release_slot()
+        with self.condition:
+            self.counters['reused'] += 1
+        return raw, True
+
+    def _release_slot(self):
+        with self.condition:
+            self.in_use -= 1
+            self.condition.notify()
+
+    def release(self, raw, reusable=True):
+        """Give a connection back, or close it if it is not reusable."""
+        if not reusable:
+            _close_quietly(raw)
+        with self.condition:
+            self.in_use -= 1
+            if reusable:
+                self.idle.append((raw, time.monotonic()))
+            else:
+                self.counters['discarded'] += 1
+            self.condition.notify()
+
+    def close_idle(self):
+        """Close every idle connection (e.g. before forking workers)."""
+        with self.condition:
+            while self.idle:
+                _close_quietly(self.idle.popleft()[0])
+
+    def stats(self):
+        with self.condition:
+            return {
+                'alias': self.alias,
+                'max_size': self.max_size,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                **{key: self.counters[key] for key in (
+                    'created', 'reused', 'health_checks', 'health_check_failures',
+                    'expired', 'discarded', 'waits', 'timeouts', 'wait_ms',
+                )},
+            }
+
+
+def get_pool(alias, settings_dict):
+    """The pool of `alias` in this process (a forked worker gets its own)."""
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            config = {**DEFAULTS, **settings_dict.get('POOL', {})}
+            _pools[key] = ConnectionPool(
+                alias,
+                max_size=config['MAX_SIZE'],
+                timeout=config['TIMEOUT'],
+                max_idle=config['MAX_IDLE'],
+                health_check_after=config['HEALTH_CHECK_AFTER'],
+            )
+        return _pools[key]
+
+
+def pools():
+    """The pools of this process, by alias."""
+    pid = os.getpid()
+    with _pools_lock:
+        return {alias: pool for (alias, owner), pool in _pools.items() if owner == pid}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    DatabaseWrapper mixin: get_new_connection() takes a connection from the
+    pool and close() gives it back (rolled back first if a transaction is
+    still open). Connections with errors, or closed inside an atomic block,
+    are closed for real.
+    """
+    pooled_reused = False
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def ping_connection(self, raw):
+        cursor = raw.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        raw, self.pooled_reused = self.pool.acquire(lambda: connect(conn_params), self.ping_connection)
+        return raw
+
+    def init_connection_state(self):
+        # Session settings persist on the raw connection
+        if not self.pooled_reused:
+            super().init_connection_state()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        raw = self.connection
+        reusable = not self.errors_occurred and not self.in_atomic_block
+        if reusable and not self.get_autocommit():
+            try:
+                raw.rollback()
+            except Exception:
+                reusable = False
+        self.pool.release(raw, reusable)
@@ -0,0 +1,110 @@
+"""
+Read-replica routing.
+
+ReplicaRouter sends reads of the catalog and report models
+(settings.REPLICA_READ_MODELS) to the replica alias (settings.REPLICA_ALIAS)
+while store.middleware.ReplicaRoutingMiddleware marks the request as
+replica-safe: a GET or HEAD from a client that has not written recently.
+Everything else stays on the primary: writes, carts, orders, sessions,
+reads inside a transaction, related lookups from an object loaded from the
+primary, and all code running outside a request (commands, jobs).
+
+Read-your-writes: once a request writes to the primary, its remaining reads
+use the primary, and the middleware sets a cookie that keeps the client's
+reads on the primary for settings.REPLICA_STICKY_SECONDS, longer than the
+expected replication lag.
+"""
+import contextvars
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from store.db import metrics
+
+
+PIN_COOKIE = 'replica_pin'
+_state = contextvars.ContextVar('store_replica_routing', default=None)
+
+
+class RoutingState:
+    """Replica routing decisions of the current request."""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+    def watch_writes(self, execute, sql, params, many, context):
+        """Execute wrapper on the primary: notes the first write of the request."""
+        if not self.wrote and is_write(sql):
+            self.wrote = True
+        return execute(sql, params, many, context)
+
+
+def is_write(sql):
+    """Whether a statement changes data (session saves excluded)."""
+    verb = sql.lstrip()[:7].upper()
+    return verb.startswith(('INSERT', 'UPDATE', 'DELETE', 'REPLACE')) and 'django_session' not in sql
+
+
+def replica_alias():
+    """The replica alias, or None when no replica is configured."""
+    alias = getattr(settings, 'REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def pinned_until(request):
+    """Timestamp until which the client's reads stay on the primary."""
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+def start_request(request):
+    use_replica = (
+        replica_alias() is not None
+        and request.method in ('GET', 'HEAD')
+        and pinned_until(request) <= time.time()
+    )
+    state = RoutingState(use_replica)
+    return state, _state.set(state)
+
+
+def finish_request(token):
+    _state.reset(token)
+
+
+class ReplicaRouter:
+    """Database router for a primary (default) and one read replica."""
+
+    def __init__(self):
+        self.read_models = {label.lower() for label in getattr(settings, 'REPLICA_READ_MODELS', [])}
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is None
+            or not state.use_replica
+            or state.wrote
+            or 'instance' in hints
+            or model._meta.label_lower not in self.read_models
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        alias = replica_alias()
+        metrics.count_routed_read(alias)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is migrated through replication
+        if db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,16 @@
+# Importing Package - Streaming book import from CSV/JSON feeds
+from store.importing.importer import BookImporter, ImportReport, NameLookup, RowError, clean_row
+from store.importing.parallel import import_csv_parallel
+from store.importing.readers import iter_csv_rows, iter_json_rows, iter_rows
+
+__all__ = [
+    'BookImporter',
+    'ImportReport',
+    'NameLookup',
+    'RowError',
+    'clean_row',
+    'import_csv_parallel',
+    'iter_csv_rows',
+    'iter_json_rows',
+    'iter_rows',
+]
@@ -0,0 +1,346 @@
+import datetime
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+
+from store.models import Author, Book, Cart, Category, Publisher, books_imported
+
+
+MAX_PRICE = Decimal('99999999.99')  # Book.price is DECIMAL(10, 2)
+
+
+
+class RowError(ValueError):
+    """A row that failed validation or could not be written."""
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def clean_row(raw):
+    """
+    Validate and convert one import row. Needs no database access, so it
+    can run in worker processes.
+
+    Args:
+        raw: dict from the CSV/JSON reader
+
+    Returns:
+        dict of cleaned values for the fields present in the row. Optional
+        columns missing from the row are left out rather than defaulted, so
+        an upsert by ISBN does not overwrite them.
+
+    Raises:
+        RowError: with a message describing the first invalid value
+    """
+    if not isinstance(raw, dict):
+        raise RowError('Row is not an object')
+    cleaned = {}
+
+    title = _text(raw.get('title'))
+    if not title:
+        raise RowError('Missing title')
+    if len(title) > 255:
+        raise RowError('Title longer than 255 characters')
+    cleaned['title'] = title
+
+    if 'author' in raw:
+        author = _text(raw['author'])
+        if len(author) > 255:
+            raise RowError('Author longer than 255 characters')
+        cleaned['author'] = author
+
+    try:
+        price = Decimal(_text(raw.get('price')) or 'NaN').quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise RowError(f"Invalid price: {raw.get('price')!r}")
+    if not price.is_finite() or price < 0 or price > MAX_PRICE:
+        raise RowError(f"Invalid price: {raw.get('price')!r}")
+    cleaned['price'] = price
+
+    if 'stock_quantity' in raw or 'stock' in raw:
+        stock = raw.get('stock_quantity', raw.get('stock'))
+        try:
+            cleaned['stock_quantity'] = int(_text(stock) or 0)
+        except ValueError:
+            raise RowError(f'Invalid stock quantity: {stock!r}')
+        if cleaned['stock_quantity'] < 0:
+            raise RowError(f'Invalid stock quantity: {stock!r}')
+
+    if 'isbn' in raw:
+        isbn = _text(raw['isbn']).replace('-', '').replace(' ', '')
+        if len(isbn) > 13:
+            raise RowError(f"Invalid ISBN: {raw['isbn']!r}")
+        cleaned['isbn'] = isbn or None
+
+    if 'description' in raw:
+        cleaned['description'] = _text(raw['description']) or None
+
+    if 'pages' in raw:
+        pages = _text(raw['pages'])
+        try:
+            cleaned['pages'] = int(pages) if pages else None
+        except ValueError:
+            raise RowError(f"Invalid pages: {raw['pages']!r}")
+        if cleaned['pages'] is not None and cleaned['pages'] < 0:
+            raise RowError(f"Invalid pages: {raw['pages']!r}")
+
+    if 'publication_date' in raw:
+        published = _text(raw['publication_date'])
+        try:
+            cleaned['publication_date'] = datetime.date.fromisoformat(published) if published else None
+        except ValueError:
+            raise RowError(f"Invalid publication date: {raw['publication_date']!r}")
+
+    for name, limit in (('category', 100), ('publisher', 255)):
+        if name in raw:
+            value = _text(raw[name])
+            if len(value) > limit:
+                raise RowError(f'{name.title()} longer than {limit} characters')
+            cleaned[name] = value or None
+
+    return cleaned
+
+
+class NameLookup:
+    """
+    In-memory name -> id cache for a lookup model (Category, Author, Publisher).
+    Loaded once per import; missing names are created in bulk.
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.ids = None
+
+    def resolve(self, names):
+        """Return {name: id} for the given names, creating the missing ones."""
+        if self.ids is None:
+            self.ids = {}
+            for pk, name in self.model.objects.values_list('pk', self.field).order_by('-pk'):
+                self.ids[name] = pk  # lowest pk wins for duplicate (non-unique) names
+        missing = {name for name in names if name and name not in self.ids}
+        if missing:
+            self.model.objects.bulk_create(
+                [self.model(**{self.field: name}) for name in missing], ignore_conflicts=True
+            )
+            # Re-read: bulk_create does not return ids on every backend
+            for pk, name in self.model.objects.filter(
+                **{f'{self.field}__in': missing}
+            ).values_list('pk', self.field).order_by('-pk'):
+                self.ids[name] = pk
+        return self.ids
+
+
+class ImportReport:
+    """
+    Outcome of an import.
+
+    Attributes:
+        rows: Rows read from the file
+        imported: Rows written (inserted or updated by ISBN)
+        errors: (row_number, message) for the first max_errors failed rows
+        error_count: Total number of failed rows
+        elapsed: Seconds spent
+    """
+
+    def __init__(self, max_errors=1000):
+        self.rows = 0
+        self.imported = 0
+        self.errors = []
+        self.error_count = 0
+        self.elapsed = 0.0
+        self.max_errors = max_errors
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((row_number, str(message)))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': [{'row': row, 'message': message} for row, message in self.errors],
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+class BookImporter:
+    """
+    Streaming book importer.
+
+    Rows are validated and written in batches: each batch resolves its
+    category/author/publisher names through the lookup caches and is written
+    with bulk_create in its own transaction, upserting on ISBN (rows with an
+    ISBN that already exists update that book, but only the columns the row
+    contains). A batch the database rejects
+    is retried row by row so the error report points at the offending rows.
+
+    Args:
+        batch_size: Rows per bulk_create
+        max_errors: Errors kept in the report (all are counted)
+    """
+
+    def __init__(self, batch_size=1000, max_errors=1000):
+        self.batch_size = batch_size
+        self.report = ImportReport(max_errors=max_errors)
+        self.categories = NameLookup(Category, 'type')
+        self.authors = NameLookup(Author, 'name')
+        self.publishers = NameLookup(Publisher, 'name')
+        # ISBNs of existing books whose price the upsert changed
+        self.repriced_isbns = set()
+
+    def run(self, rows, progress=None):
+        """
+        Import (row_number, raw_dict) pairs, e.g. from store.importing.iter_rows().
+
+        Args:
+            rows: Iterable of (row_number, raw_dict)
+            progress: Optional callable(report) called after every batch
+
+        Returns:
+            ImportReport
+        """
+        start = time.perf_counter()
+        batch = []
+        for row_number, raw in rows:
+            self.report.rows += 1
+            try:
+                batch.append((row_number, clean_row(raw)))
+            except RowError as error:
+                self.report.add_error(row_number, error)
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+                self._progress(progress, start)
+        if batch:
+            self.write_batch(batch)
+        self._progress(progress, start)
+        self.finish()
+        return self.report
+
+    def run_cleaned(self, batches, progress=None):
+        """
+        Write batches that were already validated elsewhere (e.g. by worker
+        processes): an iterable of (rows_read, [(row_number, cleaned)], [(row_number, error)]).
+        """
+        start = time.perf_counter()
+        for rows_read, cleaned, errors in batches:
+            self.report.rows += rows_read
+            for row_number, message in errors:
+                self.report.add_error(row_number, message)
+            for offset in range(0, len(cleaned), self.batch_size):
+                self.write_batch(cleaned[offset:offset + self.batch_size])
+            self._progress(progress, start)
+        self.finish()
+        return self.report
+
+    def _progress(self, progress, start):
+        self.report.elapsed = time.perf_counter() - start
+        if progress:
+            progress(self.report)
+
+    def finish(self):
+        # bulk_create skips Book.save(): refresh the cart totals that
+        # price_changed() would have, then search indexes and caches once
+        isbns = sorted(self.repriced_isbns)
+        for offset in range(0, len(isbns), self.batch_size):
+            Cart.refresh_totals(Cart.objects.filter(
+                items__book__isbn__in=isbns[offset:offset + self.batch_size]
+            ).distinct())
+        self.repriced_isbns.clear()
+        transaction.on_commit(lambda: books_imported.send(sender=Book))
+
+    # ---------- writing ----------
+
+    def _build(self, cleaned):
+        categories = self.categories.resolve({row.get('category') for _, row in cleaned})
+        authors = self.authors.resolve({row.get('author') for _, row in cleaned})
+        publishers = self.publishers.resolve({row.get('publisher') for _, row in cleaned})
+        books = []
+        for row_number, row in cleaned:
+            values = {name: value for name, value in row.items() if name not in ('category', 'publisher')}
+            if 'category' in row:
+                values['category_id'] = categories.get(row['category'])
+            if 'publisher' in row:
+                values['publisher_id'] = publishers.get(row['publisher'])
+            if 'author' in row:
+                values['author_obj_id'] = authors.get(row['author'])
+            books.append((row_number, Book(**values), frozenset(values)))
+        return books
+
+    def _insert(self, books):
+        """
+        Insert/upsert one group of Book objects sharing the same set of fields.
+        Conflicting ISBNs update only that set of fields (the row's columns).
+
+        Returns:
+            ISBNs of existing books whose price the upsert changes
+        """
+        fields = books[0][2]
+        repriced = set()
+        with_isbn = [book for _, book, _ in books if book.isbn]
+        without_isbn = [book for _, book, _ in books if not book.isbn]
+        if with_isbn:
+            if 'price' in fields:
+                prices = {book.isbn: book.price for book in with_isbn}
+                repriced = {
+                    isbn for isbn, price in Book.objects.filter(isbn__in=prices).values_list('isbn', 'price')
+                    if price != prices[isbn]
+                }
+            update_fields = sorted(
+                name[:-3] if name.endswith('_id') else name for name in fields - {'isbn'}
+            ) + ['updated_at']
+            Book.objects.bulk_create(
+                with_isbn,
+                update_conflicts=True,
+                unique_fields=['isbn'] if connection.features.supports_update_conflicts_with_target else None,
+                update_fields=update_fields,
+            )
+        if without_isbn:
+            Book.objects.bulk_create(without_isbn)
+        return repriced
+
+    def write_batch(self, cleaned):
+        """Write one batch of (row_number, cleaned) rows."""
+        # The last row wins when an ISBN repeats within a batch
+        by_isbn = {}
+        unique = []
+        for row_number, row in cleaned:
+            isbn = row.get('isbn')
+            if not isbn:
+                unique.append((row_number, row))
+                continue
+            if isbn in by_isbn:
+                self.report.add_error(by_isbn[isbn][0], f'Duplicate ISBN {isbn} (superseded by row {row_number})')
+            by_isbn[isbn] = (row_number, row)
+        cleaned = sorted(unique + list(by_isbn.values()), key=lambda item: item[0])
+
+        repriced = set()
+        try:
+            with transaction.atomic():
+                groups = {}
+                for item in self._build(cleaned):
+                    groups.setdefault(item[2], []).append(item)
+                for group in groups.values():
+                    repriced |= self._insert(group)
+        except (IntegrityError, DatabaseError) as error:
+            if len(cleaned) == 1:
+                self.report.add_error(cleaned[0][0], f'Rejected by the database: {error}')
+                return
+            # Find the offending rows one at a time
+            for item in cleaned:
+                self.write_batch([item])
+            return
+        # Only once the batch is written: a rolled-back batch is retried row by row
+        self.repriced_isbns |= repriced
+        self.report.imported += len(cleaned)
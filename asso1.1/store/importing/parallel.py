@@ -0,0 +1,155 @@
+"""
+Parallel CSV import for very large catalog files.
+
+The file is split into byte-range shards that end on line boundaries.
+Worker processes parse and validate the shards (csv + clean_row: the
+CPU-bound part, Decimal and date conversion included) while the calling
+process is the single writer, feeding the validated rows in file order to
+BookImporter.run_cleaned (chunked bulk_create, upsert on ISBN).
+
+Shards are split on newlines, so quoted fields must not contain line
+breaks; import such files with the serial importer (workers=1).
+"""
+import csv
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections
+
+from store.importing.importer import BookImporter, RowError, clean_row
+
+
+DEFAULT_SHARD_BYTES = 4 * 1024 * 1024
+
+
+def read_header(path):
+    """Return (fieldnames, offset of the first data row)."""
+    with open(path, 'rb') as f:
+        line = f.readline()
+        header = next(csv.reader([line.decode('utf-8-sig')]), [])
+        return [name.strip() for name in header], f.tell()
+
+
+def shard_ranges(path, start, shard_bytes=DEFAULT_SHARD_BYTES):
+    """Split [start, end of file) into (start, end) byte ranges ending on newlines."""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            if f.tell() < size:
+                f.readline()  # move to the end of the current line
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_shard(path, fieldnames, start, end):
+    """
+    Parse and validate one shard (runs in a worker process).
+
+    Returns:
+        dict with rows, cleaned [(local_row, values)], errors [(local_row, message)],
+        seconds spent and the worker's pid. Row numbers are 1-based within the shard.
+    """
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8'), newline=''), fieldnames=fieldnames)
+    cleaned, errors = [], []
+    rows = 0
+    for rows, raw in enumerate(reader, start=1):
+        try:
+            cleaned.append((rows, clean_row(raw)))
+        except RowError as error:
+            errors.append((rows, str(error)))
+    return {
+        'rows': rows,
+        'cleaned': cleaned,
+        'errors': errors,
+        'seconds': time.perf_counter() - started,
+        'pid': os.getpid(),
+    }
+
+
+class WorkerStats:
+    """Rows parsed and seconds spent by each worker process."""
+
+    def __init__(self):
+        self.workers = {}
+
+    def add(self, pid, rows, seconds):
+        stats = self.workers.setdefault(pid, {'shards': 0, 'rows': 0, 'seconds': 0.0})
+        stats['shards'] += 1
+        stats['rows'] += rows
+        stats['seconds'] += seconds
+
+    def as_list(self):
+        return [
+            {
+                'pid': pid,
+                'shards': stats['shards'],
+                'rows': stats['rows'],
+                'seconds': round(stats['seconds'], 3),
+                'rows_per_second': round(stats['rows'] / stats['seconds'], 1) if stats['seconds'] else 0.0,
+            }
+            for pid, stats in sorted(self.workers.items())
+        ]
+
+
+def import_csv_parallel(path, workers=None, batch_size=1000, shard_bytes=DEFAULT_SHARD_BYTES,
+                        max_errors=1000, progress=None):
+    """
+    Import a CSV file with `workers` parsing processes and one writer.
+
+    Args:
+        path: CSV file path
+        workers: Parsing processes (default: CPU count)
+        batch_size: Rows per bulk_create
+        shard_bytes: Approximate size of one shard
+        progress: Optional callable(report) called after every shard is written
+
+    Returns:
+        (ImportReport, WorkerStats)
+    """
+    workers = workers or os.cpu_count() or 1
+    fieldnames, data_start = read_header(path)
+    shards = shard_ranges(path, data_start, shard_bytes)
+    stats = WorkerStats()
+    importer = BookImporter(batch_size=batch_size, max_errors=max_errors)
+
+    def parsed_batches(executor):
+        # A bounded window of shards in flight, consumed in file order so
+        # row numbers stay global and memory stays proportional to the window
+        pending = deque()
+        queued = iter(shards)
+        row_offset = 0
+        while True:
+            while len(pending) < workers * 2:
+                shard = next(queued, None)
+                if shard is None:
+                    break
+                pending.append(executor.submit(parse_shard, path, fieldnames, *shard))
+            if not pending:
+                return
+            result = pending.popleft().result()
+            stats.add(result['pid'], result['rows'], result['seconds'])
+            yield (
+                result['rows'],
+                [(row_offset + row, values) for row, values in result['cleaned']],
+                [(row_offset + row, message) for row, message in result['errors']],
+            )
+            row_offset += result['rows']
+
+    # Worker processes must not inherit the writer's database connection;
+    # they only need the app registry (clean_row imports store.models)
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        report = importer.run_cleaned(parsed_batches(executor), progress=progress)
+    return report, stats
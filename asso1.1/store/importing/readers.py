@@ -0,0 +1,132 @@
+import codecs
+import csv
+import io
+import json
+
+
+JSON_CHUNK_SIZE = 64 * 1024
+NUMBER_CHARS = '0123456789.eE+-'
+
+
+def _text_stream(fileobj):
+    """Wrap a binary upload in a UTF-8 text stream (text streams pass through)."""
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+
+
+def iter_csv_rows(fileobj):
+    """
+    Yield (row_number, dict) for each data row of a CSV file, reading it
+    incrementally. Row numbers are 1-based data rows (the header is row 0).
+    """
+    text = _text_stream(fileobj)
+    try:
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+    finally:
+        # Leave the caller's file open
+        if text is not fileobj:
+            text.detach()
+
+
+def iter_json_rows(fileobj, chunk_size=JSON_CHUNK_SIZE):
+    """
+    Yield (row_number, dict) for each object of a JSON array, parsing it
+    incrementally: the file is read in chunks and each array element is
+    decoded as soon as it is complete, so memory stays proportional to one
+    element. Accepts a top-level array or an object with a "books" array,
+    like the original importer.
+    """
+    decoder = json.JSONDecoder()
+    chars = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, position, eof
+        data = fileobj.read(chunk_size)
+        if not data:
+            eof = True
+        if isinstance(data, bytes):
+            data = chars.decode(data, final=eof)
+        buffer = buffer[position:] + data
+        position = 0
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            read_more()
+
+    def expect(token):
+        nonlocal position
+        skip_whitespace()
+        if buffer[position:position + 1] != token:
+            raise ValueError(f"Invalid JSON: expected '{token}'")
+        position += 1
+
+    def decode_value():
+        nonlocal position
+        while True:
+            skip_whitespace()
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if not eof and (end == len(buffer) or buffer[end] in NUMBER_CHARS):
+                read_more()
+                continue
+            position = end
+            return value
+
+    read_more()
+    skip_whitespace()
+    if buffer[position:position + 1] == '{':
+        # {"books": [...], ...}: skip to the "books" array
+        position += 1
+        while True:
+            key = decode_value()
+            expect(':')
+            skip_whitespace()
+            if key == 'books' and buffer[position:position + 1] == '[':
+                break
+            decode_value()
+            skip_whitespace()
+            if buffer[position:position + 1] != ',':
+                return
+            position += 1
+    expect('[')
+
+    skip_whitespace()
+    if buffer[position:position + 1] == ']':
+        return
+    number = 0
+    while True:
+        number += 1
+        yield number, decode_value()
+        skip_whitespace()
+        separator = buffer[position:position + 1]
+        position += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError("Invalid JSON: expected ',' or ']' between books")
+
+
+def iter_rows(fileobj, filename):
+    """Pick the CSV or JSON reader from a file name."""
+    name = filename.lower()
+    if name.endswith('.csv'):
+        return iter_csv_rows(fileobj)
+    if name.endswith('.json'):
+        return iter_json_rows(fileobj)
+    raise ValueError('Unsupported file format. Please use CSV or JSON.')
@@ -0,0 +1,11 @@
+# Jobs Package - Background jobs queued in the database (store.models.Job)
+from store.jobs.registry import HANDLERS, register, run_job
+from store.jobs import handlers  # noqa: F401 - registers the built-in job kinds
+from store.jobs.worker import Worker
+
+__all__ = [
+    'HANDLERS',
+    'Worker',
+    'register',
+    'run_job',
+]
@@ -0,0 +1,148 @@
+import csv
+import time
+
+from store.importing import BookImporter, ImportReport, RowError, iter_csv_rows, iter_rows
+from store.jobs.registry import register
+from store.models import Book
+
+
+STOCK_BATCH_SIZE = 1000
+
+
+def _file_progress(job, raw, size):
+    """Progress callback reporting how far into the input file the reader is."""
+    def progress(report):
+        percent = 100.0 * raw.tell() / size if size else 0.0
+        job.set_progress(min(percent, 99.0), f'{report.rows} rows read, {report.error_count} errors')
+    return progress
+
+
+@register('import_books')
+def import_books(job):
+    """
+    Import the uploaded CSV/JSON file with the streaming BookImporter.
+
+    Payload:
+        batch_size: Rows per bulk_create (default 1000)
+    """
+    with job.input_file.open('rb') as upload:
+        raw = upload.file
+        rows = iter_rows(raw, job.input_file.name)
+        importer = BookImporter(batch_size=job.payload.get('batch_size', 1000))
+        try:
+            report = importer.run(rows, progress=_file_progress(job, raw, job.input_file.size))
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            # Batches before the malformed part of the file are kept
+            result = importer.report.as_dict()
+            result['fatal'] = f'Error processing file after row {importer.report.rows}: {e}'
+            return result
+    return report.as_dict()
+
+
+@register('rebuild_recommendations')
+def rebuild_recommendations(job):
+    """
+    Recompute the BookSimilarity index for the whole catalog.
+
+    Payload:
+        metric: Must be settings.RECOMMENDATION_METRIC (the default)
+        neighbours: Neighbours kept per book (cosine and jaccard only)
+    """
+    from store.controllers.bookController.recommendation_engine import build_recommendations
+    from store.models import BookSimilarity
+
+    metric = job.payload.get('metric') or BookSimilarity.configured_metric()
+    neighbours_by_book, written = build_recommendations(
+        metric=metric,
+        neighbours=job.payload.get('neighbours'),
+        progress=job.set_progress,
+    )
+    return {'metric': metric, 'books': len(neighbours_by_book), 'rows_written': written}
+
+
+def _apply_stock_batch(batch, report):
+    """Resolve one batch of stock rows to book ids and apply it in two UPDATEs."""
+    isbns = {row['isbn'] for _, row in batch if row.get('isbn')}
+    ids_by_isbn = dict(Book.objects.filter(isbn__in=isbns).values_list('isbn', 'id')) if isbns else {}
+    ids = {int(row['id']) for _, row in batch if row.get('id')}
+    known_ids = set(Book.objects.filter(id__in=ids).values_list('id', flat=True)) if ids else set()
+
+    quantities, deltas = {}, {}
+    for row_number, row in batch:
+        book_id = int(row['id']) if row.get('id') else ids_by_isbn.get(row.get('isbn'))
+        if book_id is None or (row.get('id') and book_id not in known_ids):
+            report.add_error(row_number, f"Unknown book: {row.get('id') or row.get('isbn')}")
+            continue
+        if 'delta' in row:
+            deltas[book_id] = deltas.get(book_id, 0) + row['delta']
+        else:
+            quantities[book_id] = row['stock_quantity']
+
+    # Absolute quantities first, so a delta in the same file adds to them
+    updated = Book.update_stock(quantities)
+    updated += Book.update_stock(deltas, relative=True)
+    report.imported += len(quantities) + len(deltas)
+    return updated
+
+
+def _clean_stock_row(raw):
+    """Validate one stock row: a book (id or isbn) and stock_quantity or delta."""
+    row = {
+        'id': (raw.get('id') or raw.get('book_id') or '').strip(),
+        'isbn': (raw.get('isbn') or '').replace('-', '').strip(),
+    }
+    if not row['id'] and not row['isbn']:
+        raise RowError('Missing id or isbn')
+    if row['id'] and not row['id'].isdigit():
+        raise RowError(f"Invalid id: {row['id']!r}")
+
+    delta = (raw.get('delta') or '').strip()
+    quantity = (raw.get('stock_quantity') or raw.get('stock') or '').strip()
+    if delta:
+        try:
+            row['delta'] = int(delta)
+        except ValueError:
+            raise RowError(f'Invalid delta: {delta!r}')
+    elif quantity:
+        if not quantity.isdigit():
+            raise RowError(f'Invalid stock quantity: {quantity!r}')
+        row['stock_quantity'] = int(quantity)
+    else:
+        raise RowError('Missing stock_quantity or delta')
+    return row
+
+
+@register('bulk_stock_update')
+def bulk_stock_update(job):
+    """
+    Update stock levels from an uploaded CSV with an id or isbn column and
+    either stock_quantity (set the level) or delta (add to it, never going
+    below zero). Each batch of rows is applied with at most two UPDATEs.
+    """
+    report = ImportReport()
+    updated = 0
+    start = time.perf_counter()
+    with job.input_file.open('rb') as upload:
+        raw = upload.file
+        progress = _file_progress(job, raw, job.input_file.size)
+        batch = []
+        try:
+            for row_number, raw_row in iter_csv_rows(raw):
+                report.rows += 1
+                try:
+                    batch.append((row_number, _clean_stock_row(raw_row)))
+                except RowError as e:
+                    report.add_error(row_number, e)
+                if len(batch) >= STOCK_BATCH_SIZE:
+                    updated += _apply_stock_batch(batch, report)
+                    batch = []
+                    progress(report)
+        except (UnicodeDecodeError, csv.Error) as e:
+            report.add_error(report.rows + 1, f'Error processing file: {e}')
+        if batch:
+            updated += _apply_stock_batch(batch, report)
+
+    report.elapsed = time.perf_counter() - start
+    result = report.as_dict()
+    result['books_updated'] = updated
+    return result
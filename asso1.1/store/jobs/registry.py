@@ -0,0 +1,31 @@
+import traceback
+
+
+# Job.kind -> callable(job) returning a JSON-serializable result
+HANDLERS = {}
+
+
+def register(kind):
+    """Decorator registering the handler for a Job kind."""
+    def decorator(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def run_job(job):
+    """
+    Run a claimed job with its handler and record the outcome: the handler's
+    return value on success, the traceback on any exception.
+    """
+    handler = HANDLERS.get(job.kind)
+    if handler is None:
+        job.fail(f'No handler registered for job kind {job.kind!r}')
+        return job
+    try:
+        result = handler(job)
+    except Exception:
+        job.fail(traceback.format_exc())
+    else:
+        job.succeed(result)
+    return job
@@ -0,0 +1,90 @@
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from store.jobs.registry import run_job
+from store.models import Job
+
+
+class Worker:
+    """
+    Job worker: claims queued jobs from the database one at a time and runs
+    them. While a job runs, a background thread sends heartbeats so that a
+    job whose worker died is requeued by the other workers (see
+    Job.requeue_stale). SIGTERM/SIGINT stop the worker after the current job.
+
+    Args:
+        name: Worker name recorded on claimed jobs (default host:pid)
+        poll_interval: Seconds to wait when the queue is empty
+        heartbeat_interval: Seconds between heartbeats of a running job
+        stale_after: Seconds without heartbeat before a job is requeued
+    """
+
+    def __init__(self, name=None, poll_interval=2.0, heartbeat_interval=15.0, stale_after=None):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after or getattr(settings, 'JOB_STALE_AFTER', 300)
+        self.stopping = threading.Event()
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def run(self, max_jobs=None, until_empty=False, log=None):
+        """
+        Process jobs until stopped.
+
+        Args:
+            max_jobs: Stop after this many jobs
+            until_empty: Stop as soon as the queue is empty
+            log: Optional callable(message)
+
+        Returns:
+            Number of jobs processed
+        """
+        log = log or (lambda message: None)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        processed = 0
+        while not self.stopping.is_set():
+            requeued = Job.requeue_stale(self.stale_after)
+            if requeued:
+                log(f'{self.name}: requeued {requeued} stale job(s)')
+            job = Job.claim(self.name)
+            if job is None:
+                if until_empty:
+                    break
+                self.stopping.wait(self.poll_interval)
+                continue
+
+            log(f'{self.name}: running {job}')
+            self.execute(job)
+            log(f'{self.name}: {job}')
+            processed += 1
+            if max_jobs and processed >= max_jobs:
+                break
+        return processed
+
+    def execute(self, job):
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job, done), daemon=True)
+        beat.start()
+        try:
+            run_job(job)
+        finally:
+            done.set()
+            beat.join()
+
+    def _heartbeat(self, job, done):
+        try:
+            while not done.wait(self.heartbeat_interval):
+                job.heartbeat()
+        finally:
+            # The thread has its own database connection
+            connection.close()
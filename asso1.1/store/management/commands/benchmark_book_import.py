@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from store.importing import BookImporter, iter_rows
+from store.models import Book
+
+
+def write_feed(fileobj, rows, file_format, seed=42, error_rate=0.01):
+    """Write a synthetic supplier feed with a few invalid rows."""
+    rng = random.Random(seed)
+    text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='', write_through=True)
+    fields = ['title', 'author', 'price', 'stock_quantity', 'isbn', 'category', 'publisher', 'pages']
+
+    def row(i):
+        return {
+            'title': f'Imported Book {i}',
+            'author': f'Import Author {rng.randint(1, max(rows // 50, 1))}',
+            'price': 'n/a' if rng.random() < error_rate else f'{rng.randint(100, 9999) / 100:.2f}',
+            'stock_quantity': str(rng.randint(0, 200)),
+            'isbn': f'979{i:010d}',
+            'category': f'Import Category {rng.randint(1, 40)}',
+            'publisher': f'Import Publisher {rng.randint(1, 200)}',
+            'pages': str(rng.randint(50, 900)),
+        }
+
+    if file_format == 'csv':
+        writer = csv.DictWriter(text, fieldnames=fields)
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow(row(i))
+    else:
+        text.write('[\n')
+        for i in range(rows):
+            text.write(('' if i == 0 else ',\n') + json.dumps(row(i)))
+        text.write('\n]\n')
+    text.detach()
+    fileobj.seek(0)
+
+
+def legacy_import(rows):
+    """The previous importer: one Book.objects.create per row, no batching."""
+    imported = 0
+    for _, row in rows:
+        try:
+            Book.objects.create(
+                title=row.get('title', '').strip(),
+                author=row.get('author', '').strip(),
+                price=float(row.get('price', 0)),
+                stock_quantity=int(row.get('stock_quantity', row.get('stock', 0)))
+            )
+            imported += 1
+        except Exception:
+            pass
+    return imported
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the streaming book importer on a synthetic CSV/JSON feed '
+        '(default 100k rows), optionally against the previous per-row importer. '
+        'All data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--format', choices=['csv', 'json'], default='csv')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--legacy-rows', type=int, default=2000, help='Rows for the per-row baseline (0 to skip)')
+        parser.add_argument('--trace-memory', action='store_true', help='Report peak Python memory (slower)')
+
+    def handle(self, *args, **options):
+        rows, file_format = options['rows'], options['format']
+        with tempfile.TemporaryFile() as feed:
+            start = time.perf_counter()
+            write_feed(feed, rows, file_format)
+            size = feed.seek(0, io.SEEK_END)
+            feed.seek(0)
+            self.stdout.write(f'Wrote {rows} rows ({size / 1e6:.1f} MB {file_format}) in {time.perf_counter() - start:.1f}s')
+
+            with transaction.atomic():
+                if options['trace_memory']:
+                    tracemalloc.start()
+                report = BookImporter(batch_size=options['batch_size']).run(iter_rows(feed, f'feed.{file_format}'))
+                if options['trace_memory']:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    self.stdout.write(f'Peak Python memory: {peak / 1e6:.1f} MB')
+                self.stdout.write(
+                    f'streaming importer: {report.rows} rows, {report.imported} imported, '
+                    f'{report.error_count} errors in {report.elapsed:.1f}s ({report.rows_per_second:,.0f} rows/s)'
+                )
+
+                # Re-import the same feed: every row is now an update by ISBN
+                feed.seek(0)
+                report = BookImporter(batch_size=options['batch_size']).run(iter_rows(feed, f'feed.{file_format}'))
+                self.stdout.write(
+                    f're-import (upsert):  {report.imported} updated in {report.elapsed:.1f}s '
+                    f'({report.rows_per_second:,.0f} rows/s)'
+                )
+                transaction.set_rollback(True)
+
+            legacy_rows = min(options['legacy_rows'], rows)
+            if legacy_rows:
+                feed.seek(0)
+                sample = (item for item, _ in zip(iter_rows(feed, f'feed.{file_format}'), range(legacy_rows)))
+                with transaction.atomic():
+                    start = time.perf_counter()
+                    legacy_import(sample)
+                    elapsed = time.perf_counter() - start
+                    transaction.set_rollback(True)
+                self.stdout.write(
+                    f'per-row baseline:    {legacy_rows} rows in {elapsed:.1f}s ({legacy_rows / elapsed:,.0f} rows/s)'
+                )
@@ -0,0 +1,90 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from store.benchmarks.timing import format_stats, summarize
+from store.db import metrics
+from store.db.pool import pools
+
+
+POOLED_ENGINES = {
+    'mysql': 'store.db.backends.mysql',
+    'sqlite': 'store.db.backends.sqlite3',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Per-request connection overhead: runs simulated requests (request_started, '
+        'a few queries, request_finished) against the default database with a new '
+        'connection per request (CONN_MAX_AGE=0), persistent connections with health '
+        'checks, and the pooled backend, and reports latency and connections opened.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--queries', type=int, default=3, help='Queries per request')
+        parser.add_argument('--pool-size', type=int, default=5)
+
+    def modes(self, base, pool_size):
+        modes = {
+            'new connection per request': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+            'persistent + health checks': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True},
+        }
+        engine = POOLED_ENGINES.get(connections['default'].vendor)
+        if engine:
+            modes['pooled'] = {
+                'ENGINE': engine,
+                'CONN_MAX_AGE': 0,
+                'CONN_HEALTH_CHECKS': False,
+                'POOL': {'MAX_SIZE': pool_size, 'TIMEOUT': 10, 'MAX_IDLE': 300, 'HEALTH_CHECK_AFTER': 30},
+            }
+        return {name: {**base, **overrides} for name, overrides in modes.items()}
+
+    def run_requests(self, alias, requests, queries):
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connections[alias].cursor() as cursor:
+                for _ in range(queries):
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def handle(self, *args, **options):
+        base = {key: value for key, value in connections['default'].settings_dict.items() if key != 'POOL'}
+        if base['ENGINE'].endswith('sqlite3') and connections['default'].is_in_memory_db():
+            raise CommandError('Use a file or server database: in-memory SQLite connections are never closed')
+
+        results = {}
+        for index, (name, settings_dict) in enumerate(self.modes(base, options['pool_size']).items()):
+            alias = f'benchmark_connections_{index}'
+            connections.settings[alias] = settings_dict
+            try:
+                metrics.reset()
+                samples = self.run_requests(alias, options['requests'], options['queries'])
+                row = next(row for row in metrics.stats() if row['alias'] == alias)
+            finally:
+                connections[alias].close()
+                if alias in pools():
+                    pools()[alias].close_idle()
+                del connections[alias]
+                del connections.settings[alias]
+            results[name] = summarize(samples)
+            self.stdout.write(format_stats(name, results[name]))
+            self.stdout.write(
+                f"{'':<28} connections opened={row['opened']} reuse rate={row['reuse_rate']:.0%}"
+            )
+
+        baseline = results['new connection per request']['mean']
+        for name, stats in results.items():
+            if name != 'new connection per request':
+                self.stdout.write(self.style.SUCCESS(
+                    f"{name}: {baseline - stats['mean']:.3f}ms less per request "
+                    f"({baseline / stats['mean']:.1f}x)" if stats['mean'] else name
+                ))
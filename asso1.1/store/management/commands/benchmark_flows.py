@@ -0,0 +1,136 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from store.benchmarks import flows
+from store.benchmarks.synthetic import seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test of the shopper journey (login, browse, search, book detail, add '
+        'to cart, checkout) on a synthetic catalog. Reports throughput, latency '
+        'percentiles and query counts per step, and fails on regressions against '
+        'a saved baseline. In process (Django test client) all data is rolled back '
+        'unless --keep-data; with --url the journeys are sent over HTTP to a running '
+        'server using the same database, so the seeded data is committed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=2000)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--ratings', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--no-seed', action='store_true', help='Reuse a previously seeded (--keep-data) catalog')
+        parser.add_argument('--keep-data', action='store_true', help='Commit the seeded data and placed orders')
+        parser.add_argument('--journeys', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5, help='Journeys run first and left out of the report')
+        parser.add_argument('--shoppers', type=int, default=4, help='Logged-in sessions the journeys are spread over')
+        parser.add_argument('--lines', type=int, default=3, help='Maximum books added to the cart per journey')
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Serve store.cache from a dummy backend so every page is built (in process only)')
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=1, help='Client threads (with --url only)')
+        parser.add_argument('--baseline', help='Summary JSON of an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed p95 growth over the baseline (0.5 = 50%%)')
+        parser.add_argument('--save', help='Write this run\'s summary JSON to a file (a future --baseline)')
+
+    def handle(self, *args, **options):
+        remote = bool(options['url'])
+        if options['concurrency'] > 1 and not remote:
+            raise CommandError('--concurrency needs --url: the test client shares one transaction')
+        if options['cold_cache'] and remote:
+            raise CommandError('--cold-cache only applies in process; disable the cache on the server instead')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        settings_override = {'ALLOWED_HOSTS': ['testserver']}
+        if options['cold_cache']:
+            settings_override['CACHES'] = {
+                **settings.CACHES,
+                'benchmark-nocache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            }
+            settings_override['STORE_CACHE_ALIAS'] = 'benchmark-nocache'
+
+        with override_settings(**settings_override):
+            if remote or options['keep_data']:
+                summary = self.run(options)
+            else:
+                with transaction.atomic():
+                    summary = self.run(options)
+                    transaction.set_rollback(True)
+
+        self.report(summary)
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({'options': self.recorded_options(options), **summary}, f, indent=2)
+            self.stdout.write(f"Summary written to {options['save']}")
+
+        failures = []
+        if summary['errors']:
+            failures.append(f"{summary['errors']} failed requests")
+        if baseline:
+            failures += flows.compare(summary, baseline, options['tolerance'])
+        if failures:
+            raise CommandError('Flow benchmark: ' + '; '.join(failures))
+        if baseline:
+            self.stdout.write(self.style.SUCCESS(f"No regression against {options['baseline']}"))
+
+    def run(self, options):
+        if not options['no_seed']:
+            start = time.perf_counter()
+            seed_catalog(
+                books=options['books'],
+                customers=options['customers'],
+                orders=options['orders'],
+                ratings=options['ratings'],
+                seed=options['seed'],
+            )
+            self.stdout.write(f"Seeded synthetic catalog in {time.perf_counter() - start:.1f}s")
+        fixtures = flows.Fixtures.load()
+
+        if options['url']:
+            def make_driver():
+                return flows.HttpDriver(options['url'])
+        else:
+            make_driver = flows.ClientDriver
+
+        common = {
+            'shoppers': options['shoppers'],
+            'concurrency': options['concurrency'],
+            'max_lines': options['lines'],
+        }
+        if options['warmup']:
+            flows.run_journeys(make_driver, fixtures, options['warmup'], seed=options['seed'] + 1000, **common)
+        return flows.run_journeys(make_driver, fixtures, options['journeys'], seed=options['seed'], **common)
+
+    @staticmethod
+    def recorded_options(options):
+        keys = ('books', 'customers', 'orders', 'ratings', 'seed', 'journeys', 'shoppers',
+                'lines', 'cold_cache', 'url', 'concurrency')
+        return {key: options[key] for key in keys}
+
+    def report(self, summary):
+        self.stdout.write(
+            f"{'step':<14} {'n':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'max ms':>8} {'queries p50/max':>16}"
+        )
+        for step, stats in summary['steps'].items():
+            latency, queries = stats['latency'], stats['queries']
+            query_counts = f"{queries['p50']}/{queries['max']}" if queries else 'n/a'
+            self.stdout.write(
+                f"{step:<14} {stats['requests']:>5} {stats['errors']:>4} {stats['rps']:>8.1f} "
+                f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} "
+                f"{latency['max']:>8.2f} {query_counts:>16}"
+            )
+        self.stdout.write(
+            f"{summary['journeys']} journeys, {summary['requests']} requests in {summary['seconds']:.1f}s: "
+            f"{summary['journeys_per_second']:.2f} journeys/s, {summary['requests_per_second']:.1f} requests/s"
+        )
@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Avg
+from django.test.utils import CaptureQueriesContext
+
+from store.benchmarks.synthetic import seed_catalog
+from store.benchmarks.timing import measure, format_stats
+from store.models import Book
+
+
+PAGE_SIZE = 12
+
+
+def listing_live(offset):
+    """A 12-book listing page with per-book rating/review aggregates (before)."""
+    rows = []
+    for book in Book.objects.order_by('title', 'id')[offset:offset + PAGE_SIZE]:
+        reviews = book.reviews.filter(is_approved=True)
+        rows.append((
+            book.ratings.aggregate(avg=Avg('score'))['avg'],
+            reviews.aggregate(Avg('rating'))['rating__avg'] if reviews.exists() else 0,
+            reviews.count(),
+        ))
+    return rows
+
+
+def listing_cached(offset):
+    """The same page read from Book's cached rating columns (after)."""
+    return [
+        (book.get_average_score(), book.get_average_rating(), book.get_reviews_count())
+        for book in Book.objects.order_by('title', 'id')[offset:offset + PAGE_SIZE]
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark a 12-book listing page showing ratings: per-book aggregate '
+        "queries versus Book's cached rating columns. All data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=5000)
+        parser.add_argument('--customers', type=int, default=5000)
+        parser.add_argument('--ratings', type=int, default=50000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--pages', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            seed_catalog(
+                books=options['books'],
+                customers=options['customers'],
+                orders=0,
+                ratings=options['ratings'],
+                reviews=options['reviews'],
+                seed=options['seed'],
+            )
+            self.stdout.write(f"Seeded synthetic catalog in {time.perf_counter() - start:.1f}s")
+
+            last_page = max(Book.objects.count() - PAGE_SIZE, 0)
+            offsets = [((i * 7919) % (last_page + 1),) for i in range(options['pages'])]
+
+            if listing_live(0) != listing_cached(0):
+                self.stdout.write(self.style.WARNING('Cached columns differ from live aggregates on page 1'))
+
+            for label, func in (('before: per-book aggregates', listing_live), ('after: cached columns', listing_cached)):
+                # Seeding can fill the DEBUG query log, which CaptureQueriesContext counts from
+                connection.queries_log.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    func(0)
+                stats = measure(func, offsets)
+                self.stdout.write(f'{format_stats(label, stats)} queries/page={len(queries)}')
+
+            transaction.set_rollback(True)
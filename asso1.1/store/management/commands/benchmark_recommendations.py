@@ -0,0 +1,53 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from store.benchmarks.synthetic import seed_catalog
+from store.benchmarks.timing import measure, format_stats
+from store.controllers.bookController.views import recommend_books, recommend_books_live
+from store.models import BookSimilarity
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare recommend_books() served from the BookSimilarity index with the '
+        'on-the-fly scoring on a synthetic catalog. All data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=5000)
+        parser.add_argument('--customers', type=int, default=20000)
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--ratings', type=int, default=50000)
+        parser.add_argument('--lookups', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            data = seed_catalog(
+                books=options['books'],
+                customers=options['customers'],
+                orders=options['orders'],
+                ratings=options['ratings'],
+                seed=options['seed'],
+            )
+            self.stdout.write(f"Seeded synthetic catalog in {time.perf_counter() - start:.1f}s")
+
+            start = time.perf_counter()
+            written = BookSimilarity.rebuild()
+            self.stdout.write(f"Built index ({written} rows) in {time.perf_counter() - start:.1f}s")
+
+            rng = random.Random(options['seed'])
+            sample = [(rng.choice(data['book_ids']),) for _ in range(options['lookups'])]
+
+            live = measure(recommend_books_live, sample)
+            indexed = measure(recommend_books, sample)
+            self.stdout.write(format_stats('on-the-fly scoring', live))
+            self.stdout.write(format_stats('BookSimilarity index', indexed))
+            if indexed['mean']:
+                self.stdout.write(self.style.SUCCESS(f"Speed-up: {live['mean'] / indexed['mean']:.1f}x"))
+
+            transaction.set_rollback(True)
@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.benchmarks.timing import measure, format_stats, percentile
+from store.search import InvertedIndexBackend
+
+
+SYLLABLES = [
+    'ka', 'lo', 'mi', 'ne', 'ra', 'su', 'to', 'vi', 'an', 'el', 'or', 'un',
+    'ber', 'cal', 'dor', 'fen', 'gar', 'hol', 'lin', 'mar', 'nor', 'pel', 'ros', 'tan',
+]
+
+
+def make_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark search-as-you-type on the in-process inverted index over a '
+        'synthetic catalog (no database writes).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000000)
+        parser.add_argument('--vocabulary', type=int, default=50000)
+        parser.add_argument('--description-words', type=int, default=8)
+        parser.add_argument('--queries', type=int, default=500)
+        parser.add_argument('--target-ms', type=float, default=10.0)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = make_vocabulary(rng, options['vocabulary'])
+        # Zipf-like word frequencies
+        cum_weights = []
+        total = 0.0
+        for rank in range(1, len(vocabulary) + 1):
+            total += 1.0 / rank
+            cum_weights.append(total)
+        rng.shuffle(vocabulary)
+
+        def words(count):
+            return ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=count))
+
+        titles = {}
+
+        def documents():
+            for book_id in range(1, options['books'] + 1):
+                title = words(rng.randint(2, 5))
+                if book_id % 100 == 0:
+                    titles[book_id] = title
+                yield book_id, title, words(2), words(options['description_words'])
+
+        backend = InvertedIndexBackend()
+        start = time.perf_counter()
+        backend.build(documents())
+        self.stdout.write(f"Indexed {options['books']} books in {time.perf_counter() - start:.1f}s")
+
+        # Simulate typing: every keystroke of a real title is a query
+        queries = []
+        sample = rng.sample(sorted(titles.values()), min(len(titles), options['queries']))
+        for title in sample:
+            queries.extend((title[:end], 10) for end in range(1, len(title) + 1))
+
+        stats = measure(backend.search_ids, queries)
+        self.stdout.write(format_stats('typeahead top-10', stats))
+        self.stdout.write(format_stats('book_list top-1000', measure(
+            backend.search_ids, [(query, backend.MAX_RESULTS) for query, _ in queries[::10]]
+        )))
+
+        if stats['p95'] <= options['target_ms']:
+            self.stdout.write(self.style.SUCCESS(f"p95 {stats['p95']:.2f}ms within {options['target_ms']}ms target"))
+        else:
+            self.stdout.write(self.style.ERROR(f"p95 {stats['p95']:.2f}ms exceeds {options['target_ms']}ms target"))
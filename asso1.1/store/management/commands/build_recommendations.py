@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.models import BookSimilarity
+
+
+class Command(BaseCommand):
+    help = (
+        'Compute item-to-item recommendations for the whole catalog with the '
+        'vectorized sparse-matrix engine and write them to BookSimilarity.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metric', choices=['cooccurrence', 'cosine', 'jaccard'],
+            help='Item similarity metric (default settings.RECOMMENDATION_METRIC); '
+                 'another metric can only be computed with --dry-run'
+        )
+        parser.add_argument(
+            '--neighbours', type=int, default=BookSimilarity.NEIGHBOURS_PER_BOOK,
+            help='Number of neighbours kept per book (cosine and jaccard; cooccurrence keeps every pair)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Compute recommendations without writing them'
+        )
+        parser.add_argument(
+            '--every', type=float, default=None,
+            help='Rebuild every N seconds until stopped (keeps a cosine / jaccard index fresh)'
+        )
+
+    def handle(self, *args, **options):
+        metric = options['metric'] or BookSimilarity.configured_metric()
+        if metric != BookSimilarity.configured_metric() and not options['dry_run']:
+            raise CommandError(
+                f'The index is built with {BookSimilarity.configured_metric()} '
+                f'(settings.RECOMMENDATION_METRIC): --metric {metric} requires --dry-run'
+            )
+        try:
+            from store.controllers.bookController.recommendation_engine import build_recommendations
+        except ImportError as e:
+            raise CommandError(f'build_recommendations requires numpy and scipy ({e})')
+
+        while True:
+            start = time.perf_counter()
+            neighbours_by_book, written = build_recommendations(
+                metric=metric,
+                neighbours=options['neighbours'],
+                write=not options['dry_run'],
+            )
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f"Computed {metric} recommendations for {len(neighbours_by_book)} books "
+                f"({written} rows written) in {elapsed:.2f}s"
+            ))
+            if not options['every']:
+                return
+            time.sleep(options['every'])
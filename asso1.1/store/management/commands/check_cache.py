@@ -0,0 +1,112 @@
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+
+from store import cache
+from store.models import Book, Category, Customer, Order, OrderItem, Payment, Rating, Review, Shipping
+
+
+class Command(BaseCommand):
+    help = (
+        'Check the catalog cache: requests book_list and book_detail, changes '
+        'the data behind them and verifies that every change is a miss and every '
+        'repeat is a hit. Runs against settings.CACHES, or an in-process Redis '
+        'stand-in with --fakeredis. All data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fakeredis', action='store_true',
+            help="Use Django's RedisCache backed by fakeredis (pip install fakeredis)"
+        )
+
+    def handle(self, *args, **options):
+        caches_setting = None
+        if options['fakeredis']:
+            try:
+                import fakeredis
+            except ImportError:
+                raise CommandError('--fakeredis requires the fakeredis package')
+            caches_setting = {
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                    'LOCATION': 'redis://localhost:6379/0',
+                    'OPTIONS': {'connection_class': fakeredis.FakeConnection},
+                }
+            }
+
+        overrides = {'ALLOWED_HOSTS': ['testserver']}
+        if caches_setting:
+            overrides['CACHES'] = caches_setting
+        with override_settings(**overrides), transaction.atomic():
+            self.stdout.write(f"Backend: {cache.stats()['backend']}")
+            self.run_checks()
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Cache hits and invalidation are consistent'))
+
+    def expect(self, client, url, view, outcome, label):
+        before = cache.stats()['views'].get(view, {'hits': 0, 'misses': 0})
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{label}: GET {url} returned {response.status_code}')
+        after = cache.stats()['views'][view]
+        got = 'hit' if after['hits'] > before['hits'] else 'miss'
+        if got != outcome:
+            raise CommandError(f'{label}: expected a {outcome} on {view}, got a {got}')
+        self.stdout.write(f'  {label:<36} {view:<12} {got}')
+        return response
+
+    def run_checks(self):
+        run_id = uuid.uuid4().hex[:8]
+        client = Client()
+        category = Category.objects.create(type=f'Cache Check {run_id}')
+        book = Book.objects.create(
+            title=f'Cache Check {run_id}', author='Cache Check', price=Decimal('10.00'),
+            stock_quantity=5, category=category
+        )
+        customer = Customer.objects.create(
+            name='Cache Check', email=f'cache-check-{run_id}@example.com', password='cache-check'
+        )
+        detail_url = f'/books/{book.id}/'
+        list_url = f'/books/?search={run_id}'
+
+        self.expect(client, detail_url, 'book_detail', 'miss', 'first detail request')
+        self.expect(client, detail_url, 'book_detail', 'hit', 'repeat detail request')
+        self.expect(client, list_url, 'book_list', 'miss', 'first list request')
+        self.expect(client, list_url, 'book_list', 'hit', 'repeat list request')
+
+        Rating.objects.create(customer=customer, book=book, score=5)
+        self.expect(client, detail_url, 'book_detail', 'miss', 'after a rating')
+        # Ratings and stock only invalidate the book's own entries; list
+        # pages catch up when settings.STORE_LIST_CACHE_TIMEOUT expires
+        self.expect(client, list_url, 'book_list', 'hit', 'list after a rating (until timeout)')
+        # Run the stock_changed callback now: the check never commits
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            Book.reserve_stock({book.id: 1})
+        self.expect(client, detail_url, 'book_detail', 'miss', 'after a sale')
+        self.expect(client, list_url, 'book_list', 'hit', 'list after a sale (until timeout)')
+        with override_settings(STORE_LIST_CACHE_TIMEOUT=0):
+            self.expect(client, list_url, 'book_list', 'hit', 'list before its timeout')
+            self.expect(client, f'{list_url}&sort=price', 'book_list', 'miss', 'list page with no timeout')
+            self.expect(client, f'{list_url}&sort=price', 'book_list', 'miss', 'same page once expired')
+
+        Review.objects.create(customer=customer, book=book, rating=4, title='Cache', content='Check')
+        self.expect(client, detail_url, 'book_detail', 'miss', 'after a review')
+
+        shipping = Shipping.objects.create(method='standard', address='1 Test St', city='Test', postal_code='0000')
+        payment = Payment.objects.create(method='credit_card', amount=Decimal('10.00'))
+        order = Order.objects.create(customer=customer, shipping=shipping, payment=payment, total=Decimal('10.00'))
+        OrderItem.objects.create(order=order, book=book, quantity=1, price=book.price)
+        self.expect(client, detail_url, 'book_detail', 'miss', 'after an order item')
+
+        book.price = Decimal('12.50')
+        book.save()
+        response = self.expect(client, list_url, 'book_list', 'miss', 'after a price change')
+        if '12.50' not in response.content.decode():
+            raise CommandError('book_list served a stale price')
+        self.expect(client, detail_url, 'book_detail', 'miss', 'detail after a price change')
+        self.expect(client, detail_url, 'book_detail', 'hit', 'repeat detail request')
@@ -0,0 +1,97 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from store.db import routers
+from store.models import Book, Cart
+
+
+class Command(BaseCommand):
+    help = (
+        'Check read-replica routing through the real views: a book page reads the '
+        'catalog from the replica, adding to the cart writes to the primary and pins '
+        'the client\'s reads to the primary until the stickiness window ends, and the '
+        'cart page always reads the primary. Needs a replica alias (DB_REPLICA_HOST, or '
+        'two SQLite files where the replica is a copy of the primary). The cart it '
+        'creates is deleted afterwards.'
+    )
+
+    def capture(self, client, method, path, data=None):
+        """Run one request and return (response, {alias: [sql]})."""
+        with ExitStack() as stack:
+            contexts = {
+                alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in (DEFAULT_DB_ALIAS, self.replica)
+            }
+            response = client.post(path, data or {}) if method == 'POST' else client.get(path)
+        return response, {alias: [query['sql'] for query in context.captured_queries] for alias, context in contexts.items()}
+
+    def expect(self, label, ok, detail):
+        if not ok:
+            raise CommandError(f'{label}: {detail}')
+        self.stdout.write(f'  ok  {label}')
+
+    def handle(self, *args, **options):
+        self.replica = routers.replica_alias()
+        if self.replica is None or 'store.db.routers.ReplicaRouter' not in settings.DATABASE_ROUTERS:
+            raise CommandError('No replica configured (set DB_REPLICA_HOST, or add a replica alias and ReplicaRouter)')
+
+        replica_ids = set(Book.objects.using(self.replica).values_list('id', flat=True)[:100])
+        book = Book.objects.filter(id__in=replica_ids, stock_quantity__gt=0).order_by('id').first()
+        if book is None:
+            raise CommandError('Need an in-stock book present on both the primary and the replica')
+
+        # A dummy store.cache backend so every page reads the database
+        caches = {**settings.CACHES, 'replica-check': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        client = Client()
+        detail = f'/books/{book.id}/'
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], CACHES=caches, STORE_CACHE_ALIAS='replica-check'):
+                _, queries = self.capture(client, 'GET', detail)
+                self.expect(
+                    'book page reads the catalog from the replica',
+                    queries[self.replica] and not any('store_book' in sql for sql in queries[DEFAULT_DB_ALIAS]),
+                    f'{len(queries[self.replica])} replica queries, primary: {queries[DEFAULT_DB_ALIAS]}',
+                )
+
+                response, queries = self.capture(client, 'POST', f'/cart/add/{book.id}/', {'quantity': 1})
+                self.expect(
+                    'add to cart writes to the primary only',
+                    any(routers.is_write(sql) for sql in queries[DEFAULT_DB_ALIAS]) and not queries[self.replica],
+                    f'replica queries: {queries[self.replica]}',
+                )
+                self.expect(
+                    'the write pins the client to the primary',
+                    routers.PIN_COOKIE in response.cookies, 'no pin cookie set',
+                )
+
+                _, queries = self.capture(client, 'GET', detail)
+                self.expect(
+                    'pinned client reads its writes from the primary',
+                    not queries[self.replica] and queries[DEFAULT_DB_ALIAS],
+                    f'{len(queries[self.replica])} replica queries',
+                )
+
+                _, queries = self.capture(client, 'GET', '/cart/')
+                self.expect(
+                    'cart page never reads the replica',
+                    not queries[self.replica], f'replica queries: {queries[self.replica]}',
+                )
+
+                # The stickiness window has ended
+                client.cookies[routers.PIN_COOKIE] = '0'
+                _, queries = self.capture(client, 'GET', detail)
+                self.expect(
+                    'after the window the catalog is read from the replica again',
+                    bool(queries[self.replica]), 'no replica queries',
+                )
+        finally:
+            Cart.objects.filter(session_key=client.session.session_key, customer__isnull=True).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Replica routing OK (stickiness window {getattr(settings, 'REPLICA_STICKY_SECONDS', 5)}s)"
+        ))
@@ -0,0 +1,75 @@
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.importing import BookImporter, import_csv_parallel, iter_rows
+from store.importing.parallel import DEFAULT_SHARD_BYTES
+
+
+class Command(BaseCommand):
+    help = (
+        'Import books from a CSV or JSON file (same format as the staff import '
+        'page). CSV files are parsed and validated by --workers processes in '
+        'byte-range shards while this process writes them in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV or JSON file')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parsing processes (CSV only)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk_create')
+        parser.add_argument(
+            '--shard-size', type=float, default=DEFAULT_SHARD_BYTES / 1024 / 1024,
+            help='Approximate shard size in MB'
+        )
+        parser.add_argument('--show-errors', type=int, default=20, help='Row errors to print')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.isfile(path):
+            raise CommandError(f'No such file: {path}')
+        name = path.lower()
+        if not name.endswith(('.csv', '.json')):
+            raise CommandError('Unsupported file format. Please use CSV or JSON.')
+
+        last = [time.perf_counter()]
+
+        def progress(report):
+            if time.perf_counter() - last[0] >= 2:
+                last[0] = time.perf_counter()
+                self.stdout.write(f'  {report.rows} rows read, {report.imported} imported ({report.rows_per_second:,.0f} rows/s)')
+
+        stats = None
+        try:
+            if name.endswith('.csv') and options['workers'] > 1:
+                self.stdout.write(f"Importing {path} with {options['workers']} parsing workers")
+                report, stats = import_csv_parallel(
+                    path,
+                    workers=options['workers'],
+                    batch_size=options['batch_size'],
+                    shard_bytes=max(int(options['shard_size'] * 1024 * 1024), 1),
+                    progress=progress,
+                )
+            else:
+                self.stdout.write(f'Importing {path}')
+                with open(path, 'rb') as f:
+                    report = BookImporter(batch_size=options['batch_size']).run(iter_rows(f, path), progress=progress)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            raise CommandError(f'Error processing file: {e}')
+
+        for row, message in report.errors[:options['show_errors']]:
+            self.stderr.write(f'  row {row}: {message}')
+        if report.error_count > options['show_errors']:
+            self.stderr.write(f"  ... {report.error_count - options['show_errors']} more errors")
+
+        if stats:
+            for worker in stats.as_list():
+                self.stdout.write(
+                    f"  worker {worker['pid']}: {worker['shards']} shards, {worker['rows']} rows parsed "
+                    f"in {worker['seconds']:.2f}s ({worker['rows_per_second']:,.0f} rows/s)"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'{report.rows} rows read, {report.imported} imported, {report.error_count} errors '
+            f'in {report.elapsed:.1f}s ({report.rows_per_second:,.0f} rows/s)'
+        ))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.models import BookSimilarity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the BookSimilarity co-purchase / co-rating index from order and rating history.'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            written = BookSimilarity.rebuild()
+        except ValueError as e:
+            raise CommandError(e)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt recommendation index: {written} rows in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.db.models.functions import Abs
+
+from store.models import Book
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Book's cached rating_count/rating_sum/review_count/review_avg "
+        'from the Rating and approved Review rows and fix any drift (e.g. after '
+        'queryset updates, cascaded deletes or bulk loads that bypass save()).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drifted books without fixing them')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Book.with_live_rating_aggregates().annotate(
+                review_avg_error=Abs(F('review_avg') - F('live_review_avg'))
+            ).filter(
+                ~Q(rating_count=F('live_rating_count'))
+                | ~Q(rating_sum=F('live_rating_sum'))
+                | ~Q(review_count=F('live_review_count'))
+                | Q(review_avg_error__gt=1e-6)
+            ).values_list('id', flat=True)
+        )
+        self.stdout.write(f'{len(drifted)} book(s) with drifted rating aggregates')
+        for book_id in drifted[:20]:
+            self.stdout.write(f'  book {book_id}')
+
+        if options['dry_run'] or not drifted:
+            return
+
+        batch_size = options['batch_size']
+        fixed = 0
+        for start in range(0, len(drifted), batch_size):
+            fixed += Book.refresh_rating_aggregates(Book.objects.filter(id__in=drifted[start:start + batch_size]))
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {fixed} book(s)'))
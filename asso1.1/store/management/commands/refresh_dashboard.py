@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.models import DashboardSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the staff dashboard snapshot. Run it from cron, or keep it '
+        'running with --every SECONDS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, default=None, help='Refresh every N seconds until stopped')
+
+    def handle(self, *args, **options):
+        while True:
+            snapshot = DashboardSnapshot.refresh()
+            self.stdout.write(
+                f'Dashboard snapshot refreshed in {snapshot.refresh_seconds * 1000:.1f} ms '
+                f'({snapshot.total_books} books, {snapshot.total_orders} orders)'
+            )
+            if not options['every']:
+                return
+            time.sleep(options['every'])
@@ -0,0 +1,60 @@
+import multiprocessing
+import signal
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _work(poll_interval, max_jobs, once):
+    """Entry point of a worker process."""
+    django.setup()
+    from store.jobs import Worker
+
+    Worker(poll_interval=poll_interval).run(max_jobs=max_jobs, until_empty=once, log=print)
+
+
+class Command(BaseCommand):
+    help = (
+        'Run background jobs (imports, recommendation rebuilds, bulk stock '
+        'updates) queued in the database. Several processes can run side by '
+        'side, on one or more machines: jobs are claimed atomically.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes to start')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=None, help='Exit after this many jobs (per process)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between polls of an empty queue')
+
+    def handle(self, *args, **options):
+        if options['processes'] <= 1:
+            from store.jobs import Worker
+
+            worker = Worker(poll_interval=options['poll_interval'])
+            self.stdout.write(f'Worker {worker.name} started')
+            processed = worker.run(max_jobs=options['max_jobs'], until_empty=options['once'], log=self.stdout.write)
+            self.stdout.write(self.style.SUCCESS(f'Worker {worker.name} stopped after {processed} job(s)'))
+            return
+
+        # Children must not share the parent's database connection
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=_work, args=(options['poll_interval'], options['max_jobs'], options['once'])
+            )
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        # Pass SIGTERM on: each child finishes its current job, then exits
+        signal.signal(signal.SIGTERM, lambda *args: [process.terminate() for process in processes])
+        self.stdout.write(f"Started {len(processes)} worker processes")
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # Children received SIGINT too and finish their current job
+            for process in processes:
+                process.join()
+        self.stdout.write(self.style.SUCCESS('All workers stopped'))
@@ -0,0 +1,97 @@
+import threading
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from store.models import Book, Cart, CartItem, Customer, Order, Payment, Shipping
+
+
+class Command(BaseCommand):
+    help = (
+        'Concurrency stress test for checkout_process: N threads check out the '
+        'same book at once and the command verifies that stock is never oversold. '
+        'Creates its own book and customers and deletes them afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=20)
+        parser.add_argument('--stock', type=int, default=5)
+        parser.add_argument('--quantity', type=int, default=1, help='Copies each thread orders')
+
+    def handle(self, *args, **options):
+        threads, stock, quantity = options['threads'], options['stock'], options['quantity']
+        run_id = uuid.uuid4().hex[:8]
+        password = 'stress-test'
+
+        book = Book.objects.create(
+            title=f'Stress Test Book {run_id}', author='Stress Test', price=Decimal('10.00'), stock_quantity=stock
+        )
+        customers = [
+            Customer.objects.create(name=f'Stress {i}', email=f'stress-{run_id}-{i}@example.com', password=password)
+            for i in range(threads)
+        ]
+        for customer in customers:
+            cart = Cart.objects.create(customer=customer)
+            CartItem.objects.create(cart=cart, book=book, quantity=quantity)
+
+        barrier = threading.Barrier(threads)
+        outcomes = []
+        lock = threading.Lock()
+
+        def checkout(customer):
+            client = Client()
+            try:
+                client.post('/customer/login/', {'email': customer.email, 'password': password})
+                barrier.wait()
+                response = client.post('/cart/checkout/process/', {
+                    'shipping_method': 'standard', 'address': '1 Test St', 'city': 'Test', 'postal_code': '0000',
+                })
+                outcome = 'ordered' if '/confirmation/' in response.get('Location', '') else 'rejected'
+            except Exception as e:
+                outcome = f'error: {e}'
+            finally:
+                connection.close()
+            with lock:
+                outcomes.append(outcome)
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                workers = [threading.Thread(target=checkout, args=(customer,)) for customer in customers]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+
+            book.refresh_from_db()
+            orders = Order.objects.filter(customer__in=customers).count()
+            errors = [outcome for outcome in outcomes if outcome.startswith('error')]
+            expected_orders = min(threads, stock // quantity)
+
+            self.stdout.write(
+                f"threads={threads} stock={stock} quantity={quantity}: "
+                f"{outcomes.count('ordered')} ordered, {outcomes.count('rejected')} rejected, "
+                f"{len(errors)} errors; final stock {book.stock_quantity}, orders {orders}"
+            )
+            for error in errors[:5]:
+                self.stdout.write(f"  {error}")
+
+            oversold = book.stock_quantity < 0 or orders * quantity > stock
+            consistent = book.stock_quantity == stock - orders * quantity
+            if oversold or not consistent:
+                raise CommandError('Stock oversold or inconsistent with the orders placed')
+            if not errors and orders != expected_orders:
+                raise CommandError(f'Expected {expected_orders} orders, got {orders}')
+            self.stdout.write(self.style.SUCCESS('No oversell: stock and orders are consistent'))
+        finally:
+            placed = Order.objects.filter(customer__in=customers)
+            shipping_ids = list(placed.values_list('shipping_id', flat=True))
+            payment_ids = list(placed.values_list('payment_id', flat=True))
+            placed.delete()
+            Shipping.objects.filter(id__in=shipping_ids).delete()
+            Payment.objects.filter(id__in=payment_ids).delete()
+            Customer.objects.filter(id__in=[customer.id for customer in customers]).delete()
+            book.delete()
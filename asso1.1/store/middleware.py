@@ -0,0 +1,98 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from store import catalog_sync, perf
+from store.db import routers
+
+
+class PerformanceMiddleware:
+    """
+    Measure every request (SQL queries and time, repeated queries, template
+    time, total time) and record the sample for the /staff/perf/ page. The
+    Server-Timing header is only added with DEBUG on, for logged-in staff
+    and for clients in settings.INTERNAL_IPS. See store.perf.
+
+    Disabled with settings.STORE_PERF_ENABLED = False.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'STORE_PERF_ENABLED', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats, token = perf.start_request()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(stats.execute))
+                response = self.get_response(request)
+        finally:
+            match = getattr(request, 'resolver_match', None)
+            view = match.view_name if match else 'unresolved'
+            perf.finish_request(stats, token, view)
+
+        if self.shows_timing(request):
+            response['Server-Timing'] = stats.server_timing()
+        return response
+
+    @staticmethod
+    def shows_timing(request):
+        """Whether the client may see the query counts and timings."""
+        if settings.DEBUG or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS:
+            return True
+        session = getattr(request, 'session', None)
+        return session is not None and 'staff_id' in session
+
+
+class CatalogSyncMiddleware:
+    """
+    Before each request, drop this process's search and autocomplete
+    indexes and local cache entries if another process (the job worker,
+    an import command) made a bulk catalog change. See store.catalog_sync.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        catalog_sync.check()
+        return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let store.db.routers.ReplicaRouter send this request's catalog and
+    report reads to the replica (GET/HEAD only), and after a request that
+    wrote to the primary, keep the client's reads on the primary for
+    settings.REPLICA_STICKY_SECONDS (read-your-writes).
+
+    Does nothing when no replica database is configured.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+    def __call__(self, request):
+        if routers.replica_alias() is None:
+            return self.get_response(request)
+
+        state, token = routers.start_request(request)
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(state.watch_writes):
+                response = self.get_response(request)
+        finally:
+            routers.finish_request(token)
+
+        if state.wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE, f'{time.time() + self.sticky_seconds:.3f}',
+                max_age=self.sticky_seconds, httponly=True, samesite='Lax',
+            )
+        return response
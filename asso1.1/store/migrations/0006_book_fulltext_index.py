@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE store_book ADD FULLTEXT INDEX store_book_fulltext_idx (title, author, description)'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('ALTER TABLE store_book DROP INDEX store_book_fulltext_idx')
+
+
+class Migration(migrations.Migration):
+    """MySQL FULLTEXT index backing store.search.MySQLFullTextBackend (no-op elsewhere)."""
+
+    dependencies = [
+        ('store', '0005_book_similarity'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:05
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Book = apps.get_model('store', 'Book')
+    Rating = apps.get_model('store', 'Rating')
+    Review = apps.get_model('store', 'Review')
+    ratings = Rating.objects.filter(book=OuterRef('pk')).order_by().values('book')
+    reviews = Review.objects.filter(book=OuterRef('pk'), is_approved=True).order_by().values('book')
+    Book.objects.update(
+        rating_count=Coalesce(Subquery(ratings.annotate(n=Count('id')).values('n')), 0),
+        rating_sum=Coalesce(Subquery(ratings.annotate(n=Sum('score')).values('n')), 0),
+        review_count=Coalesce(Subquery(reviews.annotate(n=Count('id')).values('n')), 0),
+        review_avg=Coalesce(
+            Subquery(reviews.annotate(n=Avg('rating', output_field=FloatField())).values('n')),
+            0.0, output_field=FloatField()
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_cart_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='review_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
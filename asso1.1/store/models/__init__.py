@@ -2,10 +2,12 @@
 # Import all models from domain packages to make them available at store.models level
 
 # Book domain
-from store.models.book.book import Book
+from store.models.book.book import Book, InsufficientStockError, books_imported, stock_changed
 from store.models.book.category import Category
 from store.models.book.author import Author
 from store.models.book.publisher import Publisher
+from store.models.book.book_similarity import BookSimilarity
+from store.models.book.catalog_version import CatalogVersion
 
 # Customer domain
 from store.models.customer.customer import Customer
@@ -16,6 +18,7 @@ from store.models.customer.wishlist import Wishlist, WishlistItem
 
 # Staff domain
 from store.models.staff.staff import Staff
+from store.models.staff.dashboard_snapshot import DashboardSnapshot
 
 # Order domain
 from store.models.order.cart import Cart
@@ -36,12 +39,20 @@ from store.models.inventory.inventory import Inventory, InventoryLog
 # Notification domain
 from store.models.notification.notification import Notification
 
+# Job domain
+from store.models.job.job import Job
+
+# Analytics domain
+from store.models.analytics.daily_sales import DailyBookSales, DailyCategorySales, DailyAuthorSales
+
 __all__ = [
-    # Book domain (4 classes)
+    # Book domain (6 classes)
     'Book',
     'Category',
     'Author',
     'Publisher',
+    'BookSimilarity',
+    'CatalogVersion',
     
     # Customer domain (5 classes)
     'Customer',
@@ -51,8 +62,9 @@ __all__ = [
     'Wishlist',
     'WishlistItem',
     
-    # Staff domain (1 class)
+    # Staff domain (2 classes)
     'Staff',
+    'DashboardSnapshot',
     
     # Order domain (8 classes)
     'Cart',
@@ -74,4 +86,12 @@ __all__ = [
     
     # Notification domain (1 class)
     'Notification',
+    
+    # Job domain (1 class)
+    'Job',
+    
+    # Analytics domain (3 classes)
+    'DailyBookSales',
+    'DailyCategorySales',
+    'DailyAuthorSales',
 ]
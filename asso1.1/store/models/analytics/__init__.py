@@ -0,0 +1,4 @@
+# Analytics domain models
+from store.models.analytics.daily_sales import DailyBookSales, DailyCategorySales, DailyAuthorSales
+
+__all__ = ['DailyBookSales', 'DailyCategorySales', 'DailyAuthorSales']
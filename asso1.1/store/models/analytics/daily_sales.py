@@ -0,0 +1,139 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import Case, F, Value, When
+
+
+MONEY = models.DecimalField(max_digits=14, decimal_places=2)
+# Keys per UPDATE statement (bounds the size of the CASE expressions)
+UPDATE_CHUNK = 500
+
+
+class DailySales(models.Model):
+    """
+    Abstract daily sales rollup: units, revenue and orders per day and key
+    (a book, category or author).
+
+    Rows are maintained incrementally by Order.record_sales when an order
+    is confirmed or cancelled, and rebuilt by ``manage.py backfill_sales_rollups``.
+
+    Attributes:
+        date: Day the order was placed
+        quantity: Units sold
+        revenue: Sum of price x quantity of the order items
+        orders: Number of orders containing the key
+    """
+    # Name of the foreign key the rollup is keyed on
+    KEY = None
+
+    date = models.DateField()
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    orders = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def apply(cls, deltas):
+        """
+        Add deltas to the rollup.
+
+        Missing rows are first inserted with zero totals (ignoring rows that
+        already exist), then each day's keys are incremented with one
+        conditional UPDATE, so concurrent orders never lose an increment.
+
+        Args:
+            deltas: dict mapping (date, key_id) to (quantity, revenue, orders)
+        """
+        if not deltas:
+            return
+        key = f'{cls.KEY}_id'
+        cls.objects.bulk_create(
+            [cls(date=date, **{key: key_id}) for date, key_id in deltas],
+            ignore_conflicts=True,
+        )
+
+        by_date = defaultdict(dict)
+        for (date, key_id), values in deltas.items():
+            by_date[date][key_id] = values
+        for date, keyed in by_date.items():
+            key_ids = list(keyed)
+            for offset in range(0, len(key_ids), UPDATE_CHUNK):
+                chunk = key_ids[offset:offset + UPDATE_CHUNK]
+
+                def delta(position, output_field):
+                    return Case(
+                        *[When(**{key: key_id}, then=Value(keyed[key_id][position])) for key_id in chunk],
+                        default=Value(0),
+                        output_field=output_field,
+                    )
+
+                cls.objects.filter(date=date, **{f'{key}__in': chunk}).update(
+                    quantity=F('quantity') + delta(0, models.IntegerField()),
+                    revenue=F('revenue') + delta(1, MONEY),
+                    orders=F('orders') + delta(2, models.IntegerField()),
+                )
+
+
+class DailyBookSales(DailySales):
+    """
+    DailyBookSales Model - Units, revenue and orders per book per day.
+    """
+    KEY = 'book'
+
+    book = models.ForeignKey('store.Book', on_delete=models.CASCADE, related_name='daily_sales')
+
+    class Meta:
+        db_table = 'store_daily_book_sales'
+        verbose_name = 'Daily Book Sales'
+        verbose_name_plural = 'Daily Book Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'book'], name='daily_book_sales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} book #{self.book_id}: {self.quantity}"
+
+
+class DailyCategorySales(DailySales):
+    """
+    DailyCategorySales Model - Units, revenue and orders per category per day
+    (books without a category are only counted in DailyBookSales).
+    """
+    KEY = 'category'
+
+    category = models.ForeignKey('store.Category', on_delete=models.CASCADE, related_name='daily_sales')
+
+    class Meta:
+        db_table = 'store_daily_category_sales'
+        verbose_name = 'Daily Category Sales'
+        verbose_name_plural = 'Daily Category Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category'], name='daily_category_sales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} category #{self.category_id}: {self.quantity}"
+
+
+class DailyAuthorSales(DailySales):
+    """
+    DailyAuthorSales Model - Units, revenue and orders per author per day
+    (books without an Author record are only counted in DailyBookSales).
+    """
+    KEY = 'author'
+
+    author = models.ForeignKey('store.Author', on_delete=models.CASCADE, related_name='daily_sales')
+
+    class Meta:
+        db_table = 'store_daily_author_sales'
+        verbose_name = 'Daily Author Sales'
+        verbose_name_plural = 'Daily Author Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'author'], name='daily_author_sales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} author #{self.author_id}: {self.quantity}"
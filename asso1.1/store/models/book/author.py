@@ -35,9 +35,6 @@ class Author(models.Model):
         return self.books.count()
 
     def get_total_sales(self):
-        """Calculate total sales across all books by this author."""
-        from store.models.order.order import OrderItem
-        total = OrderItem.objects.filter(book__author_obj=self).aggregate(
-            total=models.Sum('quantity')
-        )['total']
+        """Units sold across all books by this author (from the daily sales rollup)."""
+        total = self.daily_sales.aggregate(total=models.Sum('quantity'))['total']
         return total or 0
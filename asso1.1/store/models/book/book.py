@@ -1,4 +1,27 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.dispatch import Signal
+from django.utils import timezone
+
+
+# Sent (after commit) with book_ids when stock changes through queryset
+# updates, which bypass post_save; bulk=True for bulk stock updates.
+stock_changed = Signal()
+
+# Sent (after commit) when books were bulk-imported without post_save.
+books_imported = Signal()
+
+
+class InsufficientStockError(ValueError):
+    """
+    Raised when a stock reservation cannot be satisfied.
+
+    Attributes:
+        book_ids: IDs of the books without enough stock
+    """
+    def __init__(self, book_ids=()):
+        self.book_ids = list(book_ids)
+        super().__init__("Insufficient stock quantity")
 
 
 class Book(models.Model):
@@ -18,6 +41,10 @@ class Book(models.Model):
         description: Book description
         publication_date: Publication date
         pages: Number of pages
+        rating_count: Number of ratings (maintained by Rating save/delete)
+        rating_sum: Sum of rating scores (maintained by Rating save/delete)
+        review_count: Number of approved reviews (maintained by Review save/delete)
+        review_avg: Average rating of approved reviews (maintained by Review save/delete)
     """
     category = models.ForeignKey(
         'store.Category',
@@ -48,6 +75,10 @@ class Book(models.Model):
     stock_quantity = models.IntegerField(default=0)
     pages = models.PositiveIntegerField(blank=True, null=True)
     publication_date = models.DateField(blank=True, null=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    review_avg = models.FloatField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -56,20 +87,108 @@ class Book(models.Model):
         verbose_name = 'Book'
         verbose_name_plural = 'Books'
         ordering = ['title']
+        indexes = [
+            # Keyset pagination of the catalog
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Price as stored, so save() can detect price changes
+        instance._stored_price = instance.__dict__.get('price')
+        return instance
+
+    def save(self, *args, **kwargs):
+        stored_price = getattr(self, '_stored_price', None)
+        super().save(*args, **kwargs)
+        if stored_price is not None and stored_price != self.price:
+            self.price_changed()
+        self._stored_price = self.price
+
+    def price_changed(self):
+        """Refresh the cached totals of every cart holding this book."""
+        from store.models.order.cart import Cart
+        Cart.refresh_totals(Cart.objects.filter(items__book=self))
+
     def is_in_stock(self):
         """Check if book is available in stock."""
         return self.stock_quantity > 0
 
     def reduce_stock(self, quantity):
         """Reduce stock quantity after purchase."""
-        if quantity > self.stock_quantity:
-            raise ValueError("Insufficient stock quantity")
-        self.stock_quantity -= quantity
-        self.save()
+        Book.reserve_stock({self.id: quantity})
+        self.refresh_from_db(fields=['stock_quantity'])
+
+    @classmethod
+    def reserve_stock(cls, quantities):
+        """
+        Atomically take stock for several books in one conditional UPDATE:
+        ``SET stock_quantity = stock_quantity - n WHERE stock_quantity >= n``.
+        Either every book is decremented or none is.
+
+        Args:
+            quantities: dict mapping book_id to the quantity to take
+
+        Raises:
+            InsufficientStockError: if any book has less stock than requested
+        """
+        quantities = {book_id: quantity for book_id, quantity in quantities.items() if quantity > 0}
+        if not quantities:
+            return
+        requested = models.Case(
+            *[models.When(id=book_id, then=models.Value(quantity)) for book_id, quantity in quantities.items()],
+            output_field=models.IntegerField()
+        )
+        try:
+            with transaction.atomic():
+                updated = cls.objects.filter(
+                    id__in=quantities,
+                    stock_quantity__gte=requested
+                ).update(
+                    stock_quantity=models.F('stock_quantity') - requested,
+                    updated_at=timezone.now()
+                )
+                if updated != len(quantities):
+                    raise InsufficientStockError()
+        except InsufficientStockError:
+            short = cls.objects.filter(
+                id__in=quantities,
+                stock_quantity__lt=requested
+            ).values_list('id', flat=True)
+            raise InsufficientStockError(short)
+
+        book_ids = list(quantities)
+        transaction.on_commit(lambda: stock_changed.send(sender=cls, book_ids=book_ids))
+
+    @classmethod
+    def update_stock(cls, quantities, relative=False):
+        """
+        Set (or with relative=True, add to) the stock of several books in one
+        UPDATE. Relative changes never take stock below zero.
+
+        Args:
+            quantities: dict mapping book_id to quantity
+
+        Returns:
+            Number of books updated
+        """
+        if not quantities:
+            return 0
+        amount = models.Case(
+            *[models.When(id=book_id, then=models.Value(quantity)) for book_id, quantity in quantities.items()],
+            output_field=models.IntegerField()
+        )
+        if relative:
+            amount = Greatest(models.F('stock_quantity') + amount, models.Value(0))
+        updated = cls.objects.filter(id__in=quantities).update(stock_quantity=amount, updated_at=timezone.now())
+
+        book_ids = list(quantities)
+        transaction.on_commit(lambda: stock_changed.send(sender=cls, book_ids=book_ids, bulk=True))
+        return updated
 
     def add_stock(self, quantity):
         """Add stock quantity (for staff inventory management)."""
@@ -77,12 +196,82 @@ class Book(models.Model):
         self.save()
 
     def get_average_rating(self):
-        """Calculate average rating from reviews."""
-        reviews = self.reviews.filter(is_approved=True)
-        if not reviews.exists():
-            return 0
-        return reviews.aggregate(models.Avg('rating'))['rating__avg']
+        """Average rating of approved reviews (cached column)."""
+        return self.review_avg if self.review_count else 0
 
     def get_reviews_count(self):
-        """Return number of approved reviews."""
-        return self.reviews.filter(is_approved=True).count()
+        """Return number of approved reviews (cached column)."""
+        return self.review_count
+
+    def get_average_score(self):
+        """Average Rating score, or None when the book has no ratings (cached columns)."""
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+    @classmethod
+    def apply_rating_delta(cls, book_id, count, total):
+        """Add count ratings with a total score of total (both may be negative)."""
+        cls.objects.filter(pk=book_id).update(
+            rating_count=models.F('rating_count') + count,
+            rating_sum=models.F('rating_sum') + total
+        )
+
+    @classmethod
+    def apply_review_delta(cls, book_id, count, total):
+        """Add count approved reviews with a total rating of total (both may be negative)."""
+        new_count = models.F('review_count') + count
+        cls.objects.filter(pk=book_id).update(
+            # review_avg is assigned first: MySQL evaluates SET left to right
+            # and must still see the old review_count here
+            review_avg=models.Case(
+                models.When(review_count=-count, then=models.Value(0.0)),
+                default=(models.F('review_avg') * models.F('review_count') + total) / Cast(
+                    new_count, models.FloatField()
+                ),
+                output_field=models.FloatField()
+            ),
+            review_count=new_count
+        )
+
+    @staticmethod
+    def _live_rating_expressions():
+        """Correlated subqueries recomputing the cached rating/review columns."""
+        from store.models.customer.rating import Rating
+        from store.models.customer.review import Review
+
+        ratings = Rating.objects.filter(book=models.OuterRef('pk')).order_by().values('book')
+        reviews = Review.objects.filter(book=models.OuterRef('pk'), is_approved=True).order_by().values('book')
+        return {
+            'rating_count': Coalesce(models.Subquery(ratings.annotate(n=models.Count('id')).values('n')), 0),
+            'rating_sum': Coalesce(models.Subquery(ratings.annotate(n=models.Sum('score')).values('n')), 0),
+            'review_count': Coalesce(models.Subquery(reviews.annotate(n=models.Count('id')).values('n')), 0),
+            'review_avg': Coalesce(
+                models.Subquery(reviews.annotate(n=models.Avg('rating', output_field=models.FloatField())).values('n')),
+                0.0, output_field=models.FloatField()
+            ),
+        }
+
+    @classmethod
+    def with_live_rating_aggregates(cls, books=None):
+        """
+        Annotate books with the rating/review aggregates recomputed from the
+        source rows, as live_rating_count, live_rating_sum, live_review_count
+        and live_review_avg.
+        """
+        books = cls.objects.all() if books is None else books
+        return books.annotate(**{
+            f'live_{field}': expression for field, expression in cls._live_rating_expressions().items()
+        })
+
+    @classmethod
+    def refresh_rating_aggregates(cls, books=None):
+        """
+        Recompute the cached rating/review columns from the source rows in one UPDATE.
+
+        Args:
+            books: Book queryset to refresh (default: all books)
+
+        Returns:
+            Number of books updated
+        """
+        books = cls.objects.all() if books is None else books
+        return books.update(**cls._live_rating_expressions())
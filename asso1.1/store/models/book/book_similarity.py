@@ -0,0 +1,268 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models, transaction
+
+
+class BookSimilarity(models.Model):
+    """
+    BookSimilarity Model - Precomputed item-to-item co-occurrence index.
+    recommend_books() reads the best neighbours of a book with a single
+    indexed read instead of several aggregate queries.
+
+    With the cooccurrence metric every co-occurring pair is stored, not just
+    the top N: record_order and record_rating add deltas to existing scores,
+    so a pair dropped at rebuild time would come back holding only its
+    delta. The top N is taken at read time (top_for). Batch-only metrics
+    (cosine, jaccard) keep NEIGHBOURS_PER_BOOK rows per book.
+
+    Attributes:
+        book: The book recommendations are computed for
+        similar_book: A neighbour of book
+        score: Weighted co-purchase / co-rating score (higher is better)
+    """
+    # Same weights as the on-the-fly scoring in recommend_books()
+    ORDER_WEIGHT = 4.0
+    RATING_WEIGHT = 2.0
+    HIGH_RATING = 4
+    # Number of neighbours kept per book by the batch-only metrics
+    NEIGHBOURS_PER_BOOK = 20
+    # The only metric record_order / record_rating can maintain
+    INCREMENTAL_METRIC = 'cooccurrence'
+
+    book = models.ForeignKey(
+        'store.Book',
+        on_delete=models.CASCADE,
+        related_name='similarities'
+    )
+    similar_book = models.ForeignKey(
+        'store.Book',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'store_book_similarity'
+        verbose_name = 'Book Similarity'
+        verbose_name_plural = 'Book Similarities'
+        unique_together = ['book', 'similar_book']
+        indexes = [
+            models.Index(fields=['book', '-score'], name='book_similarity_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} -> {self.similar_book_id}: {self.score:.1f}"
+
+    @classmethod
+    def top_for(cls, book_id, limit=5):
+        """Return the best in-stock neighbours of a book (one indexed read)."""
+        rows = cls.objects.filter(
+            book_id=book_id,
+            similar_book__stock_quantity__gt=0
+        ).select_related('similar_book').order_by('-score')[:limit]
+        return [row.similar_book for row in rows]
+
+    @classmethod
+    def configured_metric(cls):
+        """
+        Metric the index is built with (settings.RECOMMENDATION_METRIC):
+        cooccurrence, or cosine / jaccard, which only the batch
+        build_recommendations job can compute.
+        """
+        return getattr(settings, 'RECOMMENDATION_METRIC', cls.INCREMENTAL_METRIC)
+
+    @classmethod
+    def is_incremental(cls):
+        """Whether checkout and rating keep the index up to date between rebuilds."""
+        return cls.configured_metric() == cls.INCREMENTAL_METRIC
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Add score deltas to the index.
+
+        Args:
+            deltas: dict mapping (book_id, similar_book_id) to a score delta
+        """
+        deltas = {pair: delta for pair, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        book_ids = {book_id for book_id, _ in deltas}
+        with transaction.atomic():
+            existing = {
+                (row.book_id, row.similar_book_id): row
+                for row in cls.objects.select_for_update().filter(
+                    book_id__in=book_ids,
+                    similar_book_id__in={similar_id for _, similar_id in deltas}
+                )
+            }
+            to_update = []
+            to_create = []
+            for (book_id, similar_id), delta in deltas.items():
+                row = existing.get((book_id, similar_id))
+                if row is not None:
+                    row.score += delta
+                    to_update.append(row)
+                else:
+                    to_create.append(cls(book_id=book_id, similar_book_id=similar_id, score=delta))
+            if to_update:
+                cls.objects.bulk_update(to_update, ['score'])
+            if to_create:
+                cls.objects.bulk_create(to_create, ignore_conflicts=True)
+            if any(delta < 0 for delta in deltas.values()):
+                cls.objects.filter(book_id__in=book_ids, score__lte=0).delete()
+
+    @classmethod
+    def record_order(cls, order, book_ids=None):
+        """
+        Update co-purchase scores after an order's items have been created.
+        Mirrors the OrderItem strategy of recommend_books(): for a book b the
+        customer ordered, every OrderItem row of another book counts once.
+
+        Args:
+            order: The new Order
+            book_ids: Book id of each of its OrderItems (read from the order if omitted)
+        """
+        from store.models.order.order import OrderItem
+
+        if not cls.is_incremental():
+            # The batch job owns a cosine / jaccard index
+            return
+
+        previous = defaultdict(int)
+        for row in OrderItem.objects.filter(
+            order__customer_id=order.customer_id
+        ).exclude(order_id=order.id).values('book_id').annotate(rows=models.Count('id')):
+            previous[row['book_id']] = row['rows']
+
+        new = defaultdict(int)
+        if book_ids is None:
+            book_ids = order.order_items.values_list('book_id', flat=True)
+        for book_id in book_ids:
+            new[book_id] += 1
+
+        combined = defaultdict(int, previous)
+        for book_id, rows in new.items():
+            combined[book_id] += rows
+
+        deltas = defaultdict(float)
+        for book_id in combined:
+            # A customer joining a book's audience contributes all their rows,
+            # an existing audience member only contributes the new ones.
+            contributing = new if book_id in previous else combined
+            for other_id, rows in contributing.items():
+                if other_id != book_id:
+                    deltas[(book_id, other_id)] += rows * cls.ORDER_WEIGHT
+        cls.apply_deltas(deltas)
+
+    @classmethod
+    def record_rating(cls, customer_id, book_id, score, old_score=None):
+        """
+        Update co-rating scores after a customer rated (or re-rated) a book.
+        Only high ratings (4 or 5) take part, as in recommend_books().
+        """
+        from store.models.customer.rating import Rating
+
+        if not cls.is_incremental():
+            return
+
+        was_liked = old_score is not None and old_score >= cls.HIGH_RATING
+        is_liked = score >= cls.HIGH_RATING
+        if not was_liked and not is_liked:
+            return
+
+        liked = Rating.objects.filter(
+            customer_id=customer_id,
+            score__gte=cls.HIGH_RATING
+        ).exclude(book_id=book_id).values_list('book_id', 'score')
+
+        deltas = defaultdict(float)
+        for other_id, other_score in liked:
+            if was_liked:
+                deltas[(book_id, other_id)] -= other_score * cls.RATING_WEIGHT
+                deltas[(other_id, book_id)] -= old_score * cls.RATING_WEIGHT
+            if is_liked:
+                deltas[(book_id, other_id)] += other_score * cls.RATING_WEIGHT
+                deltas[(other_id, book_id)] += score * cls.RATING_WEIGHT
+        cls.apply_deltas(deltas)
+
+    @classmethod
+    def compute_scores(cls):
+        """
+        Compute the full co-purchase / co-rating score table from history.
+
+        Returns:
+            dict mapping book_id to a dict of {similar_book_id: score}
+        """
+        from store.models.order.order import OrderItem
+        from store.models.customer.rating import Rating
+
+        scores = defaultdict(lambda: defaultdict(float))
+
+        # Co-purchase: rows per book per customer
+        purchases = defaultdict(lambda: defaultdict(int))
+        for row in OrderItem.objects.values('order__customer_id', 'book_id').annotate(
+            rows=models.Count('id')
+        ).iterator():
+            purchases[row['order__customer_id']][row['book_id']] = row['rows']
+        for rows_by_book in purchases.values():
+            for book_id in rows_by_book:
+                for other_id, rows in rows_by_book.items():
+                    if other_id != book_id:
+                        scores[book_id][other_id] += rows * cls.ORDER_WEIGHT
+
+        # Co-rating: high ratings per customer
+        liked = defaultdict(dict)
+        for customer_id, book_id, score in Rating.objects.filter(
+            score__gte=cls.HIGH_RATING
+        ).values_list('customer_id', 'book_id', 'score').iterator():
+            liked[customer_id][book_id] = score
+        for scores_by_book in liked.values():
+            for book_id in scores_by_book:
+                for other_id, score in scores_by_book.items():
+                    if other_id != book_id:
+                        scores[book_id][other_id] += score * cls.RATING_WEIGHT
+
+        return scores
+
+    @classmethod
+    def rebuild(cls, batch_size=5000):
+        """
+        Rebuild the whole index from order and rating history
+        (the cooccurrence metric, every pair).
+
+        Returns:
+            Number of similarity rows written
+        """
+        if not cls.is_incremental():
+            raise ValueError(
+                f'The index is built with {cls.configured_metric()}: use build_recommendations'
+            )
+        scores = cls.compute_scores()
+        return cls.replace_index(
+            {book_id: list(similar.items()) for book_id, similar in scores.items()},
+            batch_size=batch_size
+        )
+
+    @classmethod
+    def replace_index(cls, neighbours_by_book, batch_size=5000):
+        """
+        Replace the whole index in one transaction.
+
+        Args:
+            neighbours_by_book: dict mapping book_id to a list of (similar_book_id, score)
+
+        Returns:
+            Number of similarity rows written
+        """
+        rows = [
+            cls(book_id=book_id, similar_book_id=similar_id, score=score)
+            for book_id, neighbours in neighbours_by_book.items()
+            for similar_id, score in neighbours
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
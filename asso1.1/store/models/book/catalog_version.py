@@ -0,0 +1,44 @@
+from django.db import models
+from django.db.models import F
+
+
+class CatalogVersion(models.Model):
+    """
+    CatalogVersion Model - Catalog change stamp shared by all processes.
+
+    A single row (pk=1) whose counter is incremented after bulk catalog
+    changes (imports, bulk stock updates), which usually run in another
+    process (the job worker, manage.py import_books). Web processes compare
+    it with the value they last saw and drop their in-process search and
+    autocomplete indexes and local cache entries when it moved (see
+    store.catalog_sync).
+
+    Attributes:
+        version: Incremented on every bulk catalog change
+        updated_at: When it was last incremented
+    """
+    SINGLETON_ID = 1
+
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'store_catalog_version'
+        verbose_name = 'Catalog Version'
+        verbose_name_plural = 'Catalog Versions'
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
+
+    @classmethod
+    def current(cls):
+        """The current version (0 before the first bulk change)."""
+        version = cls.objects.filter(pk=cls.SINGLETON_ID).values_list('version', flat=True).first()
+        return version or 0
+
+    @classmethod
+    def bump(cls):
+        """Increment the version atomically and return the new value."""
+        cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+        cls.objects.filter(pk=cls.SINGLETON_ID).update(version=F('version') + 1)
+        return cls.current()
@@ -37,3 +37,33 @@ class Rating(models.Model):
 
     def __str__(self):
         return f"{self.customer.name} rated {self.book.title}: {self.score}/5"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Score as stored, so save/delete can apply the difference to Book's rating columns
+        instance._stored_score = instance.__dict__.get('score')
+        return instance
+
+    def _apply_to_book(self, count, total):
+        from store.models.book.book import Book
+        Book.apply_rating_delta(self.book_id, count, total)
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        stored = None if adding else getattr(self, '_stored_score', None)
+        if not adding and stored is None:
+            stored = Rating.objects.filter(pk=self.pk).values_list('score', flat=True).first()
+        super().save(*args, **kwargs)
+        score = int(self.score)
+        if stored is None:
+            self._apply_to_book(1, score)
+        elif score != stored:
+            self._apply_to_book(0, score - stored)
+        self._stored_score = score
+
+    def delete(self, *args, **kwargs):
+        stored = getattr(self, '_stored_score', None)
+        result = super().delete(*args, **kwargs)
+        self._apply_to_book(-1, -(self.score if stored is None else stored))
+        return result
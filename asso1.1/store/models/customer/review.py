@@ -49,6 +49,47 @@ class Review(models.Model):
     def __str__(self):
         return f"Review by {self.customer.name} for {self.book.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Approval and rating as stored, so save/delete can update Book's review columns
+        instance._stored_review = (instance.__dict__.get('is_approved'), instance.__dict__.get('rating'))
+        return instance
+
+    def _apply_to_book(self, was_approved, old_rating, approved, rating):
+        from store.models.book.book import Book
+        count = int(bool(approved)) - int(bool(was_approved))
+        total = (rating if approved else 0) - (old_rating if was_approved else 0)
+        if count or total:
+            Book.apply_review_delta(self.book_id, count, total)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            stored = (False, 0)
+        else:
+            stored = getattr(self, '_stored_review', None) or Review.objects.filter(
+                pk=self.pk
+            ).values_list('is_approved', 'rating').first() or (False, 0)
+        super().save(*args, **kwargs)
+        self._apply_to_book(*stored, self.is_approved, int(self.rating))
+        self._stored_review = (self.is_approved, int(self.rating))
+
+    def delete(self, *args, **kwargs):
+        stored = getattr(self, '_stored_review', None) or (self.is_approved, self.rating)
+        result = super().delete(*args, **kwargs)
+        self._apply_to_book(*stored, False, 0)
+        return result
+
+    def approve(self):
+        """Approve this review for display."""
+        self.is_approved = True
+        self.save()
+
+    def reject(self):
+        """Withdraw approval of this review."""
+        self.is_approved = False
+        self.save()
+
     def mark_helpful(self):
         """Mark this review as helpful."""
         self.helpful_votes += 1
@@ -0,0 +1,4 @@
+# Job domain models
+from store.models.job.job import Job
+
+__all__ = ['Job']
@@ -0,0 +1,174 @@
+import time
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Job Model - A long-running staff operation (import, index rebuild, bulk
+    update) queued in the database and executed by ``manage.py run_worker``.
+
+    Attributes:
+        kind: Handler to run (see store.jobs)
+        status: queued, running, succeeded or failed
+        payload: Handler arguments (JSON)
+        input_file: Uploaded file the handler reads (optional)
+        progress: Percentage complete (0-100)
+        message: Current step, shown while the job runs
+        result: Handler result (JSON), e.g. an import report
+        error: Traceback of a failed job
+        attempts: Times the job has been claimed by a worker
+        worker: Name of the worker running the job
+        created_by: Foreign key to Staff who submitted the job
+        heartbeat_at: Last sign of life from the worker (stale jobs are requeued)
+    """
+    KIND_CHOICES = [
+        ('import_books', 'Import Books'),
+        ('rebuild_recommendations', 'Rebuild Recommendations'),
+        ('bulk_stock_update', 'Bulk Stock Update'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    # Claims before a repeatedly stalled job is given up
+    MAX_ATTEMPTS = 3
+    # Minimum seconds between progress writes
+    PROGRESS_INTERVAL = 0.5
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    payload = models.JSONField(default=dict, blank=True)
+    input_file = models.FileField(upload_to='jobs/%Y/%m/', blank=True)
+    progress = models.FloatField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(
+        'store.Staff',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'store_job'
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            # Queue polling: oldest queued job first
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.id} {self.get_kind_display()} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    @classmethod
+    def submit(cls, kind, payload=None, input_file=None, created_by_id=None):
+        """Queue a job (input_file is an uploaded file saved under MEDIA_ROOT)."""
+        job = cls(kind=kind, payload=payload or {}, created_by_id=created_by_id, message='Waiting for a worker')
+        if input_file is not None:
+            job.input_file.save(input_file.name, input_file, save=False)
+        job.save()
+        return job
+
+    @classmethod
+    def claim(cls, worker, candidates=10):
+        """
+        Take the oldest queued job for a worker, or return None.
+
+        The claim is a conditional UPDATE (status='queued' -> 'running'), so
+        concurrent workers never run the same job, on any database backend.
+        """
+        queued = cls.objects.filter(status='queued').order_by('created_at', 'id').values_list('id', flat=True)
+        for job_id in queued[:candidates]:
+            now = timezone.now()
+            claimed = cls.objects.filter(pk=job_id, status='queued').update(
+                status='running',
+                worker=worker,
+                attempts=models.F('attempts') + 1,
+                started_at=now,
+                heartbeat_at=now,
+                message='Started'
+            )
+            if claimed:
+                return cls.objects.get(pk=job_id)
+        return None
+
+    @classmethod
+    def requeue_stale(cls, seconds):
+        """
+        Requeue running jobs whose worker has not sent a heartbeat for the
+        given number of seconds (the worker died); give up after MAX_ATTEMPTS.
+
+        Returns:
+            Number of jobs requeued or failed
+        """
+        stale = cls.objects.filter(status='running', heartbeat_at__lt=timezone.now() - timedelta(seconds=seconds))
+        failed = stale.filter(attempts__gte=cls.MAX_ATTEMPTS).update(
+            status='failed', error='Worker stopped responding', finished_at=timezone.now()
+        )
+        requeued = stale.update(status='queued', worker='', message='Requeued after a worker stopped responding')
+        return failed + requeued
+
+    def heartbeat(self):
+        Job.objects.filter(pk=self.pk, status='running').update(heartbeat_at=timezone.now())
+
+    def set_progress(self, percent, message=None):
+        """Record progress (throttled to one write per PROGRESS_INTERVAL)."""
+        now = time.monotonic()
+        if percent < 100 and now - getattr(self, '_progress_written', 0) < self.PROGRESS_INTERVAL:
+            return
+        self._progress_written = now
+        self.progress = max(0.0, min(100.0, float(percent)))
+        if message is not None:
+            self.message = message[:255]
+        Job.objects.filter(pk=self.pk, status='running').update(
+            progress=self.progress, message=self.message, heartbeat_at=timezone.now()
+        )
+
+    def succeed(self, result=None):
+        self.status = 'succeeded'
+        self.progress = 100
+        self.message = 'Done'
+        self.result = result
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'progress', 'message', 'result', 'finished_at'])
+
+    def fail(self, error):
+        self.status = 'failed'
+        self.message = 'Failed'
+        self.error = error
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'message', 'error', 'finished_at'])
+
+    def as_dict(self):
+        """Status fields polled by the staff UI."""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': round(self.progress, 1),
+            'message': self.message,
+            'finished': self.is_finished,
+            'result': self.result,
+            'error': self.error,
+        }
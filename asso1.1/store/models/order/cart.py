@@ -1,4 +1,12 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
 
 
 class Cart(models.Model):
@@ -7,6 +15,8 @@ class Cart(models.Model):
     
     Attributes:
         customer: Foreign key to Customer (optional for guest checkout)
+        total_items: Cached number of items (maintained by CartItem save/delete)
+        total_price: Cached total price (maintained by CartItem and Book price changes)
         created_at: Timestamp when cart was created
         updated_at: Timestamp when cart was last updated
     """
@@ -18,6 +28,8 @@ class Cart(models.Model):
         blank=True
     )
     session_key = models.CharField(max_length=255, null=True, blank=True)
+    total_items = models.PositiveIntegerField(default=0)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -32,13 +44,73 @@ class Cart(models.Model):
         return f"Guest Cart ({self.session_key})"
 
     def get_total_price(self):
-        """Calculate total price of all items in cart."""
-        return sum(item.get_subtotal() for item in self.items.all())
+        """Total price of all items in cart (cached column)."""
+        return self.total_price
 
     def get_total_items(self):
-        """Get total number of items in cart."""
-        return sum(item.quantity for item in self.items.all())
+        """Total number of items in cart (cached column)."""
+        return self.total_items
+
+    def aggregate_totals(self):
+        """
+        Compute (total_items, total_price) from the cart lines in one SQL
+        aggregate, bypassing the cached columns.
+        """
+        totals = self.items.aggregate(
+            items=Coalesce(Sum('quantity'), 0),
+            price=Coalesce(
+                Sum(F('quantity') * F('book__price'), output_field=MONEY),
+                Decimal('0.00')
+            ),
+        )
+        return totals['items'], totals['price']
+
+    def recalculate_totals(self):
+        """Rebuild the cached totals from the cart lines."""
+        self.total_items, self.total_price = self.aggregate_totals()
+        Cart.objects.filter(pk=self.pk).update(total_items=self.total_items, total_price=self.total_price)
+
+    @classmethod
+    def refresh_totals(cls, carts=None):
+        """
+        Rebuild the cached totals of many carts in one UPDATE, e.g. after a
+        book price change.
+
+        Args:
+            carts: Cart queryset, or an iterable of cart IDs (default: all carts)
+        """
+        from store.models.order.cart_item import CartItem
+
+        if carts is None:
+            carts = cls.objects.all()
+        elif not isinstance(carts, models.QuerySet):
+            carts = cls.objects.filter(pk__in=list(carts))
+        lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+        return carts.update(
+            total_items=Coalesce(Subquery(lines.annotate(total=Sum('quantity')).values('total')), 0),
+            total_price=Coalesce(
+                Subquery(
+                    lines.annotate(
+                        total=Sum(F('quantity') * F('book__price'), output_field=MONEY)
+                    ).values('total')
+                ),
+                Decimal('0.00'),
+                output_field=MONEY
+            ),
+        )
+
+    def apply_delta(self, items, price):
+        """Add a quantity/price change to the cached totals."""
+        Cart.objects.filter(pk=self.pk).update(
+            total_items=F('total_items') + items,
+            total_price=F('total_price') + price,
+            updated_at=timezone.now()
+        )
+        self.total_items += items
+        self.total_price += price
 
     def clear(self):
         """Remove all items from cart."""
         self.items.all().delete()
+        self.total_items, self.total_price = 0, Decimal('0.00')
+        Cart.objects.filter(pk=self.pk).update(total_items=0, total_price=Decimal('0.00'))
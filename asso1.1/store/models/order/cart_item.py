@@ -32,6 +32,39 @@ class CartItem(models.Model):
     def __str__(self):
         return f"{self.quantity}x {self.book.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Quantity as stored, so save/delete can apply the difference to Cart totals
+        instance._stored_quantity = instance.__dict__.get('quantity')
+        return instance
+
+    def _cart(self):
+        """The cart, reusing the instance already loaded on this item if any."""
+        if CartItem.cart.is_cached(self):
+            return self.cart
+        from store.models.order.cart import Cart
+        return Cart(pk=self.cart_id, total_items=0, total_price=0)
+
+    def save(self, *args, **kwargs):
+        stored = 0 if self._state.adding else getattr(self, '_stored_quantity', None)
+        if stored is None:
+            stored = CartItem.objects.filter(pk=self.pk).values_list('quantity', flat=True).first() or 0
+        super().save(*args, **kwargs)
+        delta = self.quantity - stored
+        self._stored_quantity = self.quantity
+        if delta:
+            self._cart().apply_delta(delta, self.book.price * delta)
+
+    def delete(self, *args, **kwargs):
+        stored = getattr(self, '_stored_quantity', None)
+        if stored is None:
+            stored = self.quantity
+        result = super().delete(*args, **kwargs)
+        if stored:
+            self._cart().apply_delta(-stored, -self.book.price * stored)
+        return result
+
     def get_subtotal(self):
         """Calculate subtotal for this cart item."""
         return self.book.price * self.quantity
@@ -1,7 +1,32 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
+from django.utils import timezone
 from decimal import Decimal
 
 
+class OrderQuerySet(models.QuerySet):
+    """
+    Query shapes for the order pages, so each page issues a fixed number of
+    queries however many orders or items it shows.
+    """
+
+    def for_listing(self):
+        """Order lists: the customer joined in, only the columns the tables show."""
+        return self.select_related('customer').only(
+            'id', 'status', 'total', 'created_at', 'customer', 'customer__name', 'customer__email'
+        )
+
+    def with_items(self):
+        """Prefetch the order items with their books (one extra query per page)."""
+        return self.prefetch_related(
+            models.Prefetch('order_items', queryset=OrderItem.objects.select_related('book').order_by('id'))
+        )
+
+    def for_detail(self):
+        """Order pages: customer, shipping and payment joined in, items prefetched."""
+        return self.select_related('customer', 'shipping', 'payment').with_items()
+
+
 class Order(models.Model):
     """
     Order Model - Represents a customer order.
@@ -22,6 +47,9 @@ class Order(models.Model):
         ('cancelled', 'Cancelled'),
     ]
 
+    # Statuses counted as sales in the daily rollups (store.models.analytics)
+    SALES_STATUSES = ('confirmed', 'processing', 'shipped', 'delivered')
+
     customer = models.ForeignKey(
         'store.Customer',
         on_delete=models.CASCADE,
@@ -55,18 +83,89 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         db_table = 'store_order'
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the staff order list
+            models.Index(fields=['created_at', 'id'], name='order_created_id_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='order_status_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.customer.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as stored, so save can tell when the order enters or leaves the sales rollups
+        instance._stored_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        stored = None if adding else getattr(self, '_stored_status', None)
+        if not adding and stored is None:
+            stored = Order.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+        was_sale = stored in self.SALES_STATUSES
+        is_sale = self.status in self.SALES_STATUSES
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if was_sale != is_sale:
+                Order.record_sales([self], 1 if is_sale else -1)
+        self._stored_status = self.status
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if getattr(self, '_stored_status', self.status) in self.SALES_STATUSES:
+                Order.record_sales([self], -1)
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def record_sales(cls, orders, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) the items of orders in the daily
+        book, category and author sales rollups, dated by the day each
+        order was placed. Issues one read and two writes per rollup table,
+        whatever the number of orders.
+        """
+        from store.models.analytics import DailyAuthorSales, DailyBookSales, DailyCategorySales
+
+        dates = {order.pk: timezone.localdate(order.created_at) for order in orders}
+        totals = {
+            model: defaultdict(lambda: [0, Decimal('0'), set()])
+            for model in (DailyBookSales, DailyCategorySales, DailyAuthorSales)
+        }
+        items = OrderItem.objects.filter(order_id__in=dates).values_list(
+            'order_id', 'book_id', 'book__category_id', 'book__author_obj_id', 'quantity', 'price'
+        )
+        for order_id, book_id, category_id, author_id, quantity, price in items:
+            date = dates[order_id]
+            for model, key_id in ((DailyBookSales, book_id), (DailyCategorySales, category_id), (DailyAuthorSales, author_id)):
+                if key_id is None:
+                    continue
+                total = totals[model][(date, key_id)]
+                total[0] += quantity
+                total[1] += price * quantity
+                total[2].add(order_id)
+
+        for model, keyed in totals.items():
+            model.apply({
+                key: (sign * quantity, sign * revenue, sign * len(order_ids))
+                for key, (quantity, revenue, order_ids) in keyed.items()
+            })
+
+    def get_items_total(self):
+        """Sum of the item subtotals (uses prefetched items, see OrderQuerySet.with_items)."""
+        return sum((item.get_subtotal() for item in self.order_items.all()), Decimal('0'))
+
     def calculate_total(self):
         """Calculate total order amount including shipping."""
-        items_total = sum(float(item.get_subtotal()) for item in self.order_items.all())
+        items_total = float(self.get_items_total())
         shipping_cost = float(self.shipping.cost) if self.shipping else 0.0
         self.total = items_total + shipping_cost
         self.save()
@@ -1,4 +1,5 @@
 # Staff Domain Package
 from store.models.staff.staff import Staff
+from store.models.staff.dashboard_snapshot import DashboardSnapshot
 
-__all__ = ['Staff']
+__all__ = ['Staff', 'DashboardSnapshot']
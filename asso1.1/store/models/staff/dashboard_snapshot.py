@@ -0,0 +1,124 @@
+import time
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+class DashboardSnapshot(models.Model):
+    """
+    DashboardSnapshot Model - Precomputed staff dashboard statistics.
+
+    A single row (pk=1) that the dashboard reads with one primary key
+    lookup. It is refreshed by ``manage.py refresh_dashboard`` (cron or
+    --every), by the dashboard's refresh button, and by the dashboard
+    itself once it is older than settings.DASHBOARD_SNAPSHOT_MAX_AGE.
+
+    Attributes:
+        total_books: Number of books
+        low_stock_books: Books with fewer than LOW_STOCK copies
+        out_of_stock: Books with no stock
+        pending_orders: Orders with status pending
+        total_orders: Number of orders
+        recent_orders: Latest orders (JSON list for the dashboard table)
+        low_stock_list: Low stock books (JSON list for the dashboard table)
+        refreshed_at: When the snapshot was computed
+        refresh_seconds: Time the last refresh took
+    """
+    SINGLETON_ID = 1
+    LOW_STOCK = 10
+    LIST_SIZE = 5
+
+    total_books = models.PositiveIntegerField(default=0)
+    low_stock_books = models.PositiveIntegerField(default=0)
+    out_of_stock = models.PositiveIntegerField(default=0)
+    pending_orders = models.PositiveIntegerField(default=0)
+    total_orders = models.PositiveIntegerField(default=0)
+    recent_orders = models.JSONField(default=list)
+    low_stock_list = models.JSONField(default=list)
+    refreshed_at = models.DateTimeField()
+    refresh_seconds = models.FloatField(default=0)
+
+    class Meta:
+        db_table = 'store_dashboard_snapshot'
+        verbose_name = 'Dashboard Snapshot'
+        verbose_name_plural = 'Dashboard Snapshots'
+
+    def __str__(self):
+        return f"Dashboard snapshot ({self.refreshed_at:%Y-%m-%d %H:%M:%S})"
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was computed."""
+        return (timezone.now() - self.refreshed_at).total_seconds()
+
+    @property
+    def stats(self):
+        return {
+            'total_books': self.total_books,
+            'low_stock_books': self.low_stock_books,
+            'out_of_stock': self.out_of_stock,
+            'pending_orders': self.pending_orders,
+            'total_orders': self.total_orders,
+        }
+
+    @classmethod
+    def compute(cls):
+        """
+        Compute the dashboard figures: one conditional aggregate per table
+        plus the two short lists.
+        """
+        from store.models import Book, Order
+
+        books = Book.objects.aggregate(
+            total_books=Count('id'),
+            low_stock_books=Count('id', filter=Q(stock_quantity__lt=cls.LOW_STOCK)),
+            out_of_stock=Count('id', filter=Q(stock_quantity=0)),
+        )
+        orders = Order.objects.aggregate(
+            total_orders=Count('id'),
+            pending_orders=Count('id', filter=Q(status='pending')),
+        )
+        status_labels = dict(Order.STATUS_CHOICES)
+        recent_orders = [
+            {
+                'id': order['id'],
+                'customer': order['customer__name'],
+                'status': order['status'],
+                'status_display': status_labels.get(order['status'], order['status']),
+                'total': order['total'],
+            }
+            for order in Order.objects.order_by('-created_at').values(
+                'id', 'customer__name', 'status', 'total'
+            )[:cls.LIST_SIZE]
+        ]
+        low_stock_list = list(
+            Book.objects.filter(stock_quantity__lt=cls.LOW_STOCK)
+            .order_by('stock_quantity', 'id')
+            .values('id', 'title', 'stock_quantity')[:cls.LIST_SIZE]
+        )
+        return {**books, **orders, 'recent_orders': recent_orders, 'low_stock_list': low_stock_list}
+
+    @classmethod
+    def refresh(cls):
+        """Recompute and store the snapshot."""
+        start = time.perf_counter()
+        values = cls.compute()
+        values['refreshed_at'] = timezone.now()
+        values['refresh_seconds'] = time.perf_counter() - start
+        snapshot, _ = cls.objects.update_or_create(pk=cls.SINGLETON_ID, defaults=values)
+        return snapshot
+
+    @classmethod
+    def current(cls, max_age=None):
+        """
+        The snapshot, refreshed first if it is missing or older than max_age
+        seconds (default settings.DASHBOARD_SNAPSHOT_MAX_AGE).
+        """
+        if max_age is None:
+            max_age = getattr(settings, 'DASHBOARD_SNAPSHOT_MAX_AGE', 300)
+        snapshot = cls.objects.filter(pk=cls.SINGLETON_ID).first()
+        if snapshot is None or snapshot.age > max_age:
+            snapshot = cls.refresh()
+        return snapshot
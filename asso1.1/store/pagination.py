@@ -0,0 +1,131 @@
+from django.conf import settings
+from django.core import signing
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+def cursor_mode(request):
+    """
+    Whether a listing should use cursor pagination: opt in per request with a
+    ``cursor`` query parameter, or site-wide with settings.CURSOR_PAGINATION.
+    """
+    return 'cursor' in request.GET or getattr(settings, 'CURSOR_PAGINATION', False)
+
+
+class CountedPaginator(Paginator):
+    """
+    A Paginator whose total count is already known (e.g. cached with the
+    page), so building a Page does not run a COUNT query.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @property
+    def count(self):
+        return self._count
+
+
+class CursorPage:
+    """
+    One page of a CursorPaginator. Mirrors the parts of Django's Page that
+    the templates use, with opaque next/previous tokens instead of numbers.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset (cursor) pagination: each page is one indexed range query
+    ``WHERE (key) > (last key) ORDER BY key LIMIT n`` with no COUNT(*) and
+    no OFFSET, so deep pages cost the same as the first one.
+
+    Args:
+        queryset: The queryset to paginate
+        ordering: Key fields, unique together (end with 'id'), e.g. ('-created_at', '-id')
+        per_page: Number of rows per page
+    """
+    SALT = 'store.pagination.cursor'
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def _encode(self, obj, direction):
+        model_fields = {field.name: field for field in self.queryset.model._meta.concrete_fields}
+        values = [model_fields[name].value_to_string(obj) for name in self.fields]
+        return signing.dumps({'v': values, 'd': direction}, salt=self.SALT, compress=True)
+
+    def _decode(self, token):
+        try:
+            payload = signing.loads(token, salt=self.SALT)
+            model_fields = {field.name: field for field in self.queryset.model._meta.concrete_fields}
+            values = [model_fields[name].to_python(value) for name, value in zip(self.fields, payload['v'])]
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            return None, None
+        if len(values) != len(self.fields) or payload.get('d') not in ('next', 'prev'):
+            return None, None
+        return values, payload['d']
+
+    def _seek(self, values, forward):
+        """Rows strictly after (forward) or before the given key values."""
+        condition = Q()
+        for position, name in enumerate(self.fields):
+            use_lt = self.descending[position] == forward
+            step = Q(**{f'{name}__{"lt" if use_lt else "gt"}': values[position]})
+            for previous in range(position):
+                step &= Q(**{self.fields[previous]: values[previous]})
+            condition |= step
+        # Redundant bound on the leading key lets the database range-scan the index
+        use_lt = self.descending[0] == forward
+        return Q(**{f'{self.fields[0]}__{"lte" if use_lt else "gte"}': values[0]}) & condition
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def get_page(self, cursor=None):
+        """Return the page that follows (or precedes) the given cursor token."""
+        values, direction = self._decode(cursor) if cursor else (None, None)
+
+        if values is None:
+            rows = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            has_more, has_before = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        elif direction == 'next':
+            rows = list(self.queryset.filter(self._seek(values, True)).order_by(*self.ordering)[:self.per_page + 1])
+            has_more, has_before = len(rows) > self.per_page, True
+            rows = rows[:self.per_page]
+        else:
+            rows = list(
+                self.queryset.filter(self._seek(values, False)).order_by(*self._reversed_ordering())[:self.per_page + 1]
+            )
+            has_more, has_before = True, len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+
+        next_cursor = self._encode(rows[-1], 'next') if rows and has_more else None
+        previous_cursor = self._encode(rows[0], 'prev') if rows and has_before else None
+        return CursorPage(rows, next_cursor, previous_cursor)
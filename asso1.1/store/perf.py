@@ -0,0 +1,153 @@
+"""
+Per-request performance instrumentation.
+
+store.middleware.PerformanceMiddleware measures every request: total
+time, SQL query count and time (through connection.execute_wrapper, so it
+works with DEBUG off), repeated queries (the same SQL run more than once,
+typically an N+1) and template render time (through TimedDjangoTemplates,
+the template backend set in settings.TEMPLATES). Results are sent back as
+a Server-Timing header and kept per view in bounded in-memory ring buffers
+(settings.STORE_PERF_SAMPLES samples per view) that /staff/perf/ summarizes
+as p50/p95/p99. Like store.cache stats, figures are per worker process.
+"""
+import contextvars
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+from store.benchmarks.timing import percentile
+
+
+_current = contextvars.ContextVar('store_perf_request', default=None)
+_lock = threading.Lock()
+_samples = {}
+_repeated = defaultdict(Counter)
+
+# Collapses literals so queries differing only in parameters group together
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class RequestStats:
+    """Measurements of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.statements = Counter()
+
+    def execute(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.statements[_LITERALS.sub('?', sql)] += 1
+
+    @property
+    def duplicates(self):
+        """Queries that repeat an SQL statement already run by this request."""
+        return self.queries - len(self.statements)
+
+    def repeated(self):
+        """(sql, count) of statements run more than once, most repeated first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count > 1]
+
+    def server_timing(self):
+        return ', '.join([
+            f'sql;dur={self.sql_ms:.1f};desc="{self.queries} queries, {self.duplicates} repeated"',
+            f'tpl;dur={self.template_ms:.1f};desc="templates"',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(stats, token, view):
+    """Stop measuring and store the sample for the view."""
+    _current.reset(token)
+    stats.total_ms = (time.perf_counter() - stats.started) * 1000
+    size = getattr(settings, 'STORE_PERF_SAMPLES', 500)
+    with _lock:
+        if view not in _samples:
+            _samples[view] = deque(maxlen=size)
+        _samples[view].append((stats.total_ms, stats.sql_ms, stats.template_ms, stats.queries, stats.duplicates))
+        for sql, count in stats.repeated()[:3]:
+            _repeated[view][sql] = max(_repeated[view][sql], count)
+        if len(_repeated[view]) > 20:
+            _repeated[view] = Counter(dict(_repeated[view].most_common(10)))
+
+
+class TimedTemplate(Template):
+    """Backend template that adds its render time to the current request."""
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        sql_before = stats.sql_ms
+        try:
+            return super().render(context, request)
+        finally:
+            # Queries run by lazy querysets during rendering count as SQL time
+            elapsed = (time.perf_counter() - start) * 1000
+            stats.template_ms += elapsed - (stats.sql_ms - sql_before)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that times template rendering for store.perf."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def _summary(values):
+    return {
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else 0,
+    }
+
+
+def stats():
+    """Per-view percentiles of this worker's recent requests, slowest p95 first."""
+    with _lock:
+        samples = {view: list(buffer) for view, buffer in _samples.items()}
+        repeated = {view: counter.most_common(3) for view, counter in _repeated.items()}
+    views = []
+    for view, rows in samples.items():
+        total, sql, template, queries, duplicates = (list(column) for column in zip(*rows))
+        views.append({
+            'view': view,
+            'requests': len(rows),
+            'total_ms': _summary(total),
+            'sql_ms': _summary(sql),
+            'template_ms': _summary(template),
+            'queries': _summary(queries),
+            'duplicates': _summary(duplicates),
+            'repeated_sql': [{'sql': sql[:300], 'count': count} for sql, count in repeated.get(view, [])],
+        })
+    views.sort(key=lambda view: view['total_ms']['p95'], reverse=True)
+    return {'samples_per_view': getattr(settings, 'STORE_PERF_SAMPLES', 500), 'views': views}
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _repeated.clear()
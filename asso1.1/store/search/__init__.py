@@ -0,0 +1,51 @@
+# Search Package - Pluggable book search backends
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from store.search.autocomplete import AutocompleteIndex
+from store.search.backends import (
+    BaseSearchBackend, IContainsBackend, MySQLFullTextBackend, InvertedIndexBackend, tokenize
+)
+
+_backend = None
+_autocomplete = None
+
+
+def get_search_backend():
+    """
+    Return the configured search backend (one instance per worker).
+
+    Uses settings.BOOK_SEARCH_BACKEND when set, otherwise MySQL FULLTEXT on
+    MySQL and the in-process inverted index on any other database.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'BOOK_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'mysql':
+            _backend = MySQLFullTextBackend()
+        else:
+            _backend = InvertedIndexBackend()
+    return _backend
+
+
+def get_autocomplete():
+    """Return the worker's in-memory AutocompleteIndex."""
+    global _autocomplete
+    if _autocomplete is None:
+        _autocomplete = AutocompleteIndex()
+    return _autocomplete
+
+
+__all__ = [
+    'AutocompleteIndex',
+    'BaseSearchBackend',
+    'IContainsBackend',
+    'MySQLFullTextBackend',
+    'InvertedIndexBackend',
+    'get_search_backend',
+    'get_autocomplete',
+    'tokenize',
+]
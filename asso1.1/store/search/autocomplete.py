@@ -0,0 +1,199 @@
+import heapq
+import threading
+import time
+import unicodedata
+from collections import Counter, deque
+
+from store.benchmarks.timing import percentile
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse whitespace."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+def trigrams(text):
+    """Return the set of padded character trigrams of a normalized string."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AutocompleteIndex:
+    """
+    In-memory typeahead index over book titles, authors (Book.author and
+    Author.name) and ISBNs, one per worker.
+
+    Matching is trigram based, so misspelt queries still find their book;
+    exact prefixes of a title, author word or ISBN are ranked first. Each
+    entry carries a snapshot of the fields book_search returns, so a lookup
+    never touches the database. The index is refreshed from Book/Author
+    post_save and post_delete signals.
+    """
+    # Minimum share of query trigrams a suggestion must contain
+    MIN_SIMILARITY = 0.3
+    # Latency samples kept for the stats endpoint
+    SAMPLE_SIZE = 1000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._entries = {}
+        self._keys = {}
+        self._postings = {}
+        self._queries = 0
+        self._hits = 0
+        self._latencies = deque(maxlen=self.SAMPLE_SIZE)
+
+    # ---------- building ----------
+
+    @staticmethod
+    def snapshot(book):
+        """The book_search fields of a Book."""
+        return {
+            'id': book.id,
+            'title': book.title,
+            'author': book.author,
+            'price': str(book.price),
+            'in_stock': book.is_in_stock(),
+        }
+
+    @staticmethod
+    def book_keys(book):
+        """Normalized searchable strings of a Book."""
+        keys = {normalize(book.title), normalize(book.author)}
+        if book.author_obj_id and book.author_obj is not None:
+            keys.add(normalize(book.author_obj.name))
+        if book.isbn:
+            keys.add(normalize(book.isbn.replace('-', '')))
+        keys.discard('')
+        return tuple(keys)
+
+    def load(self):
+        """(Re)build the index from the Book table."""
+        from store.models import Book
+        books = Book.objects.select_related('author_obj').only(
+            'id', 'title', 'author', 'isbn', 'price', 'stock_quantity', 'author_obj__name'
+        ).iterator(chunk_size=2000)
+        with self._lock:
+            self._entries = {}
+            self._keys = {}
+            self._postings = {}
+            for book in books:
+                self._add(book)
+            self._loaded = True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+
+    def _add(self, book):
+        keys = self.book_keys(book)
+        self._entries[book.id] = self.snapshot(book)
+        self._keys[book.id] = keys
+        for gram in set().union(*(trigrams(key) for key in keys)):
+            self._postings.setdefault(gram, set()).add(book.id)
+
+    def _remove(self, book_id):
+        keys = self._keys.pop(book_id, ())
+        self._entries.pop(book_id, None)
+        for gram in set().union(*(trigrams(key) for key in keys)):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(book_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def index_book(self, book):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove(book.id)
+            self._add(book)
+
+    def refresh_books(self, book_ids):
+        """Re-read some books from the database (e.g. after a queryset update)."""
+        if not self._loaded:
+            return
+        from store.models import Book
+        for book in Book.objects.filter(id__in=book_ids).select_related('author_obj'):
+            self.index_book(book)
+
+    def remove_book(self, book_id):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._remove(book_id)
+
+    def invalidate(self):
+        """Rebuild from the Book table on the next query (after bulk changes)."""
+        with self._lock:
+            self._loaded = False
+
+    # ---------- querying ----------
+
+    @staticmethod
+    def _prefix_rank(query, keys):
+        """0 for a key prefix, 1 for a word prefix, 2 otherwise."""
+        best = 2
+        for key in keys:
+            if key.startswith(query):
+                return 0
+            if any(word.startswith(query) for word in key.split()):
+                best = 1
+        return best
+
+    def suggest(self, query, limit=10):
+        """
+        Return up to limit book snapshots matching a partial query.
+        """
+        start = time.perf_counter()
+        self._ensure_loaded()
+        query = normalize(query)
+        results = []
+        if query:
+            with self._lock:
+                grams = trigrams(query)
+                counts = Counter()
+                for gram in grams:
+                    counts.update(self._postings.get(gram, ()))
+                needed = max(1, int(len(grams) * self.MIN_SIMILARITY))
+                ranked = heapq.nsmallest(
+                    limit,
+                    (
+                        (self._prefix_rank(query, self._keys[book_id]), -shared, self._entries[book_id]['title'], book_id)
+                        for book_id, shared in counts.items()
+                        if shared >= needed
+                    )
+                )
+                results = [dict(self._entries[book_id]) for *_, book_id in ranked]
+
+        with self._lock:
+            self._queries += 1
+            self._hits += bool(results)
+            self._latencies.append((time.perf_counter() - start) * 1000)
+        return results
+
+    def stats(self):
+        """Hit rate and latency percentiles since the worker started."""
+        with self._lock:
+            samples = list(self._latencies)
+            return {
+                'loaded': self._loaded,
+                'books': len(self._entries),
+                'trigrams': len(self._postings),
+                'queries': self._queries,
+                'hits': self._hits,
+                'hit_rate': self._hits / self._queries if self._queries else 0.0,
+                'latency_ms': {
+                    'p50': percentile(samples, 50),
+                    'p95': percentile(samples, 95),
+                    'p99': percentile(samples, 99),
+                    'max': max(samples) if samples else 0.0,
+                },
+            }
@@ -0,0 +1,417 @@
+import bisect
+import json
+import math
+import re
+import threading
+from array import array
+
+import numpy as np
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query):
+    """
+    Split a search-as-you-type query into (terms, prefix).
+    The last word is treated as a prefix unless the query ends with a space.
+    """
+    terms = tokenize(query)
+    if terms and query and not query[-1].isspace():
+        return terms[:-1], terms[-1]
+    return terms, None
+
+
+class BaseSearchBackend:
+    """
+    Book search backend interface.
+
+    search_ids() returns relevance-ranked Book ids, filter() narrows a Book
+    queryset to matches (ordered by relevance when ranked=True).
+    """
+    # Upper bound on ranked results used to order a catalog listing
+    MAX_RESULTS = 1000
+
+    def search_ids(self, query, limit=10):
+        raise NotImplementedError
+
+    def filter(self, queryset, query, ranked=True):
+        raise NotImplementedError
+
+    def index_book(self, book):
+        """Called after a Book is saved (no-op for database-side indexes)."""
+
+    def remove_book(self, book_id):
+        """Called after a Book is deleted (no-op for database-side indexes)."""
+
+    def invalidate(self):
+        """Called after a bulk change to the Book table (no-op for database-side indexes)."""
+
+
+class IContainsBackend(BaseSearchBackend):
+    """The original unindexed title/author icontains search."""
+
+    def _condition(self, query):
+        return Q(title__icontains=query) | Q(author__icontains=query)
+
+    def search_ids(self, query, limit=10):
+        from store.models import Book
+        return list(Book.objects.filter(self._condition(query)).values_list('id', flat=True)[:limit])
+
+    def filter(self, queryset, query, ranked=True):
+        return queryset.filter(self._condition(query))
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """
+    MySQL FULLTEXT search over Book.title/author/description (index added in
+    migration 0006). Uses boolean mode so every word is required and the last
+    word matches as a prefix.
+    """
+    MATCH_SQL = 'MATCH (store_book.title, store_book.author, store_book.description) AGAINST (%s IN BOOLEAN MODE)'
+    # InnoDB ignores shorter tokens (innodb_ft_min_token_size)
+    MIN_TOKEN_SIZE = 3
+
+    def _boolean_query(self, query):
+        terms, prefix = parse_query(query)
+        words = [f'+{term}' for term in terms if len(term) >= self.MIN_TOKEN_SIZE]
+        if prefix and len(prefix) >= self.MIN_TOKEN_SIZE:
+            words.append(f'+{prefix}*')
+        return ' '.join(words)
+
+    def filter(self, queryset, query, ranked=True):
+        boolean_query = self._boolean_query(query)
+        if not boolean_query:
+            return IContainsBackend().filter(queryset, query)
+        queryset = queryset.annotate(
+            relevance=RawSQL(self.MATCH_SQL, [boolean_query])
+        ).filter(relevance__gt=0)
+        if ranked:
+            queryset = queryset.order_by('-relevance', 'id')
+        return queryset
+
+    def search_ids(self, query, limit=10):
+        from store.models import Book
+        return list(self.filter(Book.objects.all(), query).values_list('id', flat=True)[:limit])
+
+
+class InvertedIndexBackend(BaseSearchBackend):
+    """
+    In-process inverted index for SQLite, tests and single-box deployments.
+
+    Built once per worker from the database into flat NumPy arrays:
+    a forward index (book -> term ids, field weights) and postings
+    (term -> books). Term ids follow lexicographic order so a prefix is a
+    contiguous term-id range. For ranking (search_ids), candidates come from
+    the most selective query word (at most MAX_CANDIDATES books, taken in
+    impact order, over at most MAX_EXPANSIONS prefix terms) and are scored
+    against every word through the forward index, so typeahead never
+    touches whole postings lists of frequent terms. filter() intersects the
+    whole postings lists instead, so a catalog search has every match.
+
+    Saves and deletes are applied to a small overlay so the frozen arrays
+    never need rewriting; call load() to fold the overlay back in.
+    """
+    FIELD_WEIGHTS = (('title', 3), ('author', 2), ('description', 1))
+    # Prefixes shorter than this only match whole words
+    MIN_PREFIX = 1
+    # Most frequent expansions of a prefix used to generate candidates
+    MAX_EXPANSIONS = 50
+    # Candidate books scored per query
+    MAX_CANDIDATES = 5000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._vocabulary = []
+        self._doc_ids = np.empty(0, dtype=np.int64)
+        self._doc_ptr = np.zeros(1, dtype=np.int64)
+        self._doc_terms = np.empty(0, dtype=np.int32)
+        self._doc_weights = np.empty(0, dtype=np.uint8)
+        self._term_ptr = np.zeros(1, dtype=np.int64)
+        self._post_rows = np.empty(0, dtype=np.int32)
+        self._post_weights = np.empty(0, dtype=np.uint8)
+        self._df = np.empty(0, dtype=np.int64)
+        self._cumdf = np.zeros(1, dtype=np.int64)
+        self._idf = np.empty(0)
+        self._heads = {}
+        self._overlay_docs = {}
+        self._masked = set()
+
+    # ---------- building ----------
+
+    def _document_terms(self, fields):
+        weights = {}
+        for (name, weight), text in zip(self.FIELD_WEIGHTS, fields):
+            for term in set(tokenize(text)):
+                weights[term] = weights.get(term, 0) + weight
+        return weights
+
+    def build(self, documents):
+        """
+        Build the index from an iterable of (id, title, author, description)
+        ordered by id.
+        """
+        provisional = {}
+        doc_ids = array('q')
+        doc_lengths = array('i')
+        doc_terms = array('i')
+        doc_weights = array('B')
+        for doc_id, *fields in documents:
+            terms = self._document_terms(fields)
+            doc_ids.append(doc_id)
+            doc_lengths.append(len(terms))
+            for term, weight in terms.items():
+                doc_terms.append(provisional.setdefault(term, len(provisional)))
+                doc_weights.append(weight)
+
+        # Renumber terms in lexicographic order
+        vocabulary = sorted(provisional)
+        remap = np.empty(len(vocabulary), dtype=np.int32)
+        for term_id, term in enumerate(vocabulary):
+            remap[provisional[term]] = term_id
+        forward_terms = remap[np.frombuffer(doc_terms, dtype=np.int32)] if len(doc_terms) else np.empty(0, dtype=np.int32)
+        forward_weights = np.frombuffer(doc_weights, dtype=np.uint8).copy()
+        doc_ptr = np.zeros(len(doc_ids) + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(doc_lengths, dtype=np.int32), out=doc_ptr[1:])
+
+        # Postings: group the forward entries by term, rows stay ascending
+        rows = np.repeat(np.arange(len(doc_ids), dtype=np.int32), np.diff(doc_ptr))
+        order = np.argsort(forward_terms, kind='stable')
+        df = np.bincount(forward_terms, minlength=len(vocabulary)).astype(np.int64)
+        term_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=term_ptr[1:])
+        post_rows = rows[order]
+        post_weights = forward_weights[order]
+
+        # Impact-ordered heads of frequent terms
+        heads = {}
+        for term_id in np.nonzero(df > self.MAX_CANDIDATES)[0]:
+            start, end = term_ptr[term_id], term_ptr[term_id + 1]
+            impact = np.argsort(-post_weights[start:end].astype(np.int16), kind='stable')[:self.MAX_CANDIDATES]
+            heads[int(term_id)] = post_rows[start:end][impact]
+
+        with self._lock:
+            self._reset()
+            self._vocabulary = vocabulary
+            self._doc_ids = np.frombuffer(doc_ids, dtype=np.int64)
+            self._doc_ptr = doc_ptr
+            self._doc_terms = forward_terms
+            self._doc_weights = forward_weights
+            self._term_ptr = term_ptr
+            self._post_rows = post_rows
+            self._post_weights = post_weights
+            self._df = df
+            self._cumdf = term_ptr
+            self._idf = np.log1p(max(len(doc_ids), 1) / np.maximum(df, 1))
+            self._heads = heads
+            self._loaded = True
+
+    def load(self):
+        """(Re)build the index from the Book table."""
+        from store.models import Book
+        self.build(
+            Book.objects.order_by('id').values_list('id', 'title', 'author', 'description').iterator(chunk_size=5000)
+        )
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+
+    def index_book(self, book):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._masked.add(book.id)
+            self._overlay_docs[book.id] = self._document_terms(
+                [getattr(book, name) for name, _ in self.FIELD_WEIGHTS]
+            )
+
+    def remove_book(self, book_id):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._masked.add(book_id)
+            self._overlay_docs.pop(book_id, None)
+
+    def invalidate(self):
+        """Rebuild from the Book table on the next query."""
+        with self._lock:
+            self._loaded = False
+
+    # ---------- querying ----------
+
+    def _term_range(self, word, is_prefix):
+        """Return the [lo, hi) term-id range matched by a query word."""
+        lo = bisect.bisect_left(self._vocabulary, word)
+        if is_prefix and len(word) >= self.MIN_PREFIX:
+            hi = bisect.bisect_left(self._vocabulary, word + '\U0010ffff', lo)
+        else:
+            hi = lo + 1 if lo < len(self._vocabulary) and self._vocabulary[lo] == word else lo
+        return lo, hi
+
+    def _candidates(self, lo, hi, limit):
+        """Candidate rows for the most selective word, in impact order per term."""
+        term_ids = np.arange(lo, hi)
+        if len(term_ids) > self.MAX_EXPANSIONS:
+            top = np.argpartition(-self._df[lo:hi], self.MAX_EXPANSIONS)[:self.MAX_EXPANSIONS]
+            term_ids = term_ids[top]
+        per_term = max(self.MAX_CANDIDATES // len(term_ids), limit or 1)
+        parts = []
+        for term_id in term_ids.tolist():
+            start, end = self._term_ptr[term_id], self._term_ptr[term_id + 1]
+            if end - start <= per_term:
+                parts.append(self._post_rows[start:end])
+            elif term_id in self._heads:
+                parts.append(self._heads[term_id][:per_term])
+            else:
+                impact = np.argsort(-self._post_weights[start:end].astype(np.int16), kind='stable')[:per_term]
+                parts.append(self._post_rows[start:end][impact])
+        return np.unique(np.concatenate(parts))
+
+    def _score_frozen(self, ranges, limit):
+        if any(lo == hi for lo, hi in ranges):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        base = min(ranges, key=lambda r: self._cumdf[r[1]] - self._cumdf[r[0]])
+        rows = self._candidates(base[0], base[1], limit)
+
+        # Gather the forward index entries of every candidate
+        starts = self._doc_ptr[rows]
+        lengths = self._doc_ptr[rows + 1] - starts
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        entries = offsets + np.arange(int(lengths.sum()))
+        owners = np.repeat(np.arange(len(rows)), lengths)
+        terms = self._doc_terms[entries]
+        weights = self._doc_weights[entries] * self._idf[terms]
+
+        total = np.zeros(len(rows))
+        matched = np.ones(len(rows), dtype=bool)
+        for lo, hi in ranges:
+            hit = (terms >= lo) & (terms < hi)
+            group = np.zeros(len(rows))
+            np.maximum.at(group, owners[hit], weights[hit])
+            matched &= group > 0
+            total += group
+
+        ids = self._doc_ids[rows]
+        keep = matched
+        if self._masked:
+            keep &= ~np.isin(ids, np.fromiter(self._masked, dtype=np.int64, count=len(self._masked)))
+        return ids[keep], total[keep]
+
+    def _score_overlay(self, words):
+        scores = {}
+        doc_count = max(len(self._doc_ids), 1)
+        for doc_id, doc_terms in self._overlay_docs.items():
+            total = 0.0
+            for word, is_prefix in words:
+                best = 0.0
+                for term, weight in doc_terms.items():
+                    if term == word or (is_prefix and len(word) >= self.MIN_PREFIX and term.startswith(word)):
+                        lo, hi = self._term_range(term, False)
+                        idf = self._idf[lo] if hi > lo else math.log1p(doc_count)
+                        best = max(best, weight * idf)
+                if not best:
+                    break
+                total += best
+            else:
+                scores[doc_id] = total
+        return scores
+
+    @staticmethod
+    def _words(query):
+        terms, prefix = parse_query(query)
+        words = [(term, False) for term in terms]
+        if prefix:
+            words.append((prefix, True))
+        return words
+
+    def search_ids(self, query, limit=10):
+        self._ensure_loaded()
+        words = self._words(query)
+        if not words:
+            return []
+
+        with self._lock:
+            ranges = [self._term_range(word, is_prefix) for word, is_prefix in words]
+            ids, scores = self._score_frozen(ranges, limit)
+            overlay = self._score_overlay(words)
+
+        if limit is not None and len(ids) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            ids, scores = ids[top], scores[top]
+        ranked = sorted(
+            list(zip(ids.tolist(), scores.tolist())) + list(overlay.items()),
+            key=lambda x: (-x[1], x[0])
+        )
+        return [doc_id for doc_id, _ in ranked[:limit]]
+
+    def match_ids(self, query):
+        """
+        Every Book id matching all query words, in id order. Unlike
+        search_ids() there are no caps: each word's whole postings lists
+        (over all prefix expansions) are intersected.
+        """
+        self._ensure_loaded()
+        words = self._words(query)
+        if not words:
+            return []
+
+        with self._lock:
+            rows = None
+            for word, is_prefix in words:
+                lo, hi = self._term_range(word, is_prefix)
+                # Postings are grouped by term id, so a term range is one slice
+                matched = np.unique(self._post_rows[self._term_ptr[lo]:self._term_ptr[hi]])
+                rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+                if not len(rows):
+                    break
+            ids = self._doc_ids[rows]
+            if self._masked:
+                ids = ids[~np.isin(ids, np.fromiter(self._masked, dtype=np.int64, count=len(self._masked)))]
+            overlay = self._score_overlay(words)
+        return sorted(set(ids.tolist()) | set(overlay))
+
+    @classmethod
+    def _id_condition(cls, ids, connection):
+        """
+        Q(id__in=ids), passed as a single parameter on SQLite and PostgreSQL
+        when the list is too long for one query parameter per id.
+        """
+        if len(ids) > cls.MAX_RESULTS:
+            if connection.vendor == 'sqlite':
+                return Q(id__in=RawSQL('SELECT value FROM json_each(%s)', [json.dumps(ids)]))
+            if connection.vendor == 'postgresql':
+                return Q(id__in=RawSQL('SELECT unnest(%s::bigint[])', [ids]))
+        return Q(id__in=ids)
+
+    def filter(self, queryset, query, ranked=True):
+        """
+        Narrow queryset to every match (exact, see match_ids). With ranked=True
+        the MAX_RESULTS most relevant matches come first, the rest follow by id.
+        """
+        ids = self.match_ids(query)
+        queryset = queryset.filter(self._id_condition(ids, connections[queryset.db]))
+        if ranked and ids:
+            top = self.search_ids(query, limit=self.MAX_RESULTS)
+            queryset = queryset.order_by(Case(
+                *[When(id=book_id, then=Value(position)) for position, book_id in enumerate(top)],
+                default=Value(len(top)),
+                output_field=IntegerField()
+            ), 'id')
+        return queryset
@@ -0,0 +1,104 @@
+# Model signal handlers - keep derived data in sync with the domain models
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from store import cache, catalog_sync
+from store.models import (
+    Author, Book, Cart, Category, Order, OrderItem, Rating, Review, books_imported, stock_changed
+)
+from store.search import get_autocomplete, get_search_backend
+
+
+@receiver(post_save, sender=Book)
+def index_book_for_search(sender, instance, **kwargs):
+    get_search_backend().index_book(instance)
+    get_autocomplete().index_book(instance)
+
+
+@receiver(post_delete, sender=Book)
+def remove_book_from_search(sender, instance, **kwargs):
+    get_search_backend().remove_book(instance.id)
+    get_autocomplete().remove_book(instance.id)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_cache(sender, instance, **kwargs):
+    cache.bump(cache.BOOK, instance.id)
+    cache.bump(cache.CATALOG)
+    if instance.category_id:
+        cache.bump(cache.CATEGORY, instance.category_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    cache.bump(cache.CATEGORY, instance.id)
+    cache.bump(cache.CATALOG)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_rated_book_cache(sender, instance, **kwargs):
+    # Catalog pages show the rating columns too, but expire on their own
+    # (settings.STORE_LIST_CACHE_TIMEOUT) rather than on every rating
+    cache.bump(cache.BOOK, instance.book_id)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def invalidate_ordered_book_cache(sender, instance, **kwargs):
+    cache.bump(cache.BOOK, instance.book_id)
+    cache.bump(cache.ORDERS)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_cache(sender, instance, **kwargs):
+    cache.bump(cache.ORDERS)
+
+
+@receiver(pre_delete, sender=Book)
+def remember_book_carts(sender, instance, **kwargs):
+    # Deleting a book cascades to cart lines without CartItem.delete()
+    instance._cart_ids = list(instance.cart_items.values_list('cart_id', flat=True))
+
+
+@receiver(post_delete, sender=Book)
+def refresh_book_cart_totals(sender, instance, **kwargs):
+    if getattr(instance, '_cart_ids', None):
+        Cart.refresh_totals(instance._cart_ids)
+
+
+@receiver(post_save, sender=Author)
+def reindex_author_books(sender, instance, created, **kwargs):
+    if created:
+        return
+    autocomplete = get_autocomplete()
+    for book in instance.books.select_related('author_obj'):
+        autocomplete.index_book(book)
+
+
+@receiver(stock_changed)
+def refresh_stock_snapshots(sender, book_ids, bulk=False, **kwargs):
+    get_autocomplete().refresh_books(book_ids)
+    # Checkout bulk-creates its OrderItems (no post_save), so stock changes
+    # also stand in for the ordered books' invalidation. Catalog pages are
+    # left to expire (settings.STORE_LIST_CACHE_TIMEOUT): every sale changes stock.
+    for book_id in book_ids:
+        cache.bump(cache.BOOK, book_id)
+    if bulk:
+        # Sent by the job worker: tell the web processes
+        catalog_sync.bump()
+
+
+@receiver(books_imported)
+def refresh_after_import(sender, **kwargs):
+    get_search_backend().invalidate()
+    get_autocomplete().invalidate()
+    cache.bump(cache.CATALOG)
+    cache.bump(cache.IMPORTS)
+    # Imports run in the job worker or manage.py import_books
+    catalog_sync.bump()
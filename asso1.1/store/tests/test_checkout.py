@@ -0,0 +1,62 @@
+"""
+Query-count tests for checkout: placing an order issues the same number of
+queries whatever the cart size.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from store.controllers.orderController.views import place_order
+from store.models import Book, Cart, CartItem, Customer, Order
+
+SHIPPING = {'method': 'standard', 'address': '1 Test St', 'city': 'Test', 'postal_code': '0000', 'country': 'Vietnam'}
+PASSWORD = 'query-check'
+
+
+class CheckoutQueryTests(TestCase):
+    # Stock UPDATE, Shipping/Payment/Order/OrderItem inserts, the
+    # recommendation index (3), cart clear (2), payment and order updates,
+    # the sales rollups (3) and 10 savepoint statements
+    PLACE_ORDER_QUERIES = 25
+    CART_SIZES = (2, 5, 10)
+
+    def fill_cart(self, size):
+        """A new customer (no earlier orders) with a cart of `size` books."""
+        customer = Customer.objects.create(
+            name='Query Check', email=f'query-check-{size}@example.com', password=PASSWORD
+        )
+        books = Book.objects.bulk_create([
+            Book(title=f'Query Check {size} {i}', author='Query Check', price=Decimal('9.99'), stock_quantity=10)
+            for i in range(size)
+        ])
+        cart = Cart.objects.create(customer=customer)
+        CartItem.objects.bulk_create([CartItem(cart=cart, book=book, quantity=2) for book in books])
+        cart.recalculate_totals()
+        return customer, cart
+
+    def test_place_order_queries_do_not_grow_with_cart_size(self):
+        for size in self.CART_SIZES:
+            with self.subTest(size=size):
+                customer, cart = self.fill_cart(size)
+                items = list(cart.items.select_related('book'))
+                with self.assertNumQueries(self.PLACE_ORDER_QUERIES):
+                    order = place_order(customer.id, cart, items, SHIPPING, 'credit_card')
+                self.assertEqual(order.order_items.count(), size)
+                self.assertEqual(order.status, 'confirmed')
+
+    # Without the throttled catalog version read (store.catalog_sync), which
+    # would add a statement to whichever request it falls on
+    @override_settings(ALLOWED_HOSTS=['testserver'], CATALOG_VERSION_CHECK_INTERVAL=float('inf'))
+    def test_checkout_request_queries_do_not_grow_with_cart_size(self):
+        counts = {}
+        for size in self.CART_SIZES:
+            customer, _ = self.fill_cart(size)
+            self.client.post('/customer/login/', {'email': customer.email, 'password': PASSWORD})
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/cart/checkout/process/', SHIPPING)
+            self.assertIn('/confirmation/', response.get('Location', ''))
+            self.assertEqual(Order.objects.get(customer=customer).order_items.count(), size)
+            counts[size] = len(queries)
+        self.assertEqual(len(set(counts.values())), 1, counts)
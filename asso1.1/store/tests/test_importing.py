@@ -0,0 +1,38 @@
+"""
+Tests for BookImporter batches the database rejects and retries row by row.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+
+from store.importing import BookImporter
+from store.models import Book
+
+
+class RejectedBatchTests(TestCase):
+    def setUp(self):
+        Book.objects.create(title='Old Price', author='Import Test', price=Decimal('10.00'), isbn='9780000000001')
+        Book.objects.create(title='Also Old', author='Import Test', price=Decimal('10.00'), isbn='9780000000002')
+        self.importer = BookImporter()
+
+    def row(self, isbn, price, title='Imported'):
+        # Cleaned rows bypass clean_row, so a missing title reaches the database
+        return {'isbn': isbn, 'title': title, 'price': Decimal(price)}
+
+    def test_rejected_row_is_not_counted_as_repriced(self):
+        self.importer.write_batch([(1, self.row('9780000000001', '12.00', title=None))])
+
+        self.assertEqual(self.importer.repriced_isbns, set())
+        self.assertEqual(self.importer.report.error_count, 1)
+        self.assertEqual(Book.objects.get(isbn='9780000000001').price, Decimal('10.00'))
+
+    def test_rows_written_on_retry_are_repriced(self):
+        self.importer.write_batch([
+            (1, self.row('9780000000001', '12.00')),
+            (2, self.row('9780000000002', '12.00', title=None)),
+        ])
+
+        self.assertEqual(self.importer.repriced_isbns, {'9780000000001'})
+        self.assertEqual(self.importer.report.imported, 1)
+        self.assertEqual(self.importer.report.errors[0][0], 2)
+        self.assertEqual(Book.objects.get(isbn='9780000000002').price, Decimal('10.00'))
@@ -0,0 +1,101 @@
+"""
+Query-count tests for the order query shapes (OrderQuerySet.for_listing and
+for_detail) and the pages that use them.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from store.models import Book, Customer, Order, OrderItem, Payment, Shipping, Staff
+
+PASSWORD = 'query-check'
+
+
+class OrderQueryTests(TestCase):
+    SMALL, LARGE = 2, 25
+    # Upper bound per order page
+    MAX_PAGE_QUERIES = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = Staff.objects.create(name='Order Check', email='order-check@example.com', password='x')
+
+    def seed(self, size):
+        """A customer with `size` orders of `size` items each, and their books."""
+        customer = Customer.objects.create(
+            name='Order Check', email=f'order-check-{size}@example.com', password=PASSWORD
+        )
+        books = Book.objects.bulk_create([
+            Book(title=f'Order Check {size} {i}', author='Order Check', price=Decimal('9.99'), stock_quantity=10)
+            for i in range(size)
+        ])
+        orders = [
+            Order.objects.create(
+                customer=customer,
+                shipping=Shipping.objects.create(address='1 Test St', city='Test', postal_code='0000'),
+                payment=Payment.objects.create(method='credit_card', amount=0),
+                status='confirmed',
+            )
+            for _ in range(size)
+        ]
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, book=book, quantity=1, price=book.price) for order in orders for book in books
+        ])
+        return customer, orders
+
+    def test_for_listing_is_one_query(self):
+        customer, _ = self.seed(self.LARGE)
+        with self.assertNumQueries(1):
+            rows = [
+                (order.id, order.status, order.total, order.customer.name, order.customer.email)
+                for order in Order.objects.filter(customer=customer).for_listing()
+            ]
+        self.assertEqual(len(rows), self.LARGE)
+
+    def test_for_detail_is_two_queries(self):
+        customer, _ = self.seed(self.LARGE)
+        with self.assertNumQueries(2):
+            for order in Order.objects.filter(customer=customer).for_detail():
+                self.assertEqual(order.customer.name, 'Order Check')
+                self.assertEqual(order.shipping.city, 'Test')
+                self.assertEqual(order.payment.method, 'credit_card')
+                titles = [item.book.title for item in order.order_items.all()]
+                self.assertEqual(len(titles), self.LARGE)
+
+    def page_queries(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def measure(self, size):
+        customer, orders = self.seed(size)
+        order = orders[0]
+
+        shopper = self.client_class()
+        shopper.post('/customer/login/', {'email': customer.email, 'password': PASSWORD})
+        staff_client = self.client_class()
+        session = staff_client.session
+        session['staff_id'] = self.staff.id
+        session['staff_name'] = self.staff.name
+        session.save()
+
+        return {
+            'staff order list': self.page_queries(staff_client, '/staff/orders/'),
+            'staff order detail': self.page_queries(staff_client, f'/staff/orders/{order.id}/'),
+            'customer order history': self.page_queries(shopper, '/customer/orders/'),
+            'customer order detail': self.page_queries(shopper, f'/customer/orders/{order.id}/'),
+            'order confirmation': self.page_queries(shopper, f'/cart/order/{order.id}/confirmation/'),
+        }
+
+    # Without the throttled catalog version read (store.catalog_sync), which
+    # would add a statement to whichever request it falls on
+    @override_settings(ALLOWED_HOSTS=['testserver'], CATALOG_VERSION_CHECK_INTERVAL=float('inf'))
+    def test_order_pages_do_not_grow_with_orders_or_items(self):
+        small, large = self.measure(self.SMALL), self.measure(self.LARGE)
+        for page, queries in large.items():
+            with self.subTest(page=page):
+                self.assertEqual(small[page], queries)
+                self.assertLessEqual(queries, self.MAX_PAGE_QUERIES)
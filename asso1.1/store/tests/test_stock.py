@@ -0,0 +1,89 @@
+"""
+Tests for Book.reserve_stock, the conditional stock UPDATE used by checkout.
+"""
+import threading
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from store.models import Book, InsufficientStockError, stock_changed
+
+
+class ReserveStockTests(TransactionTestCase):
+    """
+    TransactionTestCase so that reservations really commit: concurrent
+    reservations run on their own connections and stock_changed is sent
+    from on_commit.
+    """
+
+    def create_book(self, stock, title='Stock Test Book'):
+        return Book.objects.create(title=title, author='Stock Test', price=Decimal('10.00'), stock_quantity=stock)
+
+    def test_concurrent_reservations_never_oversell(self):
+        book = self.create_book(stock=5)
+        threads = 20
+        barrier = threading.Barrier(threads)
+        outcomes = []
+        lock = threading.Lock()
+
+        def reserve():
+            try:
+                barrier.wait()
+                Book.reserve_stock({book.id: 1})
+                outcome = 'reserved'
+            except InsufficientStockError:
+                outcome = 'rejected'
+            finally:
+                connection.close()
+            with lock:
+                outcomes.append(outcome)
+
+        workers = [threading.Thread(target=reserve) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        book.refresh_from_db()
+        self.assertEqual(outcomes.count('reserved'), 5)
+        self.assertEqual(outcomes.count('rejected'), threads - 5)
+        self.assertEqual(book.stock_quantity, 0)
+
+    def test_insufficient_stock_raises_and_takes_nothing(self):
+        plenty = self.create_book(stock=10, title='Plenty')
+        short = self.create_book(stock=1, title='Short')
+
+        with self.assertRaises(InsufficientStockError) as raised:
+            Book.reserve_stock({plenty.id: 2, short.id: 2})
+
+        self.assertEqual(raised.exception.book_ids, [short.id])
+        plenty.refresh_from_db()
+        short.refresh_from_db()
+        self.assertEqual(plenty.stock_quantity, 10)
+        self.assertEqual(short.stock_quantity, 1)
+
+    def test_stock_changed_sent_on_commit(self):
+        book = self.create_book(stock=3)
+        received = []
+
+        def receiver(sender, book_ids, **kwargs):
+            received.append(book_ids)
+
+        stock_changed.connect(receiver)
+        self.addCleanup(stock_changed.disconnect, receiver)
+
+        with transaction.atomic():
+            Book.reserve_stock({book.id: 1})
+            self.assertEqual(received, [])
+        self.assertEqual(received, [[book.id]])
+
+        try:
+            with transaction.atomic():
+                Book.reserve_stock({book.id: 1})
+                raise RuntimeError('checkout failed')
+        except RuntimeError:
+            pass
+        self.assertEqual(received, [[book.id]])
+        book.refresh_from_db()
+        self.assertEqual(book.stock_quantity, 2)